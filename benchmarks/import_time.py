@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+导入耗时基准：在独立的子进程中用 python -X importtime 导入核心模块和界面入口，
+汇总累计耗时，并检查核心模块没有导入 PyQt5 / OpenCV / PIL
+
+用法示例:
+    python benchmarks/import_time.py --repeat 5 --json import_time.json
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 脚本和工作进程使用的核心模块，不应导入Qt或图像库
+CORE_MODULES = (
+    'src.core.hdf5_model',
+    'src.core.segments',
+    'src.core.phrase_library',
+    'src.core.phrase_store',
+    'src.core.folder_catalog',
+    'src.core.dataset_stats',
+    'src.core.annotation_io',
+    'src.core.annotation_check',
+    'src.core.thumbnails',
+    'src.core.proxy_store',
+    'src.core.playback',
+    'src.core.depth',
+    'src.core.compositor',
+    'src.core.clip_export',
+    'src.core.frame_timing',
+)
+
+# 界面入口：main.py 导入的模块
+GUI_MODULES = ('main',)
+
+# 核心模块不允许导入的顶层包
+FORBIDDEN_PACKAGES = ('PyQt5', 'cv2', 'PIL')
+
+
+def measure(module, top=10):
+    """
+    在新的解释器中导入一个模块，解析 -X importtime 的输出
+
+    Args:
+        module: 模块名
+        top: 返回的最慢导入数
+
+    Returns:
+        module, total_us（该模块自身的累计耗时）, imported（导入的顶层包）, slowest（[(模块, 累计微秒)]）
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                             cwd=REPO_ROOT, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{process.stderr}")
+
+    total_us = None
+    timings = []
+    packages = set()
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # 格式: "import time: self | cumulative | <缩进>模块名"
+        _, cumulative_us, name = line.split('|')
+        name = name.rstrip()
+        cumulative_us = int(cumulative_us)
+        stripped = name.strip()
+        packages.add(stripped.split('.')[0])
+        timings.append((stripped, cumulative_us))
+        # 顶层导入没有缩进
+        if stripped == module and name == ' ' + module:
+            total_us = cumulative_us
+    timings.sort(key=lambda item: item[1], reverse=True)
+    return {
+        'module': module,
+        'total_us': total_us,
+        'imported': sorted(packages),
+        'slowest': timings[:top],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量核心模块和界面入口的导入耗时")
+    parser.add_argument("--repeat", type=int, default=3, help="每个模块测量的次数，取中位数")
+    parser.add_argument("--top", type=int, default=5, help="每个模块列出的最慢导入数")
+    parser.add_argument("--no-gui", action="store_true", help="不测量界面入口（没有安装PyQt5时使用）")
+    parser.add_argument("--json", type=str, default=None, help="将结果写入该JSON文件（'-' 表示标准输出）")
+    args = parser.parse_args()
+
+    modules = CORE_MODULES + (() if args.no_gui else GUI_MODULES)
+    results = []
+    for module in modules:
+        runs = [measure(module, args.top) for _ in range(max(args.repeat, 1))]
+        result = runs[-1]
+        result['total_us'] = int(statistics.median(run['total_us'] for run in runs))
+        result['forbidden'] = ([name for name in FORBIDDEN_PACKAGES if name in result['imported']]
+                               if module in CORE_MODULES else [])
+        results.append(result)
+
+    failed = [result for result in results if result['forbidden']]
+    if args.json == '-':
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print(f"{'Module':<30} {'Import (ms)':>12}  Forbidden")
+        print("-" * 60)
+        for result in results:
+            forbidden = ', '.join(result['forbidden']) or '-'
+            print(f"{result['module']:<30} {result['total_us'] / 1000:>12.1f}  {forbidden}")
+            for name, cumulative_us in result['slowest'][1:]:
+                print(f"    {name:<26} {cumulative_us / 1000:>12.1f}")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f"\n结果已写入: {os.path.abspath(args.json)}")
+
+    if failed:
+        print(f"\n核心模块导入了不允许的包: {', '.join(r['module'] for r in failed)}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
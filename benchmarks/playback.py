@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+播放吞吐量基准：按顺序读取并解码一个episode的每一帧，比较逐帧 HDF5Model.get_image
+与按chunk整块预读的 PlaybackReader，输出各相机的持续吞吐量（帧/秒）
+
+用法示例:
+    python benchmarks/playback.py --file /data/hdf5/episode_0.hdf5 --repeat 3 --json playback.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.hdf5_model import HDF5Model
+from src.core.playback import MIN_BLOCK_FRAMES, READ_AHEAD_BLOCKS, PlaybackReader
+
+
+def play(file_path, key, frames, use_reader, read_ahead, block_frames):
+    """
+    在新打开的模型上顺序读取一个相机的帧
+
+    Args:
+        file_path: HDF5文件路径
+        key: 图像键
+        frames: 读取的帧数
+        use_reader: 是否使用 PlaybackReader
+        read_ahead: 预读块数
+        block_frames: 每块的最少帧数
+
+    Returns:
+        帧/秒
+    """
+    # 每次都重新打开文件，避免 HDF5 chunk cache 和解码缓存在两种方式之间共享
+    model = HDF5Model(file_path, mode='r')
+    model.image_cache_size = 0
+    reader = PlaybackReader(model, [key], read_ahead, block_frames) if use_reader else None
+    try:
+        started = time.perf_counter()
+        for frame in range(frames):
+            image = reader.get_image(key, frame) if reader else model.get_image(key, frame)
+            if image is None:
+                raise RuntimeError(f"读取失败: {key} 第 {frame} 帧")
+        return frames / (time.perf_counter() - started)
+    finally:
+        if reader:
+            reader.close()
+        model.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比较逐帧读取和按chunk预读的播放吞吐量")
+    parser.add_argument("--file", type=str, required=True, help="HDF5文件路径")
+    parser.add_argument("--frames", type=int, default=None, help="每个相机读取的帧数，默认为全部帧")
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式测量的次数，取中位数")
+    parser.add_argument("--read-ahead", type=int, default=READ_AHEAD_BLOCKS, help="预读块数")
+    parser.add_argument("--block-frames", type=int, default=MIN_BLOCK_FRAMES, help="每块的最少帧数")
+    parser.add_argument("--json", type=str, default=None, help="将结果写入该JSON文件（'-' 表示标准输出）")
+    args = parser.parse_args()
+
+    model = HDF5Model(args.file, mode='r')
+    try:
+        keys = model.get_image_keys()
+        frames = min(args.frames or model.get_frame_count(), model.get_frame_count())
+        chunks = {key: model.file[key].chunks for key in keys}
+    finally:
+        model.close()
+    if not keys or not frames:
+        print(f"{args.file} 中没有图像帧")
+        return 1
+
+    results = []
+    for key in keys:
+        result = {'key': key, 'frames': frames, 'chunks': chunks[key]}
+        for name, use_reader in (('per_frame_fps', False), ('playback_fps', True)):
+            runs = [play(args.file, key, frames, use_reader, args.read_ahead, args.block_frames)
+                    for _ in range(max(args.repeat, 1))]
+            result[name] = statistics.median(runs)
+        result['speedup'] = result['playback_fps'] / result['per_frame_fps']
+        results.append(result)
+
+    if args.json == '-':
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f"{'Camera':<40} {'Chunks':>16} {'Per-frame fps':>14} {'Playback fps':>13} {'Speedup':>8}")
+    print("-" * 95)
+    for result in results:
+        print(f"{result['key']:<40} {str(result['chunks']):>16} {result['per_frame_fps']:>14.1f} "
+              f"{result['playback_fps']:>13.1f} {result['speedup']:>7.2f}x")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {os.path.abspath(args.json)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
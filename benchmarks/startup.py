@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准：在新的解释器中按 main.py 的流程启动界面，测量从启动进程到主窗口首次绘制
+（time-to-first-paint），以及打开指定HDF5文件后第一帧图像绘制完成（time-to-first-frame）的时间
+
+字体与 main.py 一样在创建主窗口之前同步设置，"Font set" 阶段即为字体注册的耗时。
+
+用法示例:
+    python benchmarks/startup.py --file /data/episode_0.hdf5 --repeat 5
+    python benchmarks/startup.py --font /usr/share/fonts/truetype/wqy/wqy-microhei.ttc
+    QT_QPA_PLATFORM=offscreen python benchmarks/startup.py --file /data/episode_0.hdf5 --json startup.json
+"""
+import time
+
+# 子进程中尽早记录时间，之后才导入其它模块
+_STARTED = time.time()
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 报告中的阶段及其说明（相对于父进程启动子进程的时刻）
+STAGES = (
+    ('interpreter', 'Interpreter started'),
+    ('imported', 'main.py imported'),
+    ('font_set', 'Font set'),
+    ('window_shown', 'Window shown'),
+    ('first_paint', 'First paint'),
+    ('file_loaded', 'File loaded'),
+    ('first_frame', 'First frame'),
+)
+
+
+def run_child(file_path, timeout, font_path=None):
+    """子进程：按 main.py 的流程启动界面，将各阶段的时间戳以JSON输出到标准输出"""
+    marks = {'interpreter': _STARTED}
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(REPO_ROOT)
+
+    from PyQt5.QtCore import QObject, QEvent, QTimer
+    from PyQt5.QtWidgets import QApplication, QLabel
+    import main
+    marks['imported'] = time.time()
+
+    class PaintWatcher(QObject):
+        """记录主窗口的首次绘制和第一次绘制带图像的 QLabel"""
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                if 'first_paint' not in marks and obj is window:
+                    marks['first_paint'] = time.time()
+                    if file_path:
+                        QTimer.singleShot(0, load_file)
+                    else:
+                        QTimer.singleShot(0, app.quit)
+                elif ('file_loaded' in marks and 'first_frame' not in marks and isinstance(obj, QLabel)
+                      and obj.pixmap() is not None and not obj.pixmap().isNull()):
+                    # QLabel 在 paintEvent 中绘制图像，之后的事件再记录，使时间包含绘制本身
+                    QTimer.singleShot(0, finish_frame)
+            return False
+
+    def set_font():
+        main.setup_font(font_path)
+        marks['font_set'] = time.time()
+
+    def load_file():
+        window.load_hdf5_file(file_path)
+        marks['file_loaded'] = time.time()
+
+    def finish_frame():
+        if 'first_frame' not in marks:
+            marks['first_frame'] = time.time()
+            app.quit()
+
+    app = QApplication(sys.argv[:1])
+    watcher = PaintWatcher()
+    app.installEventFilter(watcher)
+    set_font()
+    main.setup_locale()
+    app.setStyle("Fusion")
+    window = main.MainWindow()
+    window.show()
+    marks['window_shown'] = time.time()
+    QTimer.singleShot(int(timeout * 1000), app.quit)
+    app.exec_()
+    window.close()
+    print(json.dumps(marks))
+
+
+def measure(file_path, timeout, font_path=None):
+    """
+    启动一次子进程并返回各阶段相对于启动时刻的毫秒数
+
+    Args:
+        file_path: 要打开的HDF5文件，为None时只测量首次绘制
+        timeout: 子进程中界面运行的最长秒数
+        font_path: 字体文件路径，为None时使用 main.py 的默认字体
+
+    Returns:
+        {阶段: 毫秒}，超时未到达的阶段不出现
+    """
+    command = [sys.executable, os.path.abspath(__file__), '--child', '--timeout', str(timeout)]
+    if font_path:
+        command += ['--font', os.path.abspath(font_path)]
+    if file_path:
+        command += ['--file', os.path.abspath(file_path)]
+    launched = time.time()
+    process = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"启动失败:\n{process.stderr}")
+    marks = json.loads(process.stdout.strip().splitlines()[-1])
+    return {stage: (marks[stage] - launched) * 1000 for stage, _ in STAGES if stage in marks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量界面的首次绘制和打开文件后第一帧图像的耗时")
+    parser.add_argument("--file", type=str, default=None, help="启动后打开的HDF5文件，不指定时只测量首次绘制")
+    parser.add_argument("--repeat", type=int, default=3, help="启动次数，取中位数")
+    parser.add_argument("--timeout", type=float, default=60.0, help="每次启动的最长秒数")
+    parser.add_argument("--json", type=str, default=None, help="将结果写入该JSON文件（'-' 表示标准输出）")
+    parser.add_argument("--font", type=str, default=None, help="字体文件路径，默认使用 main.py 的字体")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.file, args.timeout, args.font)
+        return 0
+
+    runs = [measure(args.file, args.timeout, args.font) for _ in range(max(args.repeat, 1))]
+    summary = {}
+    for stage, _ in STAGES:
+        values = [run[stage] for run in runs if stage in run]
+        if values:
+            summary[stage] = {'median_ms': statistics.median(values), 'min_ms': min(values), 'max_ms': max(values)}
+    result = {'file': args.file, 'font': args.font, 'repeat': len(runs),
+              'stages': summary, 'runs': runs}
+
+    if args.json == '-':
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f"{'Stage':<26} {'Median (ms)':>12} {'Min (ms)':>10} {'Max (ms)':>10}")
+    print("-" * 62)
+    for stage, description in STAGES:
+        if stage in summary:
+            s = summary[stage]
+            print(f"{description:<26} {s['median_ms']:>12.1f} {s['min_ms']:>10.1f} {s['max_ms']:>10.1f}")
+    if args.file and 'first_frame' not in summary:
+        print(f"\n{args.timeout:.0f} 秒内没有绘制出图像", file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {os.path.abspath(args.json)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+无界面的基准测试集：在合成数据（见 benchmarks/synthetic.py）上测量打开文件、加载标注段、
+随机和顺序读取帧、保存标注和数据集统计的耗时，结果写入JSON，便于在不同提交之间比较
+
+每项测量重复 --repeat 次取中位数；合成数据由固定的随机种子生成，相同参数下各次运行的数据相同。
+
+用法示例:
+    python benchmarks/suite.py --json bench_main.json
+    python benchmarks/suite.py --json bench_branch.json --compare bench_main.json
+    python benchmarks/suite.py --data /tmp/bench_data --only open sequential --frames 1200
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic import add_episode_arguments, episode_options, make_dataset
+from src.core.annotation_io import build_annotation_json, write_json_atomic
+from src.core.dataset_stats import build_report, find_hdf5_files, scan_dataset
+from src.core.hdf5_model import HDF5Model, open_hdf5_readonly
+from src.core.playback import PlaybackReader
+from src.core.segments import load_label_segments
+
+# 可选的基准项，按运行顺序
+BENCHMARKS = ('open', 'segments', 'random_access', 'sequential', 'save', 'folder_stats')
+
+# 结果格式版本，字段变化时递增
+RESULT_VERSION = 1
+
+# 与 --compare 的结果相比变化超过该比例时标记
+CHANGE_THRESHOLD = 0.10
+
+# 合成数据目录中记录生成参数的文件
+DATA_MARKER = 'synthetic.json'
+
+
+def summarize(runs_ms, items=None, unit='frames'):
+    """汇总多次测量的毫秒数；给出每次处理的数量（帧数或文件数）时同时给出每秒处理的数量"""
+    median = statistics.median(runs_ms)
+    result = {'median_ms': median, 'min_ms': min(runs_ms), 'max_ms': max(runs_ms), 'runs_ms': list(runs_ms)}
+    if items:
+        result['items'] = items
+        result['unit'] = unit
+        result['per_second'] = items / (median / 1000) if median > 0 else 0.0
+    return result
+
+
+def measure(func, repeat):
+    """调用 func 共 repeat 次，返回每次的毫秒数"""
+    runs = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        func()
+        runs.append((time.perf_counter() - started) * 1000)
+    return runs
+
+
+def bench_open(variants, repeat):
+    """构建 HDF5Model（键发现、压缩检测和标注段加载）并关闭"""
+    def open_close(path):
+        HDF5Model(path, mode='r').close()
+
+    return {f'open/{name}': summarize(measure(lambda: open_close(files[0]), repeat))
+            for name, files in variants.items()}
+
+
+def bench_segments(variants, repeat):
+    """从标注列提取时间段（subtask 和 language）"""
+    results = {}
+    for name, files in variants.items():
+        with open_hdf5_readonly(files[0]) as f:
+            for field in ('subtask', 'language'):
+                dataset = f[field]
+                results[f'segments/{name}/{field}'] = summarize(
+                    measure(lambda: load_label_segments(dataset, dataset.shape[0]), repeat))
+    return results
+
+
+def bench_random_access(variants, repeat, samples, seed):
+    """按随机顺序读取并解码各相机的帧（不使用解码缓存）"""
+    results = {}
+    for name, files in variants.items():
+        model = HDF5Model(files[0], mode='r')
+        model.image_cache_size = 0
+        try:
+            keys = model.get_image_keys()
+            frames = random.Random(seed).sample(range(model.get_frame_count()),
+                                                min(samples, model.get_frame_count()))
+
+            def read_all():
+                for frame in frames:
+                    for key in keys:
+                        if model.get_image(key, frame) is None:
+                            raise RuntimeError(f"读取失败: {key} 第 {frame} 帧")
+
+            results[f'random_access/{name}'] = summarize(measure(read_all, repeat), len(frames) * len(keys))
+        finally:
+            model.close()
+    return results
+
+
+def bench_sequential(variants, repeat):
+    """顺序读取第一个相机的全部帧：逐帧 get_image、PlaybackReader 和批量 iter_images"""
+    results = {}
+    for name, files in variants.items():
+        model = HDF5Model(files[0], mode='r')
+        model.image_cache_size = 0
+        try:
+            key = model.get_image_keys()[0]
+            frame_count = model.get_frame_count()
+
+            def per_frame():
+                for frame in range(frame_count):
+                    model.get_image(key, frame)
+
+            def playback():
+                reader = PlaybackReader(model, [key])
+                try:
+                    for frame in range(frame_count):
+                        reader.get_image(key, frame)
+                finally:
+                    reader.close()
+
+            def batched():
+                for _ in model.iter_images(key):
+                    pass
+
+            for method, func in (('get_image', per_frame), ('playback', playback), ('iter_images', batched)):
+                results[f'sequential/{name}/{method}'] = summarize(measure(func, repeat), frame_count)
+        finally:
+            model.close()
+    return results
+
+
+def bench_save(variants, repeat, work_dir):
+    """将 subtask 的时间窗口写回HDF5（整列一次写入）和导出标注JSON"""
+    results = {}
+    for name, files in variants.items():
+        copy_path = os.path.join(work_dir, f'save_{name}.hdf5')
+        shutil.copyfile(files[0], copy_path)
+        model = HDF5Model(copy_path, mode='r')
+        windows = [(start, end, label.upper()) for (start, end), label in
+                   sorted(model.get_languages_for_key('subtask').items())]
+        frame_count = model.get_frame_count()
+        model.close()
+
+        def save_hdf5():
+            model = HDF5Model(copy_path, mode='r+')
+            try:
+                if not model.set_languages_for_key('subtask', windows):
+                    raise RuntimeError("写入标注失败")
+            finally:
+                model.close()
+
+        def save_json():
+            data = build_annotation_json('subtask', windows, frame_count, copy_path)
+            write_json_atomic(os.path.join(work_dir, f'save_{name}.json'), data)
+
+        results[f'save/{name}/hdf5'] = summarize(measure(save_hdf5, repeat))
+        results[f'save/{name}/json'] = summarize(measure(save_json, repeat))
+        os.remove(copy_path)
+    return results
+
+
+def bench_folder_stats(data_dir, repeat, work_dir):
+    """数据集统计：不使用缓存的完整扫描、缓存命中的扫描和生成报告"""
+    files = find_hdf5_files(data_dir)
+    cache_path = os.path.join(work_dir, 'stats_cache.sqlite')
+    records = scan_dataset(files, workers=1, cache_path=cache_path)
+    return {
+        'folder_stats/scan': summarize(measure(lambda: scan_dataset(files, workers=1, use_cache=False), repeat),
+                                       len(files), 'files'),
+        'folder_stats/cached_scan': summarize(
+            measure(lambda: scan_dataset(files, workers=1, cache_path=cache_path), repeat), len(files), 'files'),
+        'folder_stats/report': summarize(measure(lambda: build_report(records, data_dir), repeat)),
+    }
+
+
+def prepare_data(data_dir, args):
+    """
+    生成（或复用）合成数据：compressed 为 --episodes 个JPEG压缩episode，raw 为1个未压缩episode
+
+    Returns:
+        {变体名: 文件列表}
+    """
+    options = episode_options(args)
+    variants = {}
+    for name, compressed, episodes in (('compressed', True, args.episodes), ('raw', False, 1)):
+        if name == 'raw' and args.no_raw:
+            continue
+        folder = os.path.join(data_dir, name)
+        variant_options = dict(options, frames=min(args.raw_frames, args.frames)) if name == 'raw' else options
+        # 生成参数记录在目录中，参数相同时复用已有的数据
+        wanted = dict(variant_options, episodes=episodes, compressed=compressed)
+        marker = os.path.join(folder, DATA_MARKER)
+        existing = None
+        if os.path.isfile(marker):
+            with open(marker, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+        files = find_hdf5_files(folder) if os.path.isdir(folder) else []
+        if existing != wanted or len(files) != episodes:
+            shutil.rmtree(folder, ignore_errors=True)
+            print(f"生成合成数据: {folder}", file=sys.stderr)
+            make_dataset(folder, episodes, compressed=compressed, **variant_options)
+            with open(marker, 'w', encoding='utf-8') as f:
+                json.dump(wanted, f)
+            files = find_hdf5_files(folder)
+        variants[name] = files
+    return variants
+
+
+def git_commit():
+    """当前提交的哈希，不在git仓库中时返回None"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    """打印结果表，给出基准结果时同时打印变化比例"""
+    header = f"{'Benchmark':<36} {'Median (ms)':>12} {'Min (ms)':>10} {'Rate':>16}"
+    if baseline:
+        header += f" {'Baseline (ms)':>14} {'Change':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        rate = f"{result['per_second']:.1f} {result['unit']}/s" if 'per_second' in result else '-'
+        line = f"{name:<36} {result['median_ms']:>12.2f} {result['min_ms']:>10.2f} {rate:>16}"
+        old = (baseline or {}).get(name)
+        if old:
+            change = result['median_ms'] / old['median_ms'] - 1 if old['median_ms'] > 0 else 0.0
+            flag = ' !' if change > CHANGE_THRESHOLD else (' *' if change < -CHANGE_THRESHOLD else '')
+            line += f" {old['median_ms']:>14.2f} {change:>+7.0%}{flag}"
+        elif baseline:
+            line += f" {'-':>14} {'':>8}"
+        print(line)
+    if baseline:
+        print(f"\n! 比基准慢 {CHANGE_THRESHOLD:.0%} 以上，* 比基准快 {CHANGE_THRESHOLD:.0%} 以上")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在合成数据上运行无界面的基准测试")
+    parser.add_argument("--data", type=str, default=None,
+                        help="合成数据目录（不存在或参数不符时重新生成），默认使用临时目录并在结束后删除")
+    parser.add_argument("--only", nargs='+', choices=BENCHMARKS, default=None, help="只运行这些基准项")
+    parser.add_argument("--repeat", type=int, default=3, help="每项测量的次数，取中位数")
+    parser.add_argument("--episodes", type=int, default=4, help="压缩数据的episode数（数据集统计使用全部）")
+    parser.add_argument("--raw-frames", type=int, default=60, help="未压缩episode的最多帧数（原始图像占用空间大）")
+    parser.add_argument("--no-raw", action="store_true", help="不生成和测量未压缩的episode")
+    parser.add_argument("--samples", type=int, default=100, help="随机读取的帧数")
+    parser.add_argument("--json", type=str, default=None, help="将结果写入该JSON文件（'-' 表示标准输出）")
+    parser.add_argument("--compare", type=str, default=None, help="与之前写入的结果JSON比较")
+    add_episode_arguments(parser)
+    parser.set_defaults(frames=300)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous.get('config', {}).get('episode') != episode_options(args):
+            print("注意: 基准结果使用的合成数据参数不同，比较结果仅供参考", file=sys.stderr)
+        baseline = previous.get('results', {})
+
+    data_dir = args.data or tempfile.mkdtemp(prefix='hdf5_bench_data_')
+    work_dir = tempfile.mkdtemp(prefix='hdf5_bench_work_')
+    selected = [name for name in BENCHMARKS if args.only is None or name in args.only]
+    results = {}
+    try:
+        variants = prepare_data(data_dir, args)
+        for name in selected:
+            print(f"运行: {name}", file=sys.stderr)
+            if name == 'open':
+                results.update(bench_open(variants, args.repeat))
+            elif name == 'segments':
+                results.update(bench_segments(variants, args.repeat))
+            elif name == 'random_access':
+                results.update(bench_random_access(variants, args.repeat, args.samples, args.seed))
+            elif name == 'sequential':
+                results.update(bench_sequential(variants, args.repeat))
+            elif name == 'save':
+                results.update(bench_save(variants, args.repeat, work_dir))
+            elif name == 'folder_stats':
+                results.update(bench_folder_stats(os.path.join(data_dir, 'compressed'), args.repeat, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if args.data is None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    output = {
+        'version': RESULT_VERSION,
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'config': {'episode': episode_options(args), 'episodes': args.episodes,
+                   'raw_frames': None if args.no_raw else min(args.raw_frames, args.frames),
+                   'samples': args.samples, 'repeat': args.repeat, 'benchmarks': selected},
+        'results': results,
+    }
+
+    if args.json == '-':
+        json.dump(output, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {os.path.abspath(args.json)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
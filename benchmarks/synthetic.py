@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+合成HDF5 episode 生成器：按实际数据的布局生成可复现的测试数据
+
+布局与采集数据一致：
+    observations/images/<相机>    压缩时为按最长JPEG补零的 (帧数, 最大长度) uint8 行，
+                                  否则为 (帧数, 高, 宽, 3) uint8
+    compress_len                  (相机数, 帧数)，行按非深度相机名排序，文件属性 compress=True
+    observations/images/<相机>_depth  （可选）(帧数, 高, 宽) uint16 深度，单位毫米
+    action/joint_position, action/base_vel, state/joint_position/{left,right}  float32 数组
+    language, subtask             (帧数, 1) UTF-8 字符串，按段标注
+
+用法示例:
+    python benchmarks/synthetic.py --output /tmp/bench_data --episodes 4 --frames 600 --cameras 3
+    python benchmarks/synthetic.py --output /tmp/bench_raw --uncompressed --width 320 --height 240
+"""
+import os
+import sys
+import argparse
+
+import h5py
+import numpy as np
+
+# 默认相机：与采集数据的相机名一致，更多相机时按 cam_extra_N 命名
+CAMERA_NAMES = ('cam_high', 'cam_left_wrist', 'cam_right_wrist', 'cam_low')
+
+# 编码JPEG的质量
+JPEG_QUALITY = 90
+
+# 每个episode的 subtask 段（按顺序循环使用）
+SUBTASKS = ('grab clothes.', 'fold sleeves.', 'fold in half.', 'place folded clothes at top right.')
+
+# 数据集目录下的分类子目录（数据集统计按分类分组）
+CATEGORIES = ('fold_clothes', 'stack_cups')
+
+
+def camera_names(count: int):
+    """返回 count 个相机名"""
+    return [CAMERA_NAMES[i] if i < len(CAMERA_NAMES) else f'cam_extra_{i}' for i in range(count)]
+
+
+def _texture(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    """生成带渐变和纹理的画面（JPEG压缩率接近真实场景，而不是纯色）"""
+    import cv2
+
+    # 24像素左右的纹理尺度：640x480 的画面编码后约 50KB，与实际相机画面相近
+    noise = rng.integers(0, 256, (height // 24 + 2, width // 24 + 2, 3), dtype=np.uint8)
+    texture = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    gradient = np.linspace(0, 96, width, dtype=np.float32)[None, :, None]
+    return np.clip(texture.astype(np.float32) * 0.6 + gradient, 0, 255).astype(np.uint8)
+
+
+def _frames(rng: np.random.Generator, frames: int, width: int, height: int):
+    """逐帧生成一个相机的画面：纹理背景缓慢平移，一个方块在画面中移动"""
+    background = _texture(rng, width, height)
+    color = tuple(int(c) for c in rng.integers(0, 256, 3))
+    size = max(4, min(width, height) // 5)
+    for frame in range(frames):
+        image = np.roll(background, frame * 2, axis=1)
+        x = int((width - size) * (0.5 + 0.5 * np.sin(frame / 25)))
+        y = int((height - size) * (0.5 + 0.5 * np.cos(frame / 40)))
+        image[y:y + size, x:x + size] = color
+        yield image
+
+
+def _segments(frames: int, count: int):
+    """将帧范围均分为 count 段，返回 (start, end) 列表（end 包含在内）"""
+    bounds = np.linspace(0, frames, count + 1).astype(int)
+    return [(int(bounds[i]), int(bounds[i + 1]) - 1) for i in range(count) if bounds[i + 1] > bounds[i]]
+
+
+def _write_labels(f: h5py.File, key: str, frames: int, windows, gap: int = 0):
+    """写入 (帧数, 1) 的UTF-8标注列，每段末尾 gap 帧保持未标注"""
+    column = np.full(frames, '', dtype=object)
+    for start, end, label in windows:
+        column[start:max(start, end - gap) + 1] = label
+    dataset = f.create_dataset(key, (frames, 1), dtype=h5py.string_dtype('utf-8'), fillvalue='')
+    dataset[:, 0] = column
+
+
+def make_episode(path: str, frames: int = 600, cameras: int = 3, width: int = 640, height: int = 480,
+                 compressed: bool = True, depth: bool = False, chunk_frames: int = 0, seed: int = 0) -> dict:
+    """
+    生成一个合成episode
+
+    Args:
+        path: 输出HDF5文件路径
+        frames: 帧数
+        cameras: 彩色相机数
+        width: 画面宽度
+        height: 画面高度
+        compressed: 是否以补零的JPEG行存储（否则存储原始图像）
+        depth: 是否为第一个相机添加 uint16 深度图
+        chunk_frames: 图像数据集每个chunk的帧数，0表示连续存储（不分块）
+        seed: 随机种子，相同参数和种子生成相同的文件
+
+    Returns:
+        path, frames, cameras, compressed, bytes
+    """
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    names = camera_names(cameras)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with h5py.File(path, 'w') as f:
+        f.attrs['compress'] = compressed
+        if compressed:
+            # 先编码全部帧以确定补零后的行长度
+            encoded = {name: [cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])[1].ravel()
+                              for image in _frames(rng, frames, width, height)] for name in names}
+            lengths = np.array([[len(jpeg) for jpeg in encoded[name]] for name in sorted(names)], dtype=np.int64)
+            f.create_dataset('compress_len', data=lengths)
+            row_length = int(lengths.max())
+            for name in names:
+                rows = np.zeros((frames, row_length), dtype=np.uint8)
+                for frame, jpeg in enumerate(encoded[name]):
+                    rows[frame, :len(jpeg)] = jpeg
+                f.create_dataset(f'observations/images/{name}', data=rows,
+                                 chunks=(min(chunk_frames, frames), row_length) if chunk_frames else None)
+        else:
+            for name in names:
+                dataset = f.create_dataset(f'observations/images/{name}', (frames, height, width, 3), dtype=np.uint8,
+                                           chunks=(min(chunk_frames, frames), height, width, 3) if chunk_frames else None)
+                for frame, image in enumerate(_frames(rng, frames, width, height)):
+                    dataset[frame] = image
+        if depth:
+            ramp = np.linspace(400, 3000, width, dtype=np.float32)[None, :]
+            rows = np.arange(height, dtype=np.float32)[:, None]
+            depth_frames = np.empty((frames, height, width), dtype=np.uint16)
+            for frame in range(frames):
+                depth_frames[frame] = ramp + rows * 2 + 200 * np.sin(frame / 30)
+            depth_frames[:, :height // 10] = 0  # 顶部几行为无效深度
+            f.create_dataset(f'observations/images/{names[0]}_depth', data=depth_frames,
+                             chunks=(min(chunk_frames, frames), height, width) if chunk_frames else None)
+
+        t = np.arange(frames, dtype=np.float32)[:, None]
+        f.create_dataset('action/joint_position', data=np.sin(t / 50 + np.arange(14)).astype(np.float32))
+        f.create_dataset('action/base_vel', data=(rng.standard_normal((frames, 2)) * 0.01).astype(np.float32))
+        f.create_dataset('state/joint_position/left', data=np.cos(t / 50 + np.arange(7)).astype(np.float32))
+        f.create_dataset('state/joint_position/right', data=np.cos(t / 60 + np.arange(7)).astype(np.float32))
+
+        subtask_windows = [(start, end, SUBTASKS[i % len(SUBTASKS)])
+                           for i, (start, end) in enumerate(_segments(frames, len(SUBTASKS)))]
+        _write_labels(f, 'subtask', frames, subtask_windows, gap=max(0, frames // 100))
+        _write_labels(f, 'language', frames, [(0, frames - 1, 'fold the clothes and place them at top right.')])
+    return {'path': path, 'frames': frames, 'cameras': names, 'compressed': compressed,
+            'bytes': os.path.getsize(path)}
+
+
+def make_dataset(folder: str, episodes: int = 4, **kwargs) -> list:
+    """
+    在 folder/<分类>/episode_N.hdf5 下生成多个episode（各episode使用不同的随机种子）
+
+    Args:
+        folder: 输出目录
+        episodes: episode数
+        **kwargs: 传给 make_episode 的参数（seed 为第一个episode的种子）
+
+    Returns:
+        每个episode的 make_episode 结果
+    """
+    seed = kwargs.pop('seed', 0)
+    results = []
+    for index in range(episodes):
+        category = CATEGORIES[index % len(CATEGORIES)]
+        path = os.path.join(folder, category, f'episode_{index // len(CATEGORIES)}.hdf5')
+        results.append(make_episode(path, seed=seed + index, **kwargs))
+    return results
+
+
+def add_episode_arguments(parser: argparse.ArgumentParser):
+    """添加生成参数（benchmarks/suite.py 共用）"""
+    parser.add_argument("--frames", type=int, default=600, help="每个episode的帧数")
+    parser.add_argument("--cameras", type=int, default=3, help="彩色相机数")
+    parser.add_argument("--width", type=int, default=640, help="画面宽度")
+    parser.add_argument("--height", type=int, default=480, help="画面高度")
+    parser.add_argument("--depth", action="store_true", help="为第一个相机添加 uint16 深度图")
+    parser.add_argument("--chunk-frames", type=int, default=0, help="图像数据集每个chunk的帧数，0表示不分块")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+
+
+def episode_options(args: argparse.Namespace) -> dict:
+    """从命令行参数得到 make_episode 的参数"""
+    return {'frames': args.frames, 'cameras': args.cameras, 'width': args.width, 'height': args.height,
+            'depth': args.depth, 'chunk_frames': args.chunk_frames, 'seed': args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按实际数据布局生成合成HDF5 episode")
+    parser.add_argument("--output", type=str, required=True, help="输出目录")
+    parser.add_argument("--episodes", type=int, default=4, help="episode数")
+    parser.add_argument("--uncompressed", action="store_true", help="存储原始图像而不是JPEG行")
+    add_episode_arguments(parser)
+    args = parser.parse_args()
+
+    results = make_dataset(args.output, args.episodes, compressed=not args.uncompressed, **episode_options(args))
+    total = sum(result['bytes'] for result in results)
+    for result in results:
+        print(f"{result['path']}  {result['bytes'] / 1024 ** 2:.1f} MB")
+    print(f"\n生成 {len(results)} 个episode，共 {total / 1024 ** 2:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+为文件夹中的所有HDF5文件预先生成低分辨率代理文件（界面勾选"使用低分辨率代理"时读取），不依赖Qt
+
+用法示例:
+    python build_proxies.py --data_folder /data/hdf5 --max-size 50
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+from src.core.dataset_stats import find_hdf5_files
+from src.core.parallel import iter_parallel, resolve_workers
+from src.core.proxy_store import PROXY_HEIGHT, ProxyStore, build_proxy, proxy_file_name
+from src.utils.logger import configure_logging
+
+
+def _build(file_path, root, height, force, threads):
+    """进程池中调用的包装函数"""
+    return build_proxy(file_path, os.path.join(root, proxy_file_name(file_path, height)), height, force, threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="为文件夹中的HDF5文件预先生成低分辨率代理文件")
+    parser.add_argument("--data_folder", type=str, required=True, help="HDF5文件的根目录（递归查找）")
+    parser.add_argument("--height", type=int, default=PROXY_HEIGHT, help="代理图像高度（像素）")
+    parser.add_argument("--max-size", type=float, default=None,
+                        help="所有代理文件的总大小上限（GB），会被记录下来供界面使用；默认沿用已记录的上限")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为CPU核数")
+    parser.add_argument("--force", action="store_true", help="即使代理文件仍然有效也重新生成")
+    parser.add_argument("--debug", action="store_true", help="输出调试日志")
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug)
+
+    if not os.path.isdir(args.data_folder):
+        print(f"文件夹不存在: {args.data_folder}")
+        return 2
+
+    files = find_hdf5_files(args.data_folder)
+    if not files:
+        print(f"{args.data_folder} 中没有找到HDF5文件")
+        return 0
+
+    max_bytes = int(args.max_size * 1024 ** 3) if args.max_size is not None else None
+    store = ProxyStore(max_bytes=max_bytes, height=args.height)
+    # 只有一个进程（或文件很少）时在当前进程中用多线程解码
+    workers = resolve_workers(args.workers)
+    threads = resolve_workers(None) if workers == 1 or len(files) < 2 else 1
+
+    started = time.perf_counter()
+    counts = Counter()
+    built_bytes = 0
+    frames = 0
+    evicted = []
+    try:
+        for done, result in enumerate(iter_parallel(_build, files, store.root, args.height, args.force, threads,
+                                                    workers=workers, threshold=2), 1):
+            counts[result['status']] += 1
+            if result['status'] in ('built', 'fresh'):
+                store.record(result['path'], result['proxy'], result['bytes'])
+                evicted.extend(store.evict(keep=[result['proxy']]))
+                if result['status'] == 'built':
+                    built_bytes += result['bytes']
+                    frames += result['frames']
+            elif result['status'] == 'error':
+                print(f"\n[error] {result['path']}: {result['message']}")
+            if done % 10 == 0 or done == len(files):
+                print(f"\r已处理 {done}/{len(files)}", end="", file=sys.stderr, flush=True)
+        print(file=sys.stderr)
+        total = store.total_bytes()
+    finally:
+        store.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"\n生成 {counts['built']} 个（{built_bytes / 1024 ** 3:.2f} GB，{frames} 帧），"
+          f"已是最新 {counts['fresh']} 个，无需代理 {counts['skipped']} 个，失败 {counts['error']} 个")
+    print(f"代理目录: {store.root}，总大小 {total / 1024 ** 3:.2f} GB / 上限 {store.max_bytes / 1024 ** 3:.2f} GB")
+    if evicted:
+        print(f"超过大小上限，按最近最少使用的顺序删除了 {len(evicted)} 个代理文件（可用 --max-size 提高上限）")
+    print(f"耗时 {elapsed:.2f} 秒，{frames / elapsed:.0f} 帧/秒")
+    return 1 if counts['error'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,99 +1,110 @@
 import os
-import h5py
-import numpy as np
+import sys
+import json
+import time
 import argparse
 from pathlib import Path
-from collections import defaultdict
-
-def get_action_length(hdf5_path):
-    """
-    Opens an HDF5 file and returns the length from the 'compress_len' dataset.
-    """
-    try:
-        with h5py.File(hdf5_path, 'r') as f:
-            if 'action/base_vel' in f:
-                data = f['action/base_vel']
-                return len(data)
-            # 如果没有，再检查 /action
-            elif 'action' in f:
-                data = f['action']
-                return len(data)
-            elif 'state/joint_position/left' in f:
-                data = f['state/joint_position/left']
-                return len(data)
-            elif 'subtask' in f:
-                data = f['subtask']
-                return len(data)
-            else:
-                print(f"[WARN] Neither '/action/base_vel' nor '/action' found in {hdf5_path}")
-                return 0
-    except Exception as e:
-        print(f"[ERROR] Failed to process {hdf5_path}: {e}")
-        return 0
 
+from src.core.dataset_stats import (DEFAULT_LENGTH_KEYS, DEFAULT_PERCENTILES, DEFAULT_SEGMENT_BINS, GROUP_BY_CHOICES,
+                                    find_hdf5_files, scan_dataset, build_report, format_summary_table,
+                                    format_annotation_tables)
+from src.utils.logger import configure_logging
+
+
+def parse_list(text, cast=str):
+    """解析逗号分隔的参数"""
+    return [cast(part.strip()) for part in text.split(',') if part.strip()]
+
+
+def print_report(report, percentiles, top_labels):
+    """以表格形式打印报告"""
+    print(f"\nRoot: {report['root']}")
+    print(f"FPS used for calculation: {report['fps']}")
+    print(f"Total number of HDF5 files: {report['files']}, "
+          f"with valid length: {report['overall']['count']}, errors: {len(report['errors'])}")
+
+    for by in GROUP_BY_CHOICES:
+        if by in report:
+            print(f"\n--- Statistics by {by} ---")
+            print(format_summary_table(by, report[by], percentiles))
+
+    print("\n--- Statistics for All Files ---")
+    print(format_summary_table('all', {'All Files': report['overall']}, percentiles))
+
+    if report['annotation']:
+        print("\n--- Annotation Statistics ---")
+        print(format_annotation_tables(report['annotation'], report['fps'], top_labels))
+
+    if report['errors']:
+        print(f"\n--- Files with errors ({len(report['errors'])}) ---")
+        for item in report['errors']:
+            print(f"[ERROR] {item['path']}: {item['error']}")
 
-def get_all_durations(folders, fps):
-    """Gathers all durations from a list of folders."""
-    all_durations = []
-    for folder in folders:
-        hdf5_files = list(folder.rglob("*.hdf5"))
-        for hdf5_file in hdf5_files:
-            action_length = get_action_length(hdf5_file)
-            if action_length > 0:
-                duration = action_length / fps
-                all_durations.append(duration)
-    return all_durations
-
-def print_category_stats(category_name, durations, fps):
-    """Calculates and prints statistics for a category of folders."""
-    print(f"\n--- Statistics for Category: {category_name} ---")
-    
-    if not durations:
-        print("No valid data found for this category.")
-        print("------------------------------------------")
-        return
-
-    total_files = len(durations)
-    total_duration = np.sum(durations)
-    average_duration = np.mean(durations)
-    median_duration = np.median(durations)
-
-    print(f"FPS used for calculation: {fps}")
-    print(f"Total number of HDF5 files processed: {total_files}")
-    print(f"Total duration: {total_duration:.2f} seconds ({total_duration/60:.2f} minutes)")
-    print(f"Average duration: {average_duration:.2f} seconds")
-    print(f"Median duration: {median_duration:.2f} seconds")
-    print("------------------------------------------")
 
 def main():
-    parser = argparse.ArgumentParser(description="Calculate duration statistics for HDF5 files in a folder (with or without subfolders).")
+    parser = argparse.ArgumentParser(description="Calculate duration and annotation statistics for HDF5 files in a folder (with or without subfolders).")
     parser.add_argument("--data_folder", type=str, default="/Volumes/eai_15/data/pants_data/mobile_aloha_4_wheels", help="Path to the folder containing HDF5 files.")
     parser.add_argument("--fps", type=int, default=15, help="Frames per second (FPS) of the data.")
+    parser.add_argument("--length-keys", type=str, default=",".join(DEFAULT_LENGTH_KEYS),
+                        help="Comma separated datasets used for the episode length, first match wins.")
+    parser.add_argument("--percentiles", type=str, default=",".join(str(p) for p in DEFAULT_PERCENTILES),
+                        help="Comma separated duration percentiles to report.")
+    parser.add_argument("--group-by", type=str, default=",".join(GROUP_BY_CHOICES),
+                        help="Comma separated breakdowns: category (first-level subfolder), folder (parent folder). Empty for none.")
+    parser.add_argument("--segment-bins", type=str, default=",".join(str(b) for b in DEFAULT_SEGMENT_BINS),
+                        help="Comma separated bin edges (seconds) of the annotation segment length histogram.")
+    parser.add_argument("--top-labels", type=int, default=20,
+                        help="Number of most frequent labels printed per annotation field (0 for all).")
+    parser.add_argument("--workers", type=int, default=None, help="Number of scan processes (default: CPU count).")
+    parser.add_argument("--cache", type=str, default=None, help="Path of the SQLite cache (default: user cache dir).")
+    parser.add_argument("--no-cache", action="store_true", help="Rescan every file and do not update the cache.")
+    parser.add_argument("--json", type=str, default=None, help="Write the report as JSON to this path ('-' for stdout).")
+    parser.add_argument("--debug", action="store_true", help="Print debug logs.")
     args = parser.parse_args()
 
+    configure_logging(debug=args.debug)
+
     data_folder = Path(args.data_folder)
     fps = args.fps
+    percentiles = parse_list(args.percentiles, float)
+    group_by = parse_list(args.group_by)
+    unknown = [by for by in group_by if by not in GROUP_BY_CHOICES]
+    if unknown:
+        parser.error(f"unknown --group-by value: {', '.join(unknown)}")
 
     if not data_folder.is_dir():
         print(f"[ERROR] The specified folder does not exist: {data_folder}")
-        return
+        return 1
 
     # 查找当前目录及所有子目录下的hdf5文件（递归）
-    hdf5_files = list(data_folder.rglob("*.hdf5"))
+    hdf5_files = find_hdf5_files(str(data_folder))
     if not hdf5_files:
         print(f"[INFO] No HDF5 files found in {data_folder}.")
-        return
+        return 0
 
-    all_durations = []
-    for hdf5_file in hdf5_files:
-        action_length = get_action_length(hdf5_file)
-        if action_length > 0:
-            duration = action_length / fps
-            all_durations.append(duration)
+    def on_progress(done, total):
+        print(f"\rScanning... {done}/{total}", end="", file=sys.stderr, flush=True)
 
-    print_category_stats("All Files", all_durations, fps)
-    print("\nProcessing finished.\n")
+    started = time.perf_counter()
+    records = scan_dataset(hdf5_files, parse_list(args.length_keys), workers=args.workers,
+                           cache_path=args.cache, use_cache=not args.no_cache, on_progress=on_progress)
+    elapsed = time.perf_counter() - started
+    print(f"\rScanned {len(records)} files in {elapsed:.2f} seconds", file=sys.stderr)
 
-if __name__ == "__main__":
-    main()
+    report = build_report(records, str(data_folder), fps, group_by, percentiles,
+                          sorted(parse_list(args.segment_bins, float)))
+    if args.json == '-':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report, percentiles, args.top_labels)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"\nReport written to {os.path.abspath(args.json)}")
+
+    print("\nProcessing finished.\n", file=sys.stderr if args.json == '-' else sys.stdout)
+    return 0
 
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+批量将HDF5文件中的标注字段导出为标注JSON（与界面"保存为JSON"的格式相同），不依赖Qt
+
+用法示例:
+    python export_annotations.py --data_folder /data/hdf5 --output /data/json --field subtask
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+from src.core.annotation_io import export_episode
+from src.core.dataset_stats import find_hdf5_files
+from src.core.parallel import iter_parallel
+from src.utils.logger import configure_logging
+
+DEFAULT_MAPPING = os.path.join(os.path.dirname(os.path.abspath(__file__)), "phrase_mapping.yaml")
+
+
+def output_path_for(file_path, data_folder, output_folder):
+    """返回HDF5文件对应的JSON路径：在输出目录下保持相对路径，未指定输出目录时与HDF5文件放在一起"""
+    stem = os.path.splitext(file_path)[0]
+    if not output_folder:
+        return stem + ".json"
+    return os.path.join(output_folder, os.path.relpath(stem, data_folder) + ".json")
+
+
+def _export(job, field, mapping_path, force, allow_incomplete):
+    """进程池中调用的包装函数"""
+    file_path, output_path = job
+    return export_episode(file_path, output_path, field, mapping_path, force, allow_incomplete)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量将HDF5文件中的标注字段导出为JSON")
+    parser.add_argument("--data_folder", type=str, required=True, help="HDF5文件的根目录（递归查找）")
+    parser.add_argument("--output", type=str, default=None, help="JSON输出目录（保持相对路径），默认与HDF5文件放在一起")
+    parser.add_argument("--field", type=str, default="subtask", help="要导出的标注字段")
+    parser.add_argument("--mapping", type=str, default=DEFAULT_MAPPING, help="短语映射YAML路径")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为CPU核数")
+    parser.add_argument("--force", action="store_true", help="即使JSON比HDF5文件新也重新导出")
+    parser.add_argument("--allow-incomplete", action="store_true", help="导出未连续覆盖全部帧的标注")
+    parser.add_argument("--debug", action="store_true", help="输出调试日志")
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug)
+
+    if not os.path.isdir(args.data_folder):
+        print(f"文件夹不存在: {args.data_folder}")
+        return 2
+
+    files = find_hdf5_files(args.data_folder)
+    if not files:
+        print(f"{args.data_folder} 中没有找到HDF5文件")
+        return 0
+    jobs = [(path, output_path_for(path, args.data_folder, args.output)) for path in files]
+
+    started = time.perf_counter()
+    counts = Counter()
+    frames = 0
+    problems = []
+    for done, result in enumerate(iter_parallel(_export, jobs, args.field, args.mapping, args.force,
+                                                args.allow_incomplete, workers=args.workers), 1):
+        counts[result['status']] += 1
+        if result['status'] == 'exported':
+            frames += result['frames']
+        if result['status'] in ('incomplete', 'missing', 'error') or result['message']:
+            problems.append(result)
+        if done % 100 == 0 or done == len(jobs):
+            print(f"\r已处理 {done}/{len(jobs)}", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - started
+
+    for result in problems:
+        print(f"[{result['status']}] {result['path']}: {result['message']}")
+
+    print(f"\n导出 {counts['exported']} 个，未变化跳过 {counts['skipped']} 个，"
+          f"标注不完整 {counts['incomplete']} 个，缺少字段 {counts['missing']} 个，失败 {counts['error']} 个")
+    processed = len(jobs) - counts['skipped']
+    print(f"耗时 {elapsed:.2f} 秒，{len(jobs) / elapsed:.1f} 文件/秒"
+          f"（实际读取 {processed} 个，{processed / elapsed:.1f} 文件/秒，{frames / elapsed:.0f} 帧/秒）")
+    return 1 if counts['error'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
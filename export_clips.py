@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+将HDF5文件中标注字段的每个时间窗口导出为视频片段（每个相机一个视频，或多相机拼接为一个视频），不依赖Qt
+
+用法示例:
+    python export_clips.py --data_folder /data/hdf5 --output /data/clips --field subtask
+    python export_clips.py --file episode_0.hdf5 --output clips --window 2 --tiled
+    python export_clips.py --data_folder /data/hdf5 --output /data/clips --format avi --passthrough --no-label
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+from src.core.annotation_io import english_description
+from src.core.clip_export import CLIP_FORMATS, DEFAULT_CLIP_FPS, export_cameras, export_clip, field_windows, plan_clip_jobs
+from src.core.dataset_stats import find_hdf5_files
+from src.core.hdf5_model import HDF5Model
+from src.core.parallel import iter_parallel, resolve_workers
+from src.core.phrase_library import PhraseMapping
+from src.utils.logger import configure_logging
+
+DEFAULT_MAPPING = os.path.join(os.path.dirname(os.path.abspath(__file__)), "phrase_mapping.yaml")
+
+
+def plan_episode(file_path, output_folder, args, phrase_mapping):
+    """读取一个episode的时间窗口和相机，生成导出任务"""
+    model = HDF5Model(file_path, mode='r')
+    try:
+        if args.field not in model.file:
+            return [], f"HDF5中没有字段 '{args.field}'"
+        windows = field_windows(model, args.field)
+        cameras = export_cameras(model)
+    finally:
+        model.close()
+    if args.cameras:
+        wanted = [name.strip() for name in args.cameras.split(',') if name.strip()]
+        cameras = [key for key in cameras if key in wanted or key.split('/')[-1] in wanted]
+        if not cameras:
+            return [], f"没有相机: {args.cameras}"
+    if phrase_mapping is not None:
+        windows = [(start, end, english_description(label, phrase_mapping)) for start, end, label in windows]
+    return plan_clip_jobs(file_path, windows, output_folder, cameras, tiled=args.tiled, fmt=args.format,
+                          burn_label=not args.no_label, passthrough=args.passthrough, fps=args.fps,
+                          window_indices=args.window), ''
+
+
+def _export(job, threads):
+    """进程池中调用的包装函数"""
+    return export_clip(job, threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将标注的时间窗口导出为视频片段")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data_folder", type=str, help="HDF5文件的根目录（递归查找）")
+    source.add_argument("--file", type=str, help="单个HDF5文件")
+    parser.add_argument("--output", type=str, required=True, help="视频输出目录（按数据目录中的相对路径分子目录）")
+    parser.add_argument("--field", type=str, default="subtask", help="标注字段")
+    parser.add_argument("--window", type=int, action="append", default=None,
+                        help="只导出该序号（从0开始）的时间窗口，可重复指定")
+    parser.add_argument("--cameras", type=str, default=None, help="逗号分隔的相机名（如 cam_high），默认全部彩色相机")
+    parser.add_argument("--tiled", action="store_true", help="将所有相机拼接为一个视频")
+    parser.add_argument("--format", choices=CLIP_FORMATS, default="mp4", help="输出格式：mp4 或 avi（MJPEG）")
+    parser.add_argument("--passthrough", action="store_true",
+                        help="avi 格式、单相机且不加文字时直接写入源JPEG数据，不解码。"
+                             "默认重新编码；直接写入的视频红蓝通道与界面显示相反")
+    parser.add_argument("--no-label", action="store_true", help="不在画面上加标注文字")
+    parser.add_argument("--english", action="store_true", help="标注文字使用短语映射中的英文")
+    parser.add_argument("--mapping", type=str, default=DEFAULT_MAPPING, help="短语映射YAML路径（--english 时使用）")
+    parser.add_argument("--fps", type=float, default=DEFAULT_CLIP_FPS, help="视频帧率")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为CPU核数")
+    parser.add_argument("--debug", action="store_true", help="输出调试日志")
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug)
+
+    if args.file:
+        if not os.path.isfile(args.file):
+            print(f"文件不存在: {args.file}")
+            return 2
+        files, data_folder = [args.file], os.path.dirname(os.path.abspath(args.file))
+    else:
+        if not os.path.isdir(args.data_folder):
+            print(f"文件夹不存在: {args.data_folder}")
+            return 2
+        files, data_folder = find_hdf5_files(args.data_folder), args.data_folder
+        if not files:
+            print(f"{args.data_folder} 中没有找到HDF5文件")
+            return 0
+
+    phrase_mapping = PhraseMapping(args.mapping) if args.english else None
+    jobs = []
+    for file_path in files:
+        output_folder = os.path.join(args.output, os.path.relpath(os.path.dirname(os.path.abspath(file_path)),
+                                                                  os.path.abspath(data_folder)))
+        try:
+            episode_jobs, message = plan_episode(file_path, os.path.normpath(output_folder), args, phrase_mapping)
+        except Exception as e:
+            episode_jobs, message = [], str(e)
+        if message:
+            print(f"[skip] {file_path}: {message}")
+        jobs.extend(episode_jobs)
+    if not jobs:
+        print("没有需要导出的时间窗口")
+        return 0
+
+    if args.passthrough:
+        print("警告: --passthrough 直接写入源JPEG数据，视频的红蓝通道与界面显示及重新编码的视频相反")
+
+    # 任务较少时在当前进程中用多线程解码
+    workers = resolve_workers(args.workers)
+    threads = resolve_workers(None) if workers == 1 or len(jobs) < 2 else 1
+
+    started = time.perf_counter()
+    counts = Counter()
+    frames = 0
+    total_bytes = 0
+    for done, result in enumerate(iter_parallel(_export, jobs, threads, workers=workers, threshold=2), 1):
+        counts[result['status']] += 1
+        if result['status'] == 'exported':
+            counts[result['mode']] += 1
+            frames += result['frames']
+            total_bytes += result['bytes']
+        else:
+            print(f"\n[error] {result['output']}: {result['message']}")
+        print(f"\r已导出 {done}/{len(jobs)}", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n导出 {counts['exported']} 个视频（直接写入JPEG {counts['passthrough']} 个，重新编码 {counts['encoded']} 个，"
+          f"{total_bytes / 1024 ** 2:.1f} MB），失败 {counts['error']} 个")
+    print(f"耗时 {elapsed:.2f} 秒，{frames} 帧，{frames / elapsed:.0f} 帧/秒")
+    return 1 if counts['error'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+批量将标注JSON（界面"保存为JSON"或 export_annotations.py 的输出）写入配对的HDF5文件，不依赖Qt
+
+用法示例:
+    python import_annotations.py --json_folder /data/json --hdf5_folder /data/hdf5 --dry-run
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+from src.core.annotation_check import DEFAULT_KEY_PARTS, pair_trees
+from src.core.annotation_io import import_episode
+from src.core.parallel import iter_parallel
+from src.utils.logger import configure_logging
+
+DEFAULT_MAPPING = os.path.join(os.path.dirname(os.path.abspath(__file__)), "phrase_mapping.yaml")
+
+
+def _import(pair, field, mapping_path, dry_run):
+    """进程池中调用的包装函数"""
+    key, hdf5_path, json_path = pair
+    result = import_episode(hdf5_path, json_path, field, mapping_path, dry_run)
+    result['key'] = key
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量将标注JSON写入配对的HDF5文件（按文件名和上两级文件夹配对）")
+    parser.add_argument("--json_folder", type=str, required=True, help="标注JSON的根目录")
+    parser.add_argument("--hdf5_folder", type=str, required=True, help="HDF5文件的根目录")
+    parser.add_argument("--field", type=str, default=None, help="写入的标注字段，默认使用各JSON中记录的字段")
+    parser.add_argument("--key-parts", type=int, default=DEFAULT_KEY_PARTS, help="配对键使用的路径部分数（含文件名）")
+    parser.add_argument("--mapping", type=str, default=DEFAULT_MAPPING, help="短语映射YAML路径")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为CPU核数")
+    parser.add_argument("--dry-run", action="store_true", help="只验证并统计将要写入的文件，不修改HDF5")
+    parser.add_argument("--debug", action="store_true", help="输出调试日志")
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug)
+
+    for folder in (args.json_folder, args.hdf5_folder):
+        if not os.path.isdir(folder):
+            print(f"文件夹不存在: {folder}")
+            return 2
+
+    pairing = pair_trees(args.hdf5_folder, args.json_folder, args.key_parts)
+    pairs = pairing['pairs']
+    for key in pairing['only_in_json']:
+        print(f"[unpaired] {key}: 没有找到对应的HDF5文件")
+    for key, paths in pairing['duplicates'].items():
+        print(f"[duplicate] {key}: {', '.join(paths)}")
+
+    started = time.perf_counter()
+    counts = Counter()
+    frames = 0
+    for done, result in enumerate(iter_parallel(_import, pairs, args.field, args.mapping, args.dry_run,
+                                                workers=args.workers), 1):
+        counts[result['status']] += 1
+        if result['status'] == 'written':
+            frames += result['changed_frames']
+        if result['status'] in ('invalid', 'error'):
+            print(f"[{result['status']}] {result['key']}: {result['message']}")
+        elif result['status'] == 'written' and args.dry_run:
+            print(f"[dry-run] {result['key']}: 将写入 {result['field']}（{result['changed_frames']} 帧变化）")
+        if done % 100 == 0 or done == len(pairs):
+            print(f"\r已处理 {done}/{len(pairs)}", end="", file=sys.stderr, flush=True)
+    if pairs:
+        print(file=sys.stderr)
+    elapsed = time.perf_counter() - started
+
+    written = "将写入" if args.dry_run else "写入"
+    print(f"\n{written} {counts['written']} 个（{frames} 帧变化），未变化跳过 {counts['unchanged']} 个，"
+          f"验证失败 {counts['invalid']} 个，出错 {counts['error']} 个，"
+          f"未配对 {len(pairing['only_in_json'])} 个，配对键重复 {len(pairing['duplicates'])} 个")
+    print(f"耗时 {elapsed:.2f} 秒")
+    return 1 if counts['invalid'] or counts['error'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,72 @@
 import os
+import sys
+import json
 import argparse
 
-def get_all_files_with_parents(root_path, ext):
-    file_set = set()
-    for dirpath, dirnames, filenames in os.walk(root_path):
-        for filename in filenames:
-            if filename.lower().endswith(ext):
-                full_path = os.path.join(dirpath, filename)
-                rel_path = os.path.relpath(full_path, root_path)
-                parts = rel_path.split(os.sep)
-                # 获取上两级文件夹和文件名（不含扩展名）
-                if len(parts) >= 3:
-                    key = os.path.join(parts[-3], parts[-2], os.path.splitext(parts[-1])[0])
-                elif len(parts) == 2:
-                    key = os.path.join(parts[-2], os.path.splitext(parts[-1])[0])
-                else:
-                    key = os.path.splitext(parts[-1])[0]
-                file_set.add(key)
-    return file_set
+from src.core.annotation_check import DEFAULT_KEY_PARTS, check_trees
+from src.utils.logger import configure_logging
+
+
+def print_keys(title, keys, limit):
+    """打印键列表，超过 limit 时只打印前 limit 个"""
+    print(f"{title}（共{len(keys)}个）：")
+    for name in keys[:limit] if limit else keys:
+        print(name)
+    if limit and len(keys) > limit:
+        print(f"... 另有 {len(keys) - limit} 个")
+
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="找出hdf5文件夹中有但json文件夹中没有的文件（按文件名和上两级文件夹匹配）。")
+    parser = argparse.ArgumentParser(description="配对hdf5文件夹与json文件夹中的文件（按文件名和上两级文件夹匹配），并检查每对文件的标注是否一致。")
     parser.add_argument("--hdf5_folder", type=str, default="/media/jz08/HDD/cyf/data/test/hdf5", help="hdf5文件夹路径")
     parser.add_argument("--json_folder", type=str, default="/media/jz08/HDD/cyf/data/test/json", help="json文件夹路径")
+    parser.add_argument("--key-parts", type=int, default=DEFAULT_KEY_PARTS, help="配对键使用的路径部分数（含文件名）")
+    parser.add_argument("--field", type=str, default=None, help="标注字段，默认使用各json中记录的字段")
+    parser.add_argument("--pair-only", action="store_true", help="只配对，不检查文件内容")
+    parser.add_argument("--workers", type=int, default=None, help="检查使用的进程数，默认为CPU核数")
+    parser.add_argument("--report", type=str, default=None, help="将机器可读的报告写入该JSON文件（'-' 表示标准输出）")
+    parser.add_argument("--limit", type=int, default=50, help="每类问题最多打印的条数，0 表示全部打印")
+    parser.add_argument("--debug", action="store_true", help="输出调试日志")
     args = parser.parse_args()
 
-    hdf5_names = get_all_files_with_parents(args.hdf5_folder, ".hdf5")
-    json_names = get_all_files_with_parents(args.json_folder, ".json")
+    configure_logging(debug=args.debug)
 
-    only_in_hdf5 = sorted(hdf5_names - json_names)
-    print(f"在hdf5文件夹中但不在json文件夹中的文件（共{len(only_in_hdf5)}个）：")
-    for name in only_in_hdf5:
-        print(name)
+    for folder in (args.hdf5_folder, args.json_folder):
+        if not os.path.isdir(folder):
+            print(f"文件夹不存在: {folder}")
+            sys.exit(2)
+
+    def on_progress(done, total):
+        print(f"\r已检查 {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    report = check_trees(args.hdf5_folder, args.json_folder, args.key_parts, args.field,
+                         validate=not args.pair_only, workers=args.workers, on_progress=on_progress)
+    if report['checked']:
+        print(file=sys.stderr)
+
+    if args.report == '-':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_keys("在hdf5文件夹中但不在json文件夹中的文件", report['only_in_hdf5'], args.limit)
+        print_keys("\n在json文件夹中但不在hdf5文件夹中的文件", report['only_in_json'], args.limit)
+        if report['duplicates']:
+            print_keys("\n配对键重复的文件（未参与检查）", sorted(report['duplicates']), args.limit)
+
+        print(f"\n配对 {report['pairs']} 对文件，耗时 {report['pairing_seconds']:.2f} 秒")
+        if not args.pair_only:
+            print(f"检查 {report['checked']} 对：一致 {report['consistent']} 对，"
+                  f"不一致 {len(report['inconsistent'])} 对，总耗时 {report['elapsed_seconds']:.2f} 秒")
+            shown = report['inconsistent'][:args.limit] if args.limit else report['inconsistent']
+            for result in shown:
+                print(f"\n{result['key']}")
+                for problem in result['problems']:
+                    print(f"  - {problem}")
+
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"\n报告已写入: {os.path.abspath(args.report)}")
 
+    has_problems = report['only_in_hdf5'] or report['only_in_json'] or report['duplicates'] or report['inconsistent']
+    sys.exit(1 if has_problems else 0)
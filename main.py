@@ -3,16 +3,28 @@
 
 import sys
 import os
+import argparse
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QFont, QFontDatabase
 from PyQt5.QtCore import QTextCodec, QLocale, QCoreApplication, QTranslator
 
 from src.ui.main_window import MainWindow
+from src.utils.logger import configure_logging, LOG_LEVEL_ENV
 
-def setup_font():
-    """设置应用程序字体"""
-    font_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
-    font_path = os.path.join(font_dir, "wqy-microhei.ttc")
+def setup_font(font_path=None):
+    """
+    设置应用程序字体
+
+    在创建主窗口之前同步调用：控件只按最终字体布局一次，显示时不会切换字体，没有中文系统
+    字体时中文也不会先显示为方框。字体注册有意不推迟到窗口显示之后（推迟会在首次绘制后
+    整个窗口重新布局和重绘，而注册本身只有几毫秒，见 benchmarks/startup.py 的 Font set 阶段）。
+
+    Args:
+        font_path: 字体文件路径，为None时使用 fonts/wqy-microhei.ttc
+    """
+    if font_path is None:
+        font_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+        font_path = os.path.join(font_dir, "wqy-microhei.ttc")
     
     if os.path.exists(font_path):
         print(f"加载字体: {font_path}")
@@ -36,12 +48,23 @@ def setup_locale():
     translator = QTranslator()
     QCoreApplication.installTranslator(translator)
 
+def parse_args():
+    """解析命令行参数，未识别的参数留给Qt处理"""
+    parser = argparse.ArgumentParser(description="HDF5文件可视化与标注工具")
+    parser.add_argument("--debug", action="store_true", help="为所有子系统开启调试日志")
+    parser.add_argument("--log-level", default=None,
+                        help=f"日志级别，例如 DEBUG 或 decode=DEBUG,timeline=INFO（默认读取环境变量 {LOG_LEVEL_ENV}）")
+    return parser.parse_known_args()
+
 def main():
     """主函数"""
+    args, qt_args = parse_args()
+    configure_logging(debug=args.debug, spec=args.log_level)
+
     # 创建应用程序
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     
-    # 设置字体和语言
+    # 设置字体和语言（字体在创建主窗口之前设置）
     setup_font()
     setup_locale()
     
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import h5py
+import numpy as np
+
+from src.core.annotation_io import find_annotation_windows, validate_windows, windows_from_entries, windows_to_labels
+from src.core.folder_catalog import natural_sort_key
+from src.core.hdf5_model import open_hdf5_readonly
+from src.core.parallel import iter_parallel
+from src.core.segments import labeled_mask, read_label_column
+
+
+# 配对键默认使用的路径部分数：上两级文件夹和文件名（不含扩展名）
+DEFAULT_KEY_PARTS = 3
+
+# 报告中每对文件最多列出的不一致帧区间数
+MAX_MISMATCH_RANGES = 5
+
+
+def pairing_key(relative_path: str, key_parts: int = DEFAULT_KEY_PARTS) -> str:
+    """
+    返回文件的配对键：相对路径的最后 key_parts 部分，文件名不含扩展名
+
+    Args:
+        relative_path: 相对于根目录的路径
+        key_parts: 使用的路径部分数
+
+    Returns:
+        配对键
+    """
+    parts = relative_path.split(os.sep)[-key_parts:]
+    parts[-1] = os.path.splitext(parts[-1])[0]
+    return os.path.join(*parts)
+
+
+def index_tree(root: str, extension: str, key_parts: int = DEFAULT_KEY_PARTS) -> Dict[str, List[str]]:
+    """
+    遍历一次目录树，按配对键索引指定扩展名的文件
+
+    使用 os.scandir 迭代遍历，只读取目录项，不对文件调用 stat。
+
+    Args:
+        root: 根目录
+        extension: 文件扩展名（不区分大小写），如 ".hdf5"
+        key_parts: 配对键使用的路径部分数
+
+    Returns:
+        {配对键: [文件路径]}，同一个键对应多个文件时列表长度大于1
+    """
+    extension = extension.lower()
+    index = {}
+    root_length = len(os.path.join(root, ''))
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(extension):
+                        index.setdefault(pairing_key(entry.path[root_length:], key_parts), []).append(entry.path)
+        except OSError:
+            continue
+    return index
+
+
+def pair_trees(hdf5_root: str, json_root: str, key_parts: int = DEFAULT_KEY_PARTS) -> Dict[str, Any]:
+    """
+    按配对键将HDF5文件与JSON文件配对
+
+    Args:
+        hdf5_root: HDF5文件的根目录
+        json_root: JSON文件的根目录
+        key_parts: 配对键使用的路径部分数
+
+    Returns:
+        pairs（[(键, HDF5路径, JSON路径)]）, only_in_hdf5, only_in_json（键列表）,
+        duplicates（{键: 路径列表}，这些键不参与配对）
+    """
+    hdf5_index = index_tree(hdf5_root, '.hdf5', key_parts)
+    json_index = index_tree(json_root, '.json', key_parts)
+
+    duplicates = {}
+    for index in (hdf5_index, json_index):
+        for key, paths in index.items():
+            if len(paths) > 1:
+                duplicates.setdefault(key, []).extend(sorted(paths))
+
+    pairs = [(key, hdf5_index[key][0], json_index[key][0])
+             for key in sorted(hdf5_index.keys() & json_index.keys(), key=natural_sort_key) if key not in duplicates]
+    return {
+        'pairs': pairs,
+        'only_in_hdf5': sorted(hdf5_index.keys() - json_index.keys(), key=natural_sort_key),
+        'only_in_json': sorted(json_index.keys() - hdf5_index.keys(), key=natural_sort_key),
+        'duplicates': duplicates,
+    }
+
+
+def _hdf5_frame_count(h5file: h5py.File, field: Optional[str]) -> Optional[int]:
+    """与 HDF5Model 一致，优先使用 observations/images 下第一个数据集的长度，其次使用标注字段的长度"""
+    images = h5file.get('observations/images')
+    if isinstance(images, h5py.Group):
+        for dataset in images.values():
+            if isinstance(dataset, h5py.Dataset) and dataset.ndim > 0:
+                return int(dataset.shape[0])
+    dataset = h5file.get(field) if field else None
+    if isinstance(dataset, h5py.Dataset) and dataset.ndim > 0:
+        return int(dataset.shape[0])
+    return None
+
+
+def _mismatch_ranges(mismatch: np.ndarray) -> List[Tuple[int, int]]:
+    """将不一致的帧号数组合并为连续区间"""
+    if len(mismatch) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(mismatch) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(mismatch)])) - 1
+    return [(int(mismatch[s]), int(mismatch[e])) for s, e in zip(starts, ends)]
+
+
+def check_pair(hdf5_path: str, json_path: str, field: Optional[str] = None) -> Dict[str, Any]:
+    """
+    检查一对HDF5与JSON标注文件是否一致
+
+    检查项：JSON能否解析、total_frames 与HDF5帧数是否一致、时间窗口是否连续覆盖
+    [0, total_frames)、逐帧标注与HDF5标注字段是否一致（空字符串和"0"视为未标注）。
+
+    Args:
+        hdf5_path: HDF5文件路径
+        json_path: JSON文件路径
+        field: 标注字段，为None时使用JSON中记录的字段
+
+    Returns:
+        hdf5, json, field, total_frames, hdf5_frames, windows, mismatched_frames, problems（问题描述列表）
+    """
+    result = {
+        'hdf5': hdf5_path,
+        'json': json_path,
+        'field': field,
+        'total_frames': None,
+        'hdf5_frames': None,
+        'windows': 0,
+        'mismatched_frames': 0,
+        'problems': [],
+    }
+    problems = result['problems']
+
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        json_field, entries = find_annotation_windows(data)
+        windows = windows_from_entries(entries)
+    except Exception as e:
+        problems.append(f"无法读取JSON: {e}")
+        return result
+
+    field = field or json_field
+    result['field'] = field
+    result['windows'] = len(windows)
+    total_frames = data.get('total_frames')
+    result['total_frames'] = total_frames
+    if not field or not windows:
+        problems.append("JSON中没有找到有效的标注数据")
+    if not isinstance(total_frames, int):
+        problems.append("JSON中没有有效的 total_frames")
+        total_frames = None
+    elif windows:
+        is_valid, message = validate_windows(windows, total_frames)
+        if not is_valid:
+            problems.append(message)
+
+    try:
+        with open_hdf5_readonly(hdf5_path) as f:
+            hdf5_frames = _hdf5_frame_count(f, field)
+            result['hdf5_frames'] = hdf5_frames
+            if total_frames is not None and hdf5_frames is not None and hdf5_frames != total_frames:
+                problems.append(f"total_frames ({total_frames}) 与HDF5帧数 ({hdf5_frames}) 不一致")
+
+            dataset = f.get(field) if field else None
+            if field and not isinstance(dataset, h5py.Dataset):
+                problems.append(f"HDF5中没有标注字段 '{field}'")
+            elif dataset is not None and total_frames is not None:
+                hdf5_labels = read_label_column(dataset, total_frames)
+                json_labels = windows_to_labels(windows, total_frames)
+                hdf5_labels[~labeled_mask(hdf5_labels)] = ''
+                json_labels[~labeled_mask(json_labels)] = ''
+                mismatch = np.flatnonzero(hdf5_labels != json_labels)
+                result['mismatched_frames'] = int(len(mismatch))
+                if len(mismatch):
+                    ranges = _mismatch_ranges(mismatch)
+                    first = int(mismatch[0])
+                    shown = ", ".join(f"{s}-{e}" for s, e in ranges[:MAX_MISMATCH_RANGES])
+                    if len(ranges) > MAX_MISMATCH_RANGES:
+                        shown += f" 等 {len(ranges)} 个区间"
+                    problems.append(f"{len(mismatch)} 帧的标注与HDF5字段不一致 ({shown})，第 {first} 帧 "
+                                    f"JSON '{json_labels[first]}' / HDF5 '{hdf5_labels[first]}'")
+    except Exception as e:
+        problems.append(f"无法读取HDF5: {e}")
+    return result
+
+
+def _check_pair_args(pair: Tuple[str, str, str], field: Optional[str]) -> Dict[str, Any]:
+    """进程池中调用的包装函数"""
+    key, hdf5_path, json_path = pair
+    result = check_pair(hdf5_path, json_path, field)
+    result['key'] = key
+    return result
+
+
+def check_trees(hdf5_root: str, json_root: str, key_parts: int = DEFAULT_KEY_PARTS, field: Optional[str] = None,
+                validate: bool = True, workers: Optional[int] = None,
+                on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    配对两个目录树中的文件并逐对检查一致性
+
+    Args:
+        hdf5_root: HDF5文件的根目录
+        json_root: JSON文件的根目录
+        key_parts: 配对键使用的路径部分数
+        field: 标注字段，为None时使用各JSON中记录的字段
+        validate: 为False时只配对，不打开文件
+        workers: 进程池大小，为None时使用CPU核数
+        on_progress: 进度回调 (已检查数, 总数)
+
+    Returns:
+        机器可读的报告：配对结果、检查统计和有问题的文件对
+    """
+    started = time.perf_counter()
+    pairing = pair_trees(hdf5_root, json_root, key_parts)
+    pairs = pairing['pairs']
+    pairing_seconds = time.perf_counter() - started
+
+    failed = []
+    checked = 0
+    if validate:
+        for result in iter_parallel(_check_pair_args, pairs, field, workers=workers):
+            checked += 1
+            if result['problems']:
+                failed.append(result)
+            if on_progress and (checked % 1000 == 0 or checked == len(pairs)):
+                on_progress(checked, len(pairs))
+
+    return {
+        'hdf5_root': os.path.abspath(hdf5_root),
+        'json_root': os.path.abspath(json_root),
+        'key_parts': key_parts,
+        'pairs': len(pairs),
+        'only_in_hdf5': pairing['only_in_hdf5'],
+        'only_in_json': pairing['only_in_json'],
+        'duplicates': pairing['duplicates'],
+        'checked': checked,
+        'consistent': checked - len(failed),
+        'inconsistent': failed,
+        'pairing_seconds': pairing_seconds,
+        'elapsed_seconds': time.perf_counter() - started,
+    }
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.hdf5_model import HDF5Model
+from src.core.phrase_library import PhraseMapping
+from src.core.segments import labeled_mask, read_label_column
+
+
+# 标注JSON中不是标注字段的键
+RESERVED_KEYS = ('total_frames', 'annotation_field', 'created_time', 'source_file')
+
+# created_time 的格式，对应界面中 QDateTime 的 "ddd MMM dd hh:mm:ss yyyy"
+CREATED_TIME_FORMAT = "%a %b %d %H:%M:%S %Y"
+
+# 每个进程中按路径缓存的短语映射
+_phrase_mappings = {}
+
+
+def find_annotation_windows(data: Dict[str, Any]) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """
+    在标注JSON中查找标注字段及其时间窗口
+
+    依次使用 annotation_field 指定的字段、旧格式的 annotations 字段，
+    以及第一个元素含有 start_frame 的列表字段。
+
+    Args:
+        data: 解析后的JSON对象
+
+    Returns:
+        (字段名, 时间窗口列表)，没有找到时为 (None, [])
+    """
+    if "annotation_field" in data:
+        field = data["annotation_field"]
+        return field, data.get(field, [])
+    if "annotations" in data:
+        return "annotations", data["annotations"]
+    for key, value in data.items():
+        if (isinstance(value, list) and key not in RESERVED_KEYS
+                and len(value) > 0 and isinstance(value[0], dict) and "start_frame" in value[0]):
+            return key, value
+    return None, []
+
+
+def windows_from_entries(entries: Sequence[Dict[str, Any]]) -> List[Tuple[int, int, str]]:
+    """将JSON中的时间窗口条目转换为 (start, end, description)"""
+    return [(int(e["start_frame"]), int(e["end_frame"]), e.get("description", "")) for e in entries]
+
+
+def validate_windows(windows: Sequence[Sequence[Any]], total_frames: int) -> Tuple[bool, str]:
+    """
+    验证时间窗口是否满足保存条件：
+    1. 所有时间窗口相连（无间隙）
+    2. 没有重合
+    3. 覆盖整个时间范围（从0到total_frames-1）
+
+    Args:
+        windows: (start, end, description) 列表
+        total_frames: 总帧数
+
+    Returns:
+        (is_valid, error_message): 是否有效和错误信息
+    """
+    if not windows:
+        return False, "没有时间窗口需要保存"
+
+    # 按开始帧排序
+    sorted_windows = sorted(windows, key=lambda x: x[0])
+
+    # 检查是否从0开始
+    if sorted_windows[0][0] != 0:
+        return False, f"时间窗口必须从第0帧开始，当前从第{sorted_windows[0][0]}帧开始"
+
+    # 检查是否覆盖到最后一帧
+    if sorted_windows[-1][1] != total_frames - 1:
+        return False, f"时间窗口必须覆盖到最后一帧({total_frames - 1})，当前到第{sorted_windows[-1][1]}帧"
+
+    # 检查相连性和重合性
+    for i in range(len(sorted_windows)):
+        current_start, current_end = sorted_windows[i][0], sorted_windows[i][1]
+
+        # 检查当前窗口的有效性
+        if current_start > current_end:
+            return False, f"时间窗口{i+1}的起始帧({current_start})大于结束帧({current_end})"
+
+        # 检查与下一个窗口的连接
+        if i < len(sorted_windows) - 1:
+            next_start, next_end = sorted_windows[i + 1][0], sorted_windows[i + 1][1]
+            # 检查是否重合（虽然按开始帧排序后理论上不会重合，但还是要检查）
+            if current_end >= next_start:
+                return False, f"时间窗口{i+1}({current_start}-{current_end})与时间窗口{i+2}({next_start}-{next_end})重合"
+
+            # 检查是否相连（当前窗口结束帧+1应该等于下一个窗口开始帧）
+            if current_end + 1 != next_start:
+                return False, f"时间窗口{i+1}({current_start}-{current_end})与时间窗口{i+2}({next_start}-{next_end})不相连，中间有间隙"
+
+    # 检查是否有重复的时间窗口
+    window_ranges = [(w[0], w[1]) for w in windows]
+    if len(window_ranges) != len(set(window_ranges)):
+        return False, "存在重复的时间窗口"
+
+    return True, "验证通过"
+
+
+def windows_to_labels(windows: Sequence[Sequence[Any]], total_frames: int) -> np.ndarray:
+    """
+    将时间窗口展开为逐帧的标注数组
+
+    Args:
+        windows: (start, end, description) 列表
+        total_frames: 总帧数
+
+    Returns:
+        长度为 total_frames 的 object 数组，未覆盖的帧为空字符串；超出范围的部分被截断
+    """
+    labels = np.full(total_frames, '', dtype=object)
+    for start, end, description in windows:
+        start = max(int(start), 0)
+        end = min(int(end), total_frames - 1)
+        if start <= end:
+            labels[start:end + 1] = description.strip() if description else ''
+    return labels
+
+
+def english_description(label: str, phrase_mapping: PhraseMapping) -> str:
+    """
+    返回保存到JSON中的英文描述
+
+    与界面的往返转换一致：HDF5中的英文先映射为中文显示，保存时再映射回英文；
+    没有映射时使用原文。
+
+    Args:
+        label: HDF5中的标注文本
+        phrase_mapping: 短语映射
+
+    Returns:
+        英文描述
+    """
+    chinese = phrase_mapping.get_chinese_translation(label) or label
+    return phrase_mapping.get_english_translation(chinese) or chinese
+
+
+def build_annotation_json(field: str, windows: Sequence[Sequence[Any]], total_frames: int, source_file: str,
+                          created_time: Optional[str] = None) -> Dict[str, Any]:
+    """
+    构建标注JSON对象
+
+    Args:
+        field: 标注字段名，同时作为时间窗口列表的键
+        windows: (start, end, description) 列表，description 应已转换为英文
+        total_frames: 总帧数
+        source_file: 来源HDF5文件路径
+        created_time: 创建时间文本，为None时使用当前时间
+
+    Returns:
+        可直接写入JSON的字典
+    """
+    annotations = [{
+        "start_frame": start,
+        "end_frame": end,
+        "description": description,  # 只保存英文标注
+        "duration_frames": end - start + 1
+    } for start, end, description in windows]
+    return {
+        "total_frames": total_frames,
+        field: annotations,  # 使用选择的字段名作为键
+        "annotation_field": field,  # 记录标注字段名
+        "created_time": created_time or time.strftime(CREATED_TIME_FORMAT),
+        "source_file": source_file
+    }
+
+
+def write_json_atomic(path: str, data: Dict[str, Any]):
+    """先写入临时文件再替换，避免中断时留下不完整的JSON"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _exported_field(path: str) -> Optional[str]:
+    """返回已导出的标注JSON中记录的字段名，无法读取时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('annotation_field')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _get_phrase_mapping(mapping_path: str) -> PhraseMapping:
+    if mapping_path not in _phrase_mappings:
+        _phrase_mappings[mapping_path] = PhraseMapping(mapping_path)
+    return _phrase_mappings[mapping_path]
+
+
+def export_episode(file_path: str, output_path: str, field: str, mapping_path: str = "phrase_mapping.yaml",
+                   force: bool = False, allow_incomplete: bool = False) -> Dict[str, Any]:
+    """
+    将一个HDF5文件中某个标注字段导出为标注JSON
+
+    输出文件比HDF5文件新、且记录的字段与 field 相同时跳过（force 为True时除外）。与界面保存一样，
+    时间窗口不连续覆盖全部帧时不导出（allow_incomplete 为True时除外）。
+
+    Args:
+        file_path: HDF5文件路径
+        output_path: JSON输出路径
+        field: 标注字段名
+        mapping_path: 短语映射YAML路径
+        force: 是否忽略输出文件的修改时间
+        allow_incomplete: 是否导出未完整覆盖的标注
+
+    Returns:
+        path, output, status（exported/skipped/incomplete/missing/error）, frames, windows, message
+    """
+    result = {'path': file_path, 'output': output_path, 'status': 'error', 'frames': 0, 'windows': 0, 'message': ''}
+    try:
+        # 输出文件名不包含字段名，之前导出的是其它字段时需要重新导出
+        if (not force and os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(file_path)
+                and _exported_field(output_path) == field):
+            result['status'] = 'skipped'
+            return result
+
+        model = HDF5Model(file_path, mode='r')
+        try:
+            if field not in model.file:
+                result['status'] = 'missing'
+                result['message'] = f"HDF5中没有字段 '{field}'"
+                return result
+            total_frames = model.get_frame_count()
+            segments = model.get_languages_for_key(field)
+        finally:
+            model.close()
+
+        phrase_mapping = _get_phrase_mapping(mapping_path)
+        windows = [(start, end, english_description(label, phrase_mapping))
+                   for (start, end), label in sorted(segments.items())]
+        result['frames'] = total_frames
+        result['windows'] = len(windows)
+
+        is_valid, message = validate_windows(windows, total_frames)
+        if not is_valid and not allow_incomplete:
+            result['status'] = 'incomplete'
+            result['message'] = message
+            return result
+
+        write_json_atomic(output_path, build_annotation_json(field, windows, total_frames, file_path))
+        result['status'] = 'exported'
+        result['message'] = '' if is_valid else message
+    except Exception as e:
+        result['message'] = str(e)
+    return result
+
+
+def import_episode(hdf5_path: str, json_path: str, field: Optional[str] = None,
+                   mapping_path: str = "phrase_mapping.yaml", dry_run: bool = False) -> Dict[str, Any]:
+    """
+    将一个标注JSON写入对应的HDF5文件
+
+    写入前验证时间窗口是否连续覆盖全部帧、total_frames 是否与HDF5帧数一致；
+    写入后的标注与HDF5中已有的标注逐帧相同时跳过。写入为整列一次写入，
+    失败时恢复原有数据。
+
+    Args:
+        hdf5_path: HDF5文件路径
+        json_path: 标注JSON路径
+        field: 写入的标注字段，为None时使用JSON中记录的字段
+        mapping_path: 短语映射YAML路径
+        dry_run: 为True时只检查，不写入（以只读方式打开HDF5）
+
+    Returns:
+        hdf5, json, field, status（written/unchanged/invalid/error）, windows, changed_frames, message
+    """
+    result = {'hdf5': hdf5_path, 'json': json_path, 'field': field, 'status': 'error',
+              'windows': 0, 'changed_frames': 0, 'message': ''}
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        json_field, entries = find_annotation_windows(data)
+        field = field or json_field
+        result['field'] = field
+        total_frames = data.get('total_frames')
+        if not field or not entries:
+            result['status'] = 'invalid'
+            result['message'] = "JSON中没有找到有效的标注数据"
+            return result
+        if not isinstance(total_frames, int):
+            result['status'] = 'invalid'
+            result['message'] = "JSON中没有有效的 total_frames"
+            return result
+
+        phrase_mapping = _get_phrase_mapping(mapping_path)
+        windows = [(start, end, english_description(description, phrase_mapping) if description else '')
+                   for start, end, description in windows_from_entries(entries)]
+        result['windows'] = len(windows)
+        is_valid, message = validate_windows(windows, total_frames)
+        if not is_valid:
+            result['status'] = 'invalid'
+            result['message'] = message
+            return result
+
+        model = HDF5Model(hdf5_path, mode='r' if dry_run else 'r+')
+        try:
+            if model.get_frame_count() != total_frames:
+                result['status'] = 'invalid'
+                result['message'] = f"total_frames ({total_frames}) 与HDF5帧数 ({model.get_frame_count()}) 不一致"
+                return result
+
+            # 与整列写入相同：没有描述的窗口保留原有值
+            dataset = model.file.get(field)
+            current = (read_label_column(dataset, total_frames) if dataset is not None
+                       else np.full(total_frames, '', dtype=object))
+            expected = current.copy()
+            for start, end, description in windows:
+                if description:
+                    expected[start:end + 1] = description.strip()
+            current[~labeled_mask(current)] = ''
+            expected[~labeled_mask(expected)] = ''
+            changed = int(np.count_nonzero(current != expected))
+            result['changed_frames'] = changed
+            if dataset is not None and changed == 0:
+                result['status'] = 'unchanged'
+                return result
+
+            if not dry_run and not model.set_languages_for_key(field, windows):
+                result['message'] = f"写入字段 '{field}' 失败，已恢复原有数据"
+                return result
+            result['status'] = 'written'
+        finally:
+            model.close()
+    except Exception as e:
+        result['message'] = str(e)
+    return result
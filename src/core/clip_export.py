@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import struct
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.compositor import TileCompositor
+from src.core.hdf5_model import HDF5Model
+
+
+# 导出视频的默认帧率
+DEFAULT_CLIP_FPS = 30
+
+# 支持的输出格式：mp4（OpenCV 的 mp4v 编码）和 avi（MJPEG）
+CLIP_FORMATS = ('mp4', 'avi')
+
+# 重新编码为 MJPEG 时的 JPEG 质量
+MJPEG_QUALITY = 90
+
+# 标注文字条的高度占画面高度的比例（不小于 MIN_BANNER_HEIGHT 像素）
+BANNER_RATIO = 0.08
+MIN_BANNER_HEIGHT = 20
+
+
+class AviMjpegWriter:
+    """
+    将已编码的JPEG帧直接写入 MJPEG AVI 文件（不解码、不重新编码）
+
+    只写入单个视频流和 idx1 索引（不支持 OpenDML），单个文件不能超过 1 GiB。
+    """
+
+    MAX_BYTES = 1 << 30
+
+    def __init__(self, path: str, width: int, height: int, fps: float):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames = 0
+        self._index = []  # [(相对 movi 的偏移, 长度)]
+        self._max_frame = 0
+        self._file = open(path, 'wb')
+        self._write_headers()
+
+    def _write_headers(self):
+        f = self._file
+        f.write(b'RIFF\0\0\0\0AVI ')
+        f.write(b'LIST' + struct.pack('<I', 4 + 64 + 12 + 64 + 48) + b'hdrl')
+        self._avih_pos = f.tell()
+        f.write(b'avih' + struct.pack('<I', 56) + bytes(56))
+        f.write(b'LIST' + struct.pack('<I', 4 + 64 + 48) + b'strl')
+        self._strh_pos = f.tell()
+        f.write(b'strh' + struct.pack('<I', 56) + bytes(56))
+        f.write(b'strf' + struct.pack('<IIiiHH4sIiiII', 40, 40, self.width, self.height, 1, 24, b'MJPG',
+                                      self.width * self.height * 3, 0, 0, 0, 0))
+        self._movi_pos = f.tell()
+        f.write(b'LIST\0\0\0\0movi')
+        self._update_headers()
+
+    def _update_headers(self):
+        """写入（或更新）依赖帧数和最大帧大小的头部字段"""
+        f = self._file
+        position = f.tell()
+        scale, rate = 1000, int(round(self.fps * 1000))
+        f.seek(self._avih_pos + 8)
+        f.write(struct.pack('<IIIIIIIIII16x', int(round(1e6 / self.fps)), 0, 0, 0x10, self.frames, 0, 1,
+                            self._max_frame, self.width, self.height))
+        f.seek(self._strh_pos + 8)
+        f.write(struct.pack('<4s4sIHHIIIIIIiIhhhh', b'vids', b'MJPG', 0, 0, 0, 0, scale, rate, 0, self.frames,
+                            self._max_frame, -1, 0, 0, 0, self.width, self.height))
+        f.seek(position)
+
+    def write(self, jpeg: np.ndarray):
+        """写入一帧JPEG数据"""
+        data = jpeg.tobytes() if isinstance(jpeg, np.ndarray) else bytes(jpeg)
+        if self._file.tell() + len(data) > self.MAX_BYTES:
+            raise RuntimeError("MJPEG AVI 文件超过 1 GiB")
+        self._index.append((self._file.tell() - self._movi_pos - 8, len(data)))
+        self._file.write(b'00dc' + struct.pack('<I', len(data)) + data)
+        if len(data) % 2:
+            self._file.write(b'\0')
+        self._max_frame = max(self._max_frame, len(data))
+        self.frames += 1
+
+    def close(self):
+        """写入索引并补全各级长度"""
+        if self._file is None:
+            return
+        f = self._file
+        movi_end = f.tell()
+        f.write(b'idx1' + struct.pack('<I', 16 * len(self._index)))
+        for offset, size in self._index:
+            f.write(b'00dc' + struct.pack('<III', 0x10, offset, size))
+        end = f.tell()
+        f.seek(self._movi_pos + 4)
+        f.write(struct.pack('<I', movi_end - self._movi_pos - 8))
+        f.seek(4)
+        f.write(struct.pack('<I', end - 8))
+        f.seek(end)
+        self._update_headers()
+        f.close()
+        self._file = None
+
+
+def field_windows(model: HDF5Model, field: str) -> List[Tuple[int, int, str]]:
+    """返回标注字段中有标注的时间窗口 (start, end, 标注)，按开始帧排序"""
+    return [(start, end, label) for (start, end), label in sorted(model.get_languages_for_key(field).items())
+            if label]
+
+
+def export_cameras(model: HDF5Model) -> List[str]:
+    """可导出为视频的相机：除深度图以外的图像键"""
+    return [key for key in model.get_image_keys() if "_depth" not in key]
+
+
+def _slug(text: str, limit: int = 40) -> str:
+    """将标注转换为可用作文件名的片段"""
+    slug = re.sub(r'[^\w\-]+', '_', text, flags=re.UNICODE).strip('_')
+    return slug[:limit] or 'clip'
+
+
+def plan_clip_jobs(file_path: str, windows: Sequence[Sequence[Any]], output_dir: str,
+                   cameras: Sequence[str], tiled: bool = False, fmt: str = 'mp4',
+                   burn_label: bool = True, passthrough: bool = False, fps: float = DEFAULT_CLIP_FPS,
+                   window_indices: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+    """
+    为一个episode的时间窗口生成导出任务：每个窗口每个相机一个任务，拼接时每个窗口一个任务
+
+    Args:
+        file_path: HDF5文件路径
+        windows: (start, end, 标注) 列表，end 包含在内
+        output_dir: 输出目录（文件名为 <episode>_wNN_<start>-<end>_<相机>.<格式>）
+        cameras: 导出的相机（见 export_cameras）
+        tiled: 是否将所有相机拼接为一个视频
+        fmt: 输出格式，mp4 或 avi
+        burn_label: 是否在画面顶部加上标注文字
+        passthrough: 是否在可能时直接写入源JPEG数据（仅 avi、单相机、不加文字时；红蓝通道与界面显示相反）
+        fps: 帧率
+        window_indices: 只导出这些序号的窗口，为None时导出全部
+
+    Returns:
+        任务列表，传给 export_clip
+    """
+    if fmt not in CLIP_FORMATS:
+        raise ValueError(f"不支持的格式: {fmt}，可选 {', '.join(CLIP_FORMATS)}")
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    jobs = []
+    for index, (start, end, label) in enumerate(windows):
+        if window_indices is not None and index not in window_indices:
+            continue
+        groups = [(list(cameras), 'tiled')] if tiled else [([key], key.split('/')[-1]) for key in cameras]
+        for keys, name in groups:
+            output = os.path.join(output_dir, f"{stem}_w{index:02d}_{start}-{end}_{_slug(label)}_{name}.{fmt}")
+            jobs.append({'path': file_path, 'output': output, 'start': int(start), 'end': int(end),
+                         'label': label, 'cameras': keys, 'tiled': tiled, 'format': fmt,
+                         'burn_label': burn_label, 'passthrough': passthrough, 'fps': fps})
+    return jobs
+
+
+def export_clip(job: Dict[str, Any], threads: int = 1) -> Dict[str, Any]:
+    """
+    导出一个视频片段
+
+    源数据为JPEG、输出为 avi、单相机且不加文字时直接写入JPEG数据（passthrough），
+    否则解码后重新编码。界面把解码结果按 RGB 显示（见 MainWindow.display_image_in_label），
+    重新编码时交换通道，使视频的颜色与界面显示一致；直接写入时保持源数据不变，
+    因此直接写入的视频与界面显示（及重新编码的视频）相比红蓝通道相反，交换通道必须解码。
+
+    Args:
+        job: plan_clip_jobs 生成的任务
+        threads: 解码线程数
+
+    Returns:
+        path, output, status（exported/error）, mode（passthrough/encoded）, frames, bytes, seconds, message
+    """
+    import cv2
+
+    started = time.perf_counter()
+    result = {'path': job['path'], 'output': job['output'], 'status': 'error', 'mode': 'encoded', 'frames': 0,
+              'bytes': 0, 'seconds': 0.0, 'message': ''}
+    tmp_path = job['output'] + '.tmp.' + job['format']
+    writer = None
+    try:
+        model = HDF5Model(job['path'], mode='r')
+        try:
+            start, end = job['start'], min(job['end'], model.get_frame_count() - 1)
+            if start > end:
+                raise ValueError(f"时间窗口 [{job['start']}, {job['end']}] 超出帧范围")
+            cameras = job['cameras']
+            missing = [key for key in cameras if key not in model.get_image_keys()]
+            if missing or not cameras:
+                raise ValueError(f"没有相机: {', '.join(missing) or '（无可导出的相机）'}")
+            os.makedirs(os.path.dirname(os.path.abspath(job['output'])), exist_ok=True)
+
+            key = cameras[0]
+            if (job['passthrough'] and job['format'] == 'avi' and not job['tiled'] and not job['burn_label']
+                    and model.get_compressed_frame(key, start) is not None):
+                result['mode'] = 'passthrough'
+                first = model.get_image(key, start)
+                writer = AviMjpegWriter(tmp_path, first.shape[1], first.shape[0], job['fps'])
+                for frame in range(start, end + 1):
+                    jpeg = model.get_compressed_frame(key, frame)
+                    if jpeg is None:
+                        raise ValueError(f"{key} 第 {frame} 帧不是有效的JPEG数据")
+                    writer.write(jpeg)
+                    result['frames'] += 1
+            else:
+                streams = [model.iter_images(k, start, end + 1, threads=threads) for k in cameras]
+                compositor = None
+                for frames in zip(*streams):
+                    frame = frames[0][0]
+                    images = [image for _, image in frames]
+                    if any(image is None or image.ndim != 3 for image in images):
+                        raise ValueError(f"第 {frame} 帧无法解码为彩色图像")
+                    if compositor is None:
+                        # 拼接时所有相机使用第一个相机的画面尺寸，宽高比不同的画面加黑边
+                        height, width = images[0].shape[:2]
+                        compositor = TileCompositor((width, height), len(images), swap_rb=True)
+                        if job['burn_label']:
+                            text_height = max(MIN_BANNER_HEIGHT, int(height * BANNER_RATIO))
+                            compositor.set_banner(f"{job['label']}  [{start}-{end}]", text_height)
+                            if job['tiled']:
+                                compositor.set_tile_labels([key.split('/')[-1] for key in cameras], text_height)
+                    image = compositor.compose(images)
+                    if writer is None:
+                        writer = _open_encoder(tmp_path, job['format'], image.shape[1], image.shape[0], job['fps'])
+                    if isinstance(writer, AviMjpegWriter):
+                        writer.write(cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, MJPEG_QUALITY])[1])
+                    else:
+                        writer.write(image)
+                    result['frames'] += 1
+        finally:
+            model.close()
+        if writer is not None:
+            _close_writer(writer)
+            writer = None
+        os.replace(tmp_path, job['output'])
+        result['status'] = 'exported'
+        result['bytes'] = os.path.getsize(job['output'])
+    except Exception as e:
+        result['message'] = str(e)
+    finally:
+        if writer is not None:
+            _close_writer(writer)
+        if result['status'] != 'exported' and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def _open_encoder(path: str, fmt: str, width: int, height: int, fps: float):
+    """打开重新编码用的写入器：avi 为 MJPEG，mp4 使用 OpenCV 的 mp4v 编码"""
+    if fmt == 'avi':
+        return AviMjpegWriter(path, width, height, fps)
+    import cv2
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError("OpenCV 无法创建 mp4 视频（缺少编码器），请改用 avi 格式")
+    return writer
+
+
+def _close_writer(writer):
+    if isinstance(writer, AviMjpegWriter):
+        writer.close()
+    else:
+        writer.release()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+import math
+import os
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# 文字层的底色不透明度（文字本身不透明）
+OVERLAY_BACKGROUND_ALPHA = 0.55
+
+# 文字使用的字体：项目 fonts 目录中的字体优先，其次是常见的系统中文字体
+FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'fonts')
+SYSTEM_FONTS = (
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    'C:/Windows/Fonts/msyh.ttc',
+    '/System/Library/Fonts/PingFang.ttc',
+)
+
+
+def find_label_font() -> Optional[str]:
+    """返回可显示中文的字体文件路径，找不到时返回None"""
+    if os.path.isdir(FONT_DIR):
+        for name in sorted(os.listdir(FONT_DIR)):
+            if name.lower().endswith(('.ttf', '.otf', '.ttc')):
+                return os.path.join(FONT_DIR, name)
+    for path in SYSTEM_FONTS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def render_text(text: str, width: int, height: int) -> np.ndarray:
+    """
+    将一行白色文字渲染为灰度图
+
+    使用 Pillow 和中文字体绘制，没有 Pillow 或字体时用 OpenCV 绘制（只能显示ASCII字符）。
+
+    Args:
+        text: 文字
+        width: 宽度
+        height: 高度（字号约为高度的70%）
+
+    Returns:
+        (高, 宽) uint8，文字处为255
+    """
+    glyphs = np.zeros((height, width), dtype=np.uint8)
+    font_size = max(10, int(height * 0.7))
+    font_path = find_label_font()
+    try:
+        if font_path is None:
+            raise ImportError
+        from PIL import Image, ImageDraw, ImageFont
+        canvas = Image.fromarray(glyphs)
+        font = ImageFont.truetype(font_path, font_size)
+        ImageDraw.Draw(canvas).text((height // 4, (height - font_size) // 2), text, fill=255, font=font)
+        return np.asarray(canvas).copy()
+    except ImportError:
+        import cv2
+        ascii_text = text.encode('ascii', 'replace').decode('ascii')
+        scale = font_size / 30
+        cv2.putText(glyphs, ascii_text, (height // 4, int(height * 0.75)), cv2.FONT_HERSHEY_SIMPLEX, scale, 255,
+                    max(1, int(scale * 2)), cv2.LINE_AA)
+        return glyphs
+
+
+class TextOverlay:
+    """
+    预先渲染的半透明文字层：黑色底、白色文字
+
+    渲染时把不透明度和预乘后的文字转换为定点整数（0-256），每帧混合只做原地的整数乘加，
+    使用预先分配的缓冲区，不分配内存。
+    """
+
+    def __init__(self, text: str, width: int, height: int, background_alpha: float = OVERLAY_BACKGROUND_ALPHA,
+                 fit_text: bool = False):
+        """
+        渲染文字层
+
+        Args:
+            text: 文字
+            width: 宽度（fit_text 为True时为最大宽度）
+            height: 高度
+            background_alpha: 底色的不透明度
+            fit_text: 是否把宽度缩小到文字的宽度
+        """
+        glyphs = render_text(text, width, height)
+        if fit_text:
+            columns = np.flatnonzero(glyphs.any(axis=0))
+            if columns.size:
+                glyphs = np.ascontiguousarray(glyphs[:, :min(width, columns[-1] + 1 + height // 4)])
+        height, width = glyphs.shape
+        alpha = np.maximum(glyphs.astype(np.float32) / 255, background_alpha)
+        self.text = text
+        self.shape = (height, width)
+        self._keep = np.round((1 - alpha) * 256).astype(np.uint16)[..., None]  # 保留原图的比例
+        self._add = np.round(glyphs * alpha * 256).astype(np.uint16)[..., None]  # 预乘后的文字
+        self._buffer = np.empty((height, width, 3), dtype=np.uint16)
+
+    def blend(self, target: np.ndarray):
+        """
+        原地混合到目标区域的左上角
+
+        Args:
+            target: (高, 宽, 3) uint8 图像或其视图，超出部分被裁剪
+        """
+        height = min(self.shape[0], target.shape[0])
+        width = min(self.shape[1], target.shape[1])
+        region = target[:height, :width]
+        buffer = self._buffer[:height, :width]
+        np.copyto(buffer, region)
+        buffer *= self._keep[:height, :width]
+        buffer += self._add[:height, :width]
+        buffer >>= 8
+        np.copyto(region, buffer, casting='unsafe')
+
+
+def grid_shape(count: int, columns: Optional[int] = None) -> Tuple[int, int]:
+    """返回 (行数, 列数)：默认不超过3个时排成一行，否则排成两行"""
+    if columns is None:
+        columns = count if count <= 3 else math.ceil(count / 2)
+    columns = max(1, min(columns, count))
+    return math.ceil(count / columns), columns
+
+
+def fit_rect(image_size: Tuple[int, int], tile_size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """
+    按宽高比将图像放入格子并居中（letterbox）
+
+    Args:
+        image_size: 图像的 (宽, 高)
+        tile_size: 格子的 (宽, 高)
+
+    Returns:
+        图像在格子中的 (x, y, 宽, 高)
+    """
+    image_width, image_height = image_size
+    tile_width, tile_height = tile_size
+    scale = min(tile_width / image_width, tile_height / image_height)
+    width = max(1, min(tile_width, int(round(image_width * scale))))
+    height = max(1, min(tile_height, int(round(image_height * scale))))
+    return (tile_width - width) // 2, (tile_height - height) // 2, width, height
+
+
+class TileCompositor:
+    """
+    将多个相机的画面拼接到一张预先分配的画布上
+
+    每个画面用 cv2.resize(INTER_AREA) 按宽高比缩放后直接写入画布中对应格子的视图，
+    尺寸相同时直接复制；格子中未被图像覆盖的黑边和空格子每帧清零（文字层会画到黑边上）。
+    之后可选地原地交换红蓝通道，再混合每个格子的文字层、顶部的文字条和底部的分数条。
+    画布在各帧之间复用，compose 返回的数组在下一次调用时被覆盖。
+    """
+
+    def __init__(self, tile_size: Tuple[int, int], count: int, columns: Optional[int] = None,
+                 swap_rb: bool = False):
+        """
+        初始化拼接器
+
+        Args:
+            tile_size: 每个格子的 (宽, 高)
+            count: 格子数
+            columns: 列数，为None时见 grid_shape
+            swap_rb: 是否在拼接后交换红蓝通道（例如把界面显示的通道顺序转换为 OpenCV 编码器的 BGR）
+        """
+        import cv2
+
+        self._cv2 = cv2
+        self.tile_size = tile_size
+        self.count = count
+        self.rows, self.columns = grid_shape(count, columns)
+        self.swap_rb = swap_rb
+        tile_width, tile_height = tile_size
+        self.canvas = np.zeros((self.rows * tile_height, self.columns * tile_width, 3), dtype=np.uint8)
+        cells = [self.canvas[row * tile_height:(row + 1) * tile_height, column * tile_width:(column + 1) * tile_width]
+                 for row in range(self.rows) for column in range(self.columns)]
+        self._tiles = cells[:count]
+        self._blank = cells[count:]  # 最后一行中没有相机的格子
+        self._fits = [None] * count  # 每个格子上一帧的 (图像尺寸, 图像视图, [黑边视图])
+        self.tile_overlays = [None] * count
+        self.banner = None
+
+    def set_banner(self, text: Optional[str], height: int):
+        """设置画布顶部的文字条，text 为None时取消"""
+        self.banner = TextOverlay(text, self.canvas.shape[1], height) if text else None
+
+    def set_tile_labels(self, labels: Sequence[Optional[str]], height: int):
+        """设置每个格子左下角的文字（如相机名），为None的格子不显示"""
+        self.tile_overlays = [TextOverlay(label, self.tile_size[0], height, fit_text=True) if label else None
+                              for label in list(labels)[:self.count]]
+        self.tile_overlays += [None] * (self.count - len(self.tile_overlays))
+
+    def compose(self, images: Sequence[Optional[np.ndarray]], score: Optional[float] = None,
+                score_height: int = 0) -> np.ndarray:
+        """
+        拼接一帧
+
+        Args:
+            images: 各格子的图像（3或4通道 uint8，只使用前3个通道），为None的格子显示为黑色
+            score: 画布底部分数条的值（0-1），为None时不显示
+            score_height: 分数条的高度
+
+        Returns:
+            画布（在下一次调用时被覆盖）
+        """
+        cv2 = self._cv2
+        for blank in self._blank:
+            blank[...] = 0
+        for i, tile in enumerate(self._tiles):
+            image = images[i] if i < len(images) else None
+            if image is None or image.ndim != 3:
+                tile[...] = 0
+                continue
+            size = (image.shape[1], image.shape[0])
+            if self._fits[i] is None or self._fits[i][0] != size:
+                self._fits[i] = (size,) + self._fit_views(tile, size)
+            _, target, borders = self._fits[i]
+            for border in borders:
+                border[...] = 0
+            source = image[..., :3]
+            if source.shape[:2] == target.shape[:2]:
+                np.copyto(target, source)
+            else:
+                cv2.resize(source, (target.shape[1], target.shape[0]), dst=target, interpolation=cv2.INTER_AREA)
+
+        if self.swap_rb:
+            cv2.cvtColor(self.canvas, cv2.COLOR_RGB2BGR, dst=self.canvas)
+
+        tile_height = self.tile_size[1]
+        for tile, overlay in zip(self._tiles, self.tile_overlays):
+            if overlay is not None:
+                overlay.blend(tile[tile_height - overlay.shape[0]:])
+        if self.banner is not None:
+            self.banner.blend(self.canvas)
+        if score is not None and score_height > 0:
+            self._draw_score(score, score_height)
+        return self.canvas
+
+    def _fit_views(self, tile: np.ndarray, size: Tuple[int, int]):
+        """返回图像在格子中的视图和上下（或左右）两条黑边的视图"""
+        x, y, width, height = fit_rect(size, self.tile_size)
+        borders = [view for view in (tile[:y], tile[y + height:], tile[y:y + height, :x],
+                                     tile[y:y + height, x + width:]) if view.size]
+        return tile[y:y + height, x:x + width], borders
+
+    def _draw_score(self, score: float, height: int):
+        """在画布底部画分数条：已填充部分为亮色，其余部分变暗"""
+        bar = self.canvas[-height:]
+        filled = int(round(max(0.0, min(1.0, score)) * bar.shape[1]))
+        bar[:, :filled] = (0, 200, 255)
+        bar[:, filled:] >>= 2
@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import h5py
+import numpy as np
+
+from src.core.folder_catalog import DEFAULT_FPS, HDF5_EXTENSIONS, natural_sort_key
+from src.core.hdf5_model import open_hdf5_readonly
+from src.core.parallel import iter_parallel
+from src.core.segments import is_label_dataset, label_runs, labeled_mask, read_label_column
+from src.utils.cache_paths import get_cache_dir
+from src.utils.logger import get_logger
+
+logger = get_logger('model')
+
+
+# 按以下顺序查找确定帧数的数据集
+DEFAULT_LENGTH_KEYS = ('action/base_vel', 'action', 'state/joint_position/left', 'subtask')
+
+# 报告中的时长分位数
+DEFAULT_PERCENTILES = (10, 25, 75, 90)
+
+# 标注段长度直方图的分箱边界（秒）
+DEFAULT_SEGMENT_BINS = (1, 2, 5, 10, 20, 60)
+
+# 缓存格式版本，记录字段变化时递增
+STATS_VERSION = 2
+
+# 分组方式
+GROUP_BY_CHOICES = ('category', 'folder')
+
+# 缓存写入的批大小
+COMMIT_BATCH = 256
+
+
+def find_hdf5_files(root: str) -> List[str]:
+    """
+    递归查找目录下的HDF5文件，忽略隐藏文件和隐藏目录
+
+    Args:
+        root: 根目录
+
+    Returns:
+        按相对路径自然排序的文件路径列表
+    """
+    found = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = [d for d in dir_names if not d.startswith('.')]
+        for name in file_names:
+            if name.endswith(HDF5_EXTENSIONS) and not name.startswith('.'):
+                found.append(os.path.join(dir_path, name))
+    found.sort(key=lambda p: [natural_sort_key(part) for part in os.path.relpath(p, root).split(os.sep)])
+    return found
+
+
+def annotation_stats(dataset: h5py.Dataset, frame_count: Optional[int] = None) -> Dict[str, Any]:
+    """
+    计算单个标注字段的统计信息（整列读取后按游程编码，不逐帧访问）
+
+    Args:
+        dataset: 标注数据集
+        frame_count: 总帧数，为None时使用数据集长度
+
+    Returns:
+        frames, labeled（已标注帧数）, segment_lengths（各段帧数）,
+        labels（{标注: {'segments': 段数, 'frames': 帧数}}）
+    """
+    labels = read_label_column(dataset, frame_count)
+    runs = label_runs(labels)
+    label_table = {}
+    for start, end, label in runs:
+        entry = label_table.setdefault(label, {'segments': 0, 'frames': 0})
+        entry['segments'] += 1
+        entry['frames'] += end - start + 1
+    return {
+        'frames': len(labels),
+        'labeled': int(labeled_mask(labels).sum()),
+        'segment_lengths': [end - start + 1 for start, end, _ in runs],
+        'labels': label_table,
+    }
+
+
+def measure_episode(file_path: str, length_keys: Sequence[str] = DEFAULT_LENGTH_KEYS) -> Dict[str, Any]:
+    """
+    以只读方式打开HDF5文件并读取统计信息
+
+    Args:
+        file_path: HDF5文件路径
+        length_keys: 确定帧数的数据集，按顺序使用第一个存在的
+
+    Returns:
+        记录：path, mtime, size, frames, length_key, annotation（{字段名: annotation_stats 的结果}）, error
+    """
+    stat = os.stat(file_path)
+    record = {
+        'path': file_path,
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'frames': None,
+        'length_key': None,
+        'annotation': {},
+        'error': None,
+    }
+    try:
+        with open_hdf5_readonly(file_path) as f:
+            for key in length_keys:
+                dataset = f.get(key)
+                if isinstance(dataset, h5py.Dataset) and dataset.ndim > 0:
+                    record['frames'] = int(dataset.shape[0])
+                    record['length_key'] = key
+                    break
+            else:
+                record['error'] = "none of the length keys found: " + ", ".join(length_keys)
+
+            # 顶层的字符串数据集视为标注字段
+            for key, dataset in f.items():
+                if is_label_dataset(dataset):
+                    record['annotation'][key] = annotation_stats(dataset, record['frames'])
+    except Exception as e:
+        record['error'] = str(e)
+    return record
+
+
+class StatsCache:
+    """
+    按 路径+修改时间+大小 缓存单个文件统计记录的 SQLite 数据库
+
+    params 记录扫描参数（格式版本、帧数数据集等），参数变化后旧记录视为失效。
+    """
+
+    def __init__(self, cache_path: str, params: Dict[str, Any]):
+        """
+        打开（必要时创建）缓存数据库
+
+        Args:
+            cache_path: 数据库文件路径
+            params: 扫描参数
+        """
+        self.cache_path = cache_path
+        self.params = json.dumps(params, sort_keys=True)
+        self.connection = sqlite3.connect(cache_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS episodes ("
+            "path TEXT PRIMARY KEY, mtime REAL, size INTEGER, params TEXT, record TEXT)")
+
+    def lookup(self, file_paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        返回缓存中仍然有效的记录
+
+        Args:
+            file_paths: 文件路径
+
+        Returns:
+            {path: record}，只包含修改时间、大小和扫描参数都一致的文件
+        """
+        wanted = set(file_paths)
+        fresh = {}
+        rows = self.connection.execute("SELECT path, mtime, size, record FROM episodes WHERE params = ?",
+                                       (self.params,))
+        for path, mtime, size, record in rows:
+            if path not in wanted:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if stat.st_mtime == mtime and stat.st_size == size:
+                fresh[path] = json.loads(record)
+        return fresh
+
+    def store(self, records: Iterable[Dict[str, Any]]):
+        """写入一批记录"""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO episodes (path, mtime, size, params, record) VALUES (?, ?, ?, ?, ?)",
+            [(r['path'], r['mtime'], r['size'], self.params, json.dumps(r, ensure_ascii=False)) for r in records])
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+def default_cache_path() -> str:
+    """返回默认的统计缓存数据库路径"""
+    return os.path.join(get_cache_dir('stats'), 'dataset_stats.sqlite')
+
+
+def scan_dataset(file_paths: List[str], length_keys: Sequence[str] = DEFAULT_LENGTH_KEYS,
+                 workers: Optional[int] = None, cache_path: Optional[str] = None, use_cache: bool = True,
+                 on_progress: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
+    """
+    扫描文件并返回统计记录，未变化的文件直接使用缓存
+
+    Args:
+        file_paths: HDF5文件路径
+        length_keys: 确定帧数的数据集
+        workers: 进程池大小，为None时使用CPU核数
+        cache_path: 缓存数据库路径，为None时使用默认路径
+        use_cache: 是否读写缓存
+        on_progress: 进度回调 (已完成数, 总数)
+
+    Returns:
+        与 file_paths 顺序一致的记录列表
+    """
+    started = time.perf_counter()
+    length_keys = tuple(length_keys)
+    cache = None
+    records = {}
+    if use_cache:
+        cache = StatsCache(cache_path or default_cache_path(),
+                           {'version': STATS_VERSION, 'length_keys': list(length_keys)})
+        records = cache.lookup(file_paths)
+    cached = len(records)
+
+    stale = [p for p in file_paths if p not in records]
+    batch = []
+    try:
+        for record in iter_parallel(measure_episode, stale, length_keys, workers=workers):
+            records[record['path']] = record
+            batch.append(record)
+            if len(batch) >= COMMIT_BATCH:
+                if cache:
+                    cache.store(batch)
+                batch = []
+                if on_progress:
+                    on_progress(len(records), len(file_paths))
+        if cache and batch:
+            cache.store(batch)
+        if on_progress and stale:
+            on_progress(len(records), len(file_paths))
+    finally:
+        if cache:
+            cache.close()
+
+    logger.info("统计扫描 %s 个文件（缓存命中 %s 个），耗时 %.2f 秒",
+                len(file_paths), cached, time.perf_counter() - started)
+    return [records[p] for p in file_paths]
+
+
+def summarize_durations(durations: Sequence[float], percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """
+    计算一组时长（秒）的汇总统计
+
+    Args:
+        durations: 时长列表
+        percentiles: 需要计算的分位数
+
+    Returns:
+        count, total, mean, median, min, max 以及 p<分位数>
+    """
+    summary = {'count': len(durations)}
+    if not durations:
+        return summary
+    values = np.asarray(durations, dtype=np.float64)
+    summary.update({
+        'total': float(values.sum()),
+        'mean': float(values.mean()),
+        'median': float(np.median(values)),
+        'min': float(values.min()),
+        'max': float(values.max()),
+    })
+    for p, value in zip(percentiles, np.percentile(values, percentiles)):
+        summary[f'p{p:g}'] = float(value)
+    return summary
+
+
+def group_name(file_path: str, root: str, by: str) -> str:
+    """
+    返回文件所属的分组
+
+    Args:
+        file_path: 文件路径
+        root: 数据集根目录
+        by: 'category' 为根目录下的第一级子目录，'folder' 为文件所在目录（均相对于根目录）
+
+    Returns:
+        分组名，直接位于根目录下的文件为 "."
+    """
+    relative_dir = os.path.dirname(os.path.relpath(file_path, root))
+    if not relative_dir:
+        return os.curdir
+    return relative_dir.split(os.sep)[0] if by == 'category' else relative_dir
+
+
+def summarize_annotations(records: List[Dict[str, Any]], fps: float = DEFAULT_FPS,
+                          segment_bins: Sequence[float] = DEFAULT_SEGMENT_BINS) -> Dict[str, Any]:
+    """
+    汇总各标注字段的覆盖率、标注段和标注频次
+
+    Args:
+        records: scan_dataset 返回的记录
+        fps: 帧率，用于将段长度换算为秒
+        segment_bins: 段长度直方图的分箱边界（秒）
+
+    Returns:
+        {字段名: {files, fully_labeled_files, frames, labeled_frames, coverage, segments,
+        segment_length（帧数的 mean/median/min/max）, histogram（edges 与 counts）,
+        labels（按帧数降序的 {标注: {segments, frames, seconds}}）}}
+    """
+    fields = defaultdict(lambda: {'files': 0, 'fully_labeled_files': 0, 'frames': 0, 'labeled_frames': 0,
+                                  'lengths': [], 'labels': defaultdict(lambda: {'segments': 0, 'frames': 0})})
+    for record in records:
+        for field, stats in (record.get('annotation') or {}).items():
+            entry = fields[field]
+            entry['files'] += 1
+            entry['frames'] += stats['frames']
+            entry['labeled_frames'] += stats['labeled']
+            if stats['frames'] and stats['labeled'] == stats['frames']:
+                entry['fully_labeled_files'] += 1
+            entry['lengths'].extend(stats['segment_lengths'])
+            for label, counts in stats['labels'].items():
+                entry['labels'][label]['segments'] += counts['segments']
+                entry['labels'][label]['frames'] += counts['frames']
+
+    edges = [float(b) for b in segment_bins]
+    summary = {}
+    for field in sorted(fields, key=natural_sort_key):
+        entry = fields[field]
+        lengths = np.asarray(entry['lengths'], dtype=np.int64)
+        # 第 i 个计数对应 [edges[i-1], edges[i]) 秒，首尾两箱无下界/上界
+        counts = np.bincount(np.searchsorted(edges, lengths / fps, side='right'), minlength=len(edges) + 1)
+        labels = sorted(entry['labels'].items(), key=lambda item: (-item[1]['frames'], item[0]))
+        summary[field] = {
+            'files': entry['files'],
+            'fully_labeled_files': entry['fully_labeled_files'],
+            'frames': entry['frames'],
+            'labeled_frames': entry['labeled_frames'],
+            'coverage': entry['labeled_frames'] / entry['frames'] if entry['frames'] else 0.0,
+            'segments': int(len(lengths)),
+            'segment_length': {} if not len(lengths) else {
+                'mean': float(lengths.mean()),
+                'median': float(np.median(lengths)),
+                'min': int(lengths.min()),
+                'max': int(lengths.max()),
+            },
+            'histogram': {'edges_seconds': edges, 'counts': [int(c) for c in counts]},
+            'labels': {label: {'segments': c['segments'], 'frames': c['frames'], 'seconds': c['frames'] / fps}
+                       for label, c in labels},
+        }
+    return summary
+
+
+def build_report(records: List[Dict[str, Any]], root: str, fps: float = DEFAULT_FPS,
+                 group_by: Sequence[str] = GROUP_BY_CHOICES,
+                 percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                 segment_bins: Sequence[float] = DEFAULT_SEGMENT_BINS) -> Dict[str, Any]:
+    """
+    根据统计记录生成报告
+
+    帧数未知或为0的文件不计入时长统计，读取失败的文件列在 errors 中。
+
+    Args:
+        records: scan_dataset 返回的记录
+        root: 数据集根目录
+        fps: 帧率
+        group_by: 需要的分组方式
+        percentiles: 时长分位数
+        segment_bins: 标注段长度直方图的分箱边界（秒）
+
+    Returns:
+        报告字典：root, fps, files, overall, annotation, errors 以及各分组方式的 {分组名: 汇总}
+    """
+    durations = []
+    groups = {by: defaultdict(list) for by in group_by}
+    errors = []
+    for record in records:
+        if record.get('error'):
+            errors.append({'path': record['path'], 'error': record['error']})
+        if not record.get('frames'):
+            continue
+        duration = record['frames'] / fps
+        durations.append(duration)
+        for by, grouped in groups.items():
+            grouped[group_name(record['path'], root, by)].append(duration)
+
+    report = {
+        'root': os.path.abspath(root),
+        'fps': fps,
+        'files': len(records),
+        'overall': summarize_durations(durations, percentiles),
+        'annotation': summarize_annotations(records, fps, segment_bins),
+        'errors': errors,
+    }
+    for by, grouped in groups.items():
+        report[by] = {name: summarize_durations(grouped[name], percentiles)
+                      for name in sorted(grouped, key=natural_sort_key)}
+    return report
+
+
+def format_table(header: List[str], rows: List[List[str]]) -> str:
+    """
+    将行格式化为对齐的文本表格（第一列左对齐，其余右对齐）
+
+    Args:
+        header: 表头
+        rows: 各行的单元格文本
+
+    Returns:
+        表格文本
+    """
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+
+    def format_row(row):
+        return "  ".join(cell.ljust(widths[0]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row))
+
+    lines = [format_row(header), "  ".join('-' * w for w in widths)]
+    lines.extend(format_row(row) for row in rows)
+    return "\n".join(lines)
+
+
+def format_summary_table(title: str, summaries: Dict[str, Dict[str, Any]],
+                         percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> str:
+    """
+    将分组汇总格式化为文本表格
+
+    Args:
+        title: 分组列的表头
+        summaries: {分组名: summarize_durations 的结果}
+        percentiles: 需要显示的分位数
+
+    Returns:
+        表格文本
+    """
+    stat_keys = ['mean', 'median'] + [f'p{p:g}' for p in percentiles]
+    header = [title, 'files', 'total (min)'] + [f'{k} (s)' for k in stat_keys]
+    rows = []
+    for name, summary in summaries.items():
+        if summary['count'] == 0:
+            rows.append([name, '0', '-'] + ['-'] * len(stat_keys))
+            continue
+        rows.append([name, str(summary['count']), f"{summary['total'] / 60:.2f}"] +
+                    [f"{summary[k]:.2f}" for k in stat_keys])
+    return format_table(header, rows)
+
+
+def format_annotation_tables(annotation: Dict[str, Any], fps: float = DEFAULT_FPS, top_labels: int = 20) -> str:
+    """
+    将 summarize_annotations 的结果格式化为文本：字段覆盖率表，以及每个字段的段长度直方图和标注频次表
+
+    Args:
+        annotation: summarize_annotations 的结果
+        fps: 帧率
+        top_labels: 每个字段最多显示的标注数，0 表示全部显示
+
+    Returns:
+        文本
+    """
+    header = ['field', 'files', 'fully labeled', 'coverage', 'segments', 'mean seg (s)', 'median seg (s)']
+    rows = []
+    for field, stats in annotation.items():
+        length = stats['segment_length']
+        rows.append([field, str(stats['files']), str(stats['fully_labeled_files']), f"{stats['coverage']:.1%}",
+                     str(stats['segments']),
+                     f"{length['mean'] / fps:.2f}" if length else '-',
+                     f"{length['median'] / fps:.2f}" if length else '-'])
+    parts = [format_table(header, rows)]
+
+    for field, stats in annotation.items():
+        edges = stats['histogram']['edges_seconds']
+        bounds = [None] + edges + [None]
+        histogram_rows = []
+        for i, count in enumerate(stats['histogram']['counts']):
+            low, high = bounds[i], bounds[i + 1]
+            name = f"< {high:g}s" if low is None else (f">= {low:g}s" if high is None else f"{low:g}-{high:g}s")
+            histogram_rows.append([name, str(count)])
+        parts.append(f"\n[{field}] segment lengths\n" + format_table(['length', 'segments'], histogram_rows))
+
+        labels = list(stats['labels'].items())
+        shown = labels[:top_labels] if top_labels else labels
+        label_rows = [[label, str(c['segments']), str(c['frames']), f"{c['seconds']:.1f}"] for label, c in shown]
+        title = f"\n[{field}] label frequencies"
+        if len(shown) < len(labels):
+            title += f" (top {len(shown)} of {len(labels)})"
+        parts.append(title + "\n" + format_table(['label', 'segments', 'frames', 'seconds'], label_rows))
+    return "\n".join(parts)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import h5py
+
+from src.core.hdf5_model import is_image_dataset, open_hdf5_readonly
+from src.core.parallel import iter_parallel
+from src.core.segments import is_label_dataset, read_label_column, label_coverage
+from src.utils.cache_paths import get_cache_dir, path_digest
+from src.utils.logger import get_logger
+
+logger = get_logger('model')
+
+
+# 文件中没有 fps 属性时用于计算时长的默认帧率
+DEFAULT_FPS = 15
+
+# 没有图像数据集时按以下顺序查找确定帧数的数据集
+LENGTH_KEYS = ('compress_len', 'action/base_vel', 'action', 'state/joint_position/left', 'subtask')
+
+# 扫描结果分批回调的大小
+BATCH_SIZE = 256
+
+# 缓存格式版本，记录字段变化时递增
+CATALOG_VERSION = 1
+
+HDF5_EXTENSIONS = ('.hdf5', '.h5')
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def natural_sort_key(file_name: str) -> List[Any]:
+    """
+    自然排序的键函数，例如 "file1", "file2", "file10" 会按数字大小排序
+
+    Args:
+        file_name: 文件名
+
+    Returns:
+        排序键
+    """
+    return [int(part) if part.isdigit() else part for part in _DIGITS.split(file_name)]
+
+
+def list_hdf5_files(folder: str) -> List[str]:
+    """
+    列出文件夹（不递归）中的HDF5文件，按文件名自然排序，忽略隐藏文件
+
+    Args:
+        folder: 文件夹路径
+
+    Returns:
+        文件路径列表
+    """
+    with os.scandir(folder) as entries:
+        names = [e.name for e in entries
+                 if e.name.endswith(HDF5_EXTENSIONS) and not e.name.startswith('.') and e.is_file()]
+    names.sort(key=natural_sort_key)
+    return [os.path.join(folder, name) for name in names]
+
+
+def _frame_count(h5file: h5py.File, cameras: List[str]) -> Optional[int]:
+    """按图像数据集、compress_len 和 LENGTH_KEYS 的顺序确定帧数"""
+    if cameras:
+        return int(h5file[cameras[0]].shape[0])
+    for key in LENGTH_KEYS:
+        dataset = h5file.get(key)
+        if isinstance(dataset, h5py.Dataset) and dataset.ndim > 0:
+            return int(dataset.shape[-1] if key == 'compress_len' else dataset.shape[0])
+    return None
+
+
+def scan_episode(file_path: str, fps: float = DEFAULT_FPS) -> Dict[str, Any]:
+    """
+    以只读方式打开HDF5文件并读取目录信息
+
+    只读取形状、属性和标注字段，不读取图像数据。
+
+    Args:
+        file_path: HDF5文件路径
+        fps: 文件中没有 fps 属性时使用的帧率
+
+    Returns:
+        目录记录：path, name, mtime, size, frames, fps, cameras, compressed,
+        annotation（{字段名: 已标注帧比例}）, error
+    """
+    stat = os.stat(file_path)
+    record = {
+        'path': file_path,
+        'name': os.path.basename(file_path),
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'frames': None,
+        'fps': fps,
+        'cameras': [],
+        'compressed': False,
+        'annotation': {},
+        'error': None,
+    }
+    try:
+        with open_hdf5_readonly(file_path) as f:
+            cameras = []
+
+            def visit_item(name, obj):
+                if isinstance(obj, h5py.Dataset) and is_image_dataset(obj):
+                    cameras.append(name)
+
+            f.visititems(visit_item)
+            frames = _frame_count(f, cameras)
+
+            record['frames'] = frames
+            record['fps'] = float(f.attrs.get('fps', fps))
+            record['cameras'] = [name.rsplit('/', 1)[-1] for name in cameras]
+            record['compressed'] = bool(f.attrs.get('compress', False))
+
+            # 顶层的字符串数据集视为标注字段
+            for key, dataset in f.items():
+                if is_label_dataset(dataset):
+                    record['annotation'][key] = label_coverage(read_label_column(dataset, frames))
+    except Exception as e:
+        record['error'] = str(e)
+    return record
+
+
+def record_duration(record: Dict[str, Any]) -> Optional[float]:
+    """返回记录对应的时长（秒），帧数未知时返回None"""
+    if not record.get('frames') or not record.get('fps'):
+        return None
+    return record['frames'] / record['fps']
+
+
+def record_coverage(record: Dict[str, Any]) -> Optional[float]:
+    """返回记录中覆盖率最高的标注字段的覆盖率，没有标注字段时返回None"""
+    annotation = record.get('annotation') or {}
+    return max(annotation.values()) if annotation else None
+
+
+class FolderCatalog:
+    """
+    文件夹的元数据目录
+
+    在进程池中并行扫描文件夹内的HDF5文件，扫描结果按路径缓存在磁盘上，
+    文件的修改时间和大小不变时直接使用缓存。
+    """
+
+    def __init__(self, folder: str, fps: float = DEFAULT_FPS, cache_path: Optional[str] = None):
+        """
+        初始化文件夹目录
+
+        Args:
+            folder: 文件夹路径
+            fps: 文件中没有 fps 属性时使用的帧率
+            cache_path: 缓存文件路径，为None时使用缓存目录下按文件夹命名的文件
+        """
+        self.folder = os.path.abspath(folder)
+        self.fps = fps
+        self.cache_path = cache_path or os.path.join(get_cache_dir('catalog'), path_digest(self.folder) + '.json')
+        self.records = {}  # {path: record}
+        self._load_cache()
+
+    def _load_cache(self):
+        """读取磁盘缓存"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('version') == CATALOG_VERSION and cache.get('fps') == self.fps:
+                self.records = cache.get('records', {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("读取目录缓存失败 (%s): %s", self.cache_path, e)
+
+    def save_cache(self):
+        """将目录写入磁盘缓存（先写临时文件再替换）"""
+        tmp_path = self.cache_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CATALOG_VERSION, 'folder': self.folder, 'fps': self.fps,
+                           'records': self.records}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning("写入目录缓存失败 (%s): %s", self.cache_path, e)
+
+    def is_fresh(self, file_path: str) -> bool:
+        """缓存的记录是否与文件当前的修改时间和大小一致"""
+        record = self.records.get(file_path)
+        if record is None:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return record.get('mtime') == stat.st_mtime and record.get('size') == stat.st_size
+
+    def build(self, file_paths: Optional[List[str]] = None, workers: Optional[int] = None,
+              on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+              should_stop: Optional[Callable[[], bool]] = None, prune: bool = True,
+              isolated: bool = False) -> List[Dict[str, Any]]:
+        """
+        扫描文件并更新目录
+
+        Args:
+            file_paths: 需要编目的文件，为None时使用文件夹中的所有HDF5文件
+            workers: 进程池大小，为None时使用CPU核数；1表示在当前进程中扫描
+            on_batch: 每得到一批记录时的回调（缓存命中的记录作为第一批）
+            should_stop: 返回True时提前结束扫描
+            prune: 是否从缓存中移除不在 file_paths 中的文件（增量编目时为False）
+            isolated: 是否总是在子进程中扫描（界面进程中编目时为True，见 iter_parallel）
+
+        Returns:
+            与 file_paths 顺序一致的记录列表（提前结束时只包含已扫描的文件）
+        """
+        if file_paths is None:
+            file_paths = list_hdf5_files(self.folder)
+
+        started = time.perf_counter()
+        fresh = [p for p in file_paths if self.is_fresh(p)]
+        fresh_set = set(fresh)
+        stale = [p for p in file_paths if p not in fresh_set]
+        if fresh and on_batch:
+            on_batch([self.records[p] for p in fresh])
+
+        batch = []
+        for record in self._scan(stale, workers, should_stop, isolated):
+            self.records[record['path']] = record
+            batch.append(record)
+            if len(batch) >= BATCH_SIZE:
+                if on_batch:
+                    on_batch(batch)
+                batch = []
+        if batch and on_batch:
+            on_batch(batch)
+
+        # 只保留本次仍然存在的文件
+        if prune:
+            wanted = set(file_paths)
+            self.records = {p: r for p, r in self.records.items() if p in wanted}
+        self.save_cache()
+
+        logger.info("编目 %s 个文件（缓存命中 %s 个），耗时 %.2f 秒",
+                    len(file_paths), len(fresh), time.perf_counter() - started)
+        return [self.records[p] for p in file_paths if p in self.records]
+
+    def _scan(self, file_paths: List[str], workers: Optional[int], should_stop: Optional[Callable[[], bool]],
+              isolated: bool = False):
+        """扫描文件，文件较多（或 isolated 为True）时使用进程池"""
+        return iter_parallel(scan_episode, file_paths, self.fps, workers=workers, should_stop=should_stop,
+                             isolated=isolated)
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.utils.logger import get_logger
+
+logger = get_logger('model')
+
+
+ScoreInput = Union[np.ndarray, Dict[int, float], None]
+
+
+def scores_to_array(frame_scores: ScoreInput, total_frames: Optional[int] = None) -> np.ndarray:
+    """
+    将帧分数转换为按帧索引的稠密 float32 数组，缺失的帧为 NaN
+
+    Args:
+        frame_scores: {frame: score} 映射或已有的一维数组
+        total_frames: 总帧数，为None时按最大帧索引推断
+
+    Returns:
+        形状为 (total_frames,) 的 float32 数组
+    """
+    if frame_scores is None:
+        return np.full(max(0, total_frames or 0), np.nan, dtype=np.float32)
+
+    if isinstance(frame_scores, np.ndarray):
+        scores = np.asarray(frame_scores, dtype=np.float32).ravel()
+        if total_frames is None or total_frames == len(scores):
+            return scores
+        result = np.full(total_frames, np.nan, dtype=np.float32)
+        n = min(total_frames, len(scores))
+        result[:n] = scores[:n]
+        return result
+
+    frames = []
+    values = []
+    for k, v in frame_scores.items():
+        try:
+            frames.append(int(k))
+            values.append(float(v))
+        except (TypeError, ValueError):
+            continue
+
+    frames = np.asarray(frames, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float32)
+    if total_frames is None:
+        total_frames = int(frames.max()) + 1 if len(frames) else 0
+
+    result = np.full(total_frames, np.nan, dtype=np.float32)
+    valid = (frames >= 0) & (frames < total_frames)
+    result[frames[valid]] = values[valid]
+    return result
+
+
+def score_at(scores: Optional[np.ndarray], frame: int) -> Optional[float]:
+    """
+    获取指定帧的分数
+
+    Args:
+        scores: 稠密分数数组
+        frame: 帧索引
+
+    Returns:
+        分数，不存在或为 NaN 时返回None
+    """
+    if scores is None or not (0 <= frame < len(scores)):
+        return None
+    value = scores[frame]
+    if np.isnan(value):
+        return None
+    return float(value)
+
+
+def score_range(scores: np.ndarray) -> Optional[Tuple[float, float]]:
+    """
+    计算分数的取值范围（忽略 NaN）
+
+    Returns:
+        (min, max)，没有有效分数时返回None
+    """
+    if scores is None or len(scores) == 0:
+        return None
+    finite = np.isfinite(scores)
+    if not finite.any():
+        return None
+    valid = scores[finite]
+    return float(valid.min()), float(valid.max())
+
+
+def minmax_envelope(scores: np.ndarray, start: int, end: int, buckets: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    计算 [start, end) 区间内每个像素桶的最小/最大值包络
+
+    当区间帧数不超过桶数时直接返回原始点；否则按桶做 reduceat，
+    绘图点数与帧数无关，只与画布宽度有关。
+
+    Args:
+        scores: 稠密分数数组（NaN 表示缺失）
+        start: 起始帧（包含）
+        end: 结束帧（不包含）
+        buckets: 桶数（通常等于绘图区域的像素宽度）
+
+    Returns:
+        (x, lo, hi)：每个桶的中心帧、最小值和最大值
+    """
+    start = max(0, int(start))
+    end = min(len(scores), int(end))
+    if end <= start:
+        empty = np.empty(0, dtype=np.float32)
+        return empty, empty, empty
+
+    segment = scores[start:end]
+    count = end - start
+    buckets = max(1, int(buckets))
+
+    if count <= buckets:
+        x = np.arange(start, end, dtype=np.float32)
+        return x, segment, segment
+
+    edges = np.linspace(0, count, buckets + 1).astype(np.int64)
+    edges = np.unique(edges[:-1])
+    # fmin/fmax 忽略 NaN；整桶都是 NaN 时结果仍为 NaN，matplotlib 会断开曲线
+    lo = np.fmin.reduceat(segment, edges)
+    hi = np.fmax.reduceat(segment, edges)
+    bounds = np.append(edges, count)
+    x = (start + (bounds[:-1] + bounds[1:] - 1) / 2.0).astype(np.float32)
+    return x, lo, hi
+
+
+# 分数文档中可能存放分数的顶层键（按优先级）
+SCORE_KEYS = ('score', 'scores', 'score_list')
+
+# HDF5 文件内可能存放分数的数据集名称（按优先级）
+SCORE_DATASET_NAMES = ('frame_scores', 'scores', 'score')
+
+_CHUNK_SIZE = 1 << 20
+_HEADER_RE = re.compile(rb'"(' + b'|'.join(k.encode() for k in SCORE_KEYS) + rb')"\s*:\s*([\[{])')
+_TOTAL_FRAMES_RE = re.compile(rb'"total_frames"\s*:\s*(\d+)')
+
+
+class _ScoreBuffer:
+    """预分配的分数数组，写入越界时按倍数扩容"""
+
+    def __init__(self, capacity: int):
+        self.array = np.full(max(1, capacity), np.nan, dtype=np.float32)
+        self.size = 0
+
+    def put(self, frames: np.ndarray, values: np.ndarray):
+        """按帧索引写入一批分数"""
+        valid = frames >= 0
+        frames = frames[valid]
+        values = values[valid]
+        if len(frames) == 0:
+            return
+        needed = int(frames.max()) + 1
+        if needed > len(self.array):
+            grown = np.full(max(needed, len(self.array) * 2), np.nan, dtype=np.float32)
+            grown[:len(self.array)] = self.array
+            self.array = grown
+        self.array[frames] = values
+        self.size = max(self.size, needed)
+
+    def result(self, total_frames: Optional[int]) -> np.ndarray:
+        """返回截断/补齐到 total_frames 的结果数组"""
+        length = total_frames if total_frames else self.size
+        return scores_to_array(self.array[:max(self.size, 0)], length)
+
+
+def _parse_numbers(body: bytes) -> np.ndarray:
+    """
+    将一段 JSON 文本中的数字一次性解析为 float64 数组
+
+    去掉括号、引号和空白后把 ':' 视为分隔符，交给 NumPy 的 C 实现解析，
+    不为每个条目创建 Python 对象。null 视为 NaN。
+    """
+    text = body.translate(None, b'{}"\r\n\t ').replace(b':', b',').replace(b'null', b'nan').strip(b',')
+    if not text:
+        return np.empty(0, dtype=np.float64)
+    return np.fromstring(text, dtype=np.float64, sep=',')
+
+
+def _find_total_frames(f, buffer: bytes) -> Optional[int]:
+    """在分数字段之后的内容中查找 total_frames，逐块读取，块之间保留重叠以免截断键名或数字"""
+    while True:
+        match = _TOTAL_FRAMES_RE.search(buffer)
+        if match and match.end() < len(buffer):
+            return int(match.group(1))
+        chunk = f.read(_CHUNK_SIZE)
+        if not chunk:
+            return int(match.group(1)) if match else None
+        buffer = buffer[-64:] + chunk
+
+
+def parse_score_json(path: str, total_frames: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    增量解析分数 JSON 文件到预分配的 float32 数组
+
+    按块读取文件，不构建完整的 Python 对象树。支持以下 `score`/`scores`/`score_list` 格式：
+        - 单键字典列表: [{"0": 0.1}, {"1": 0.2}, ...]（temp.py 生成的格式）
+        - 字典: {"0": 0.1, "1": 0.2, ...}
+        - 数值列表: [0.1, 0.2, ...]（列表位置即帧索引）
+
+    Args:
+        path: JSON 文件路径
+        total_frames: 总帧数，用于预分配；为None时使用文档中的 total_frames（在分数字段之前或之后均可）
+
+    Returns:
+        分数数组；文件中没有可识别的分数字段时返回None
+    """
+    with open(path, 'rb') as f:
+        buffer = b''
+        header = None
+        eof = False
+        # 读取直到找到分数字段的起始括号
+        while header is None and not eof:
+            chunk = f.read(_CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            header = _HEADER_RE.search(buffer)
+        if header is None:
+            return None
+
+        if total_frames is None:
+            match = _TOTAL_FRAMES_RE.search(buffer, 0, header.start())
+            if match:
+                total_frames = int(match.group(1))
+
+        opener = header.group(2)
+        buffer = buffer[header.end():]
+        # 判断元素格式：字典（或字典列表）使用 "帧": 值 形式，否则为纯数值列表
+        while not buffer.strip() and not eof:
+            chunk = f.read(_CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+        stripped = buffer.lstrip()
+        keyed = opener == b'{' or stripped.startswith(b'{')
+        # 字典列表内部不会出现 ']'，字典内部不会出现 '}'，因此首个结束符即为字段结尾
+        terminator = b'}' if opener == b'{' else b']'
+
+        scores = _ScoreBuffer(total_frames or 0)
+        next_index = 0
+        done = False
+        tail = b''  # 分数字段结束之后已读取的内容
+        while True:
+            end = buffer.find(terminator)
+            if end >= 0:
+                done = True
+                body, tail, buffer = buffer[:end], buffer[end + 1:], b''
+            elif eof:
+                done = True
+                body, buffer = buffer, b''
+            else:
+                # 保留最后一个分隔符之后的内容，避免截断跨块的数字
+                cut = buffer.rfind(b',') + 1
+                body, buffer = buffer[:cut], buffer[cut:]
+
+            numbers = _parse_numbers(body)
+            if keyed:
+                pairs = numbers[:len(numbers) // 2 * 2].reshape(-1, 2)
+                scores.put(pairs[:, 0].astype(np.int64), pairs[:, 1].astype(np.float32))
+            elif len(numbers):
+                frames = np.arange(next_index, next_index + len(numbers), dtype=np.int64)
+                next_index += len(numbers)
+                scores.put(frames, numbers.astype(np.float32))
+
+            if done:
+                break
+            chunk = f.read(_CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+
+        if total_frames is None:
+            total_frames = _find_total_frames(f, tail)
+
+    return scores.result(total_frames)
+
+
+def read_scores_from_hdf5(h5file, total_frames: Optional[int] = None) -> Optional[Tuple[np.ndarray, str]]:
+    """
+    从已打开的 HDF5 文件中读取分数数据集
+
+    Args:
+        h5file: 已打开的 h5py.File
+        total_frames: 总帧数
+
+    Returns:
+        (分数数组, 数据集名)；没有数值型分数数据集时返回None
+    """
+    for name in SCORE_DATASET_NAMES:
+        dataset = h5file.get(name)
+        if dataset is None or not hasattr(dataset, 'dtype') or dataset.dtype.kind not in 'fiu':
+            continue
+        if len(dataset.shape) == 0:
+            continue
+        return scores_to_array(dataset[()].reshape(dataset.shape[0], -1)[:, 0], total_frames), name
+    return None
+
+
+def score_file_candidates(hdf5_path: str, data_dirs: Optional[List[str]] = None) -> List[str]:
+    """
+    列出与 HDF5 同名的分数文件候选路径，二进制 .npy 优先于 JSON
+
+    Args:
+        hdf5_path: HDF5 文件路径
+        data_dirs: 额外的查找目录（优先于 HDF5 所在目录）
+
+    Returns:
+        候选路径列表
+    """
+    base = os.path.splitext(os.path.basename(hdf5_path))[0]
+    dirs = list(data_dirs or []) + [os.path.dirname(hdf5_path)]
+    candidates = [os.path.join(d, base + '.npy') for d in dirs]
+    candidates += [os.path.join(d, base + '.json') for d in dirs]
+    return candidates
+
+
+def load_frame_scores(hdf5_path: str, total_frames: Optional[int] = None,
+                      data_dirs: Optional[List[str]] = None,
+                      h5file=None) -> Optional[Tuple[np.ndarray, str, float]]:
+    """
+    查找并加载与 HDF5 文件对应的帧分数
+
+    查找顺序：.npy 旁路文件 -> HDF5 内的分数数据集 -> JSON 文件。
+
+    Args:
+        hdf5_path: HDF5 文件路径
+        total_frames: 总帧数
+        data_dirs: 额外的查找目录
+        h5file: 已打开的 h5py.File，用于查找内嵌的分数数据集
+
+    Returns:
+        (分数数组, 来源, 解析耗时秒)；未找到时返回None
+    """
+    candidates = score_file_candidates(hdf5_path, data_dirs)
+    npy_candidates = [p for p in candidates if p.endswith('.npy')]
+    json_candidates = [p for p in candidates if p.endswith('.json')]
+
+    for path in npy_candidates:
+        if os.path.exists(path):
+            try:
+                started = time.perf_counter()
+                scores = scores_to_array(np.load(path), total_frames)
+                return scores, path, time.perf_counter() - started
+            except Exception as e:
+                logger.error("加载分数文件失败 (%s): %s", path, e)
+
+    if h5file is not None:
+        try:
+            started = time.perf_counter()
+            found = read_scores_from_hdf5(h5file, total_frames)
+            if found is not None:
+                scores, name = found
+                return scores, f"{hdf5_path}:/{name}", time.perf_counter() - started
+        except Exception as e:
+            logger.error("读取HDF5内分数数据集失败: %s", e)
+
+    for path in json_candidates:
+        if os.path.exists(path):
+            try:
+                started = time.perf_counter()
+                scores = parse_score_json(path, total_frames)
+                if scores is not None:
+                    return scores, path, time.perf_counter() - started
+            except Exception as e:
+                logger.error("加载JSON分数失败 (%s): %s", path, e)
+
+    return None
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+import csv
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# 一帧的各个阶段，按在渲染流程中的顺序
+STAGES = ('read', 'decode', 'convert', 'scale', 'widget', 'timeline', 'score')
+
+STAGE_LABELS = {
+    'read': 'HDF5读取',
+    'decode': '解码',
+    'convert': '颜色转换',
+    'scale': '缩放',
+    'widget': '控件更新',
+    'timeline': '时间轴绘制',
+    'score': '分数曲线',
+}
+
+# 最多保留的帧数（更早的帧被丢弃）
+MAX_FRAMES = 20000
+
+# 平均每帧保留的阶段记录数（用于 Chrome trace）
+SPANS_PER_FRAME = 24
+
+# 界面上显示统计的最近帧数
+HUD_FRAMES = 60
+
+_STAGE_INDEX = {stage: i for i, stage in enumerate(STAGES)}
+
+
+def _pad(text: str, width: int, right: bool = False) -> str:
+    """按等宽字体的显示宽度（中文字符占两列）补齐空格"""
+    columns = sum(2 if unicodedata.east_asian_width(char) in 'WF' else 1 for char in text)
+    padding = ' ' * max(0, width - columns)
+    return padding + text if right else text + padding
+
+
+class FrameTimer:
+    """
+    逐帧记录渲染各阶段的耗时
+
+    帧由 begin_frame 开始，直到下一次 begin_frame 为止期间主线程记录的阶段都计入这一帧
+    （时间轴等控件的重绘发生在事件循环中，晚于渲染调用本身）。各阶段用 time.perf_counter
+    计时，调用方在阶段开始时取时间、结束时调用 add，记录只是向列表追加数值，不加锁；
+    调用方在不需要计时时应不持有 FrameTimer（为None），此时没有任何开销。
+
+    后台线程（如播放预读）的阶段用 background=True 记录，只出现在 Chrome trace 中，
+    不计入帧耗时。
+    """
+
+    def __init__(self, max_frames: int = MAX_FRAMES):
+        """
+        初始化计时器
+
+        Args:
+            max_frames: 最多保留的帧数
+        """
+        self.max_frames = max_frames
+        self._origin = time.perf_counter()
+        self._frames = deque(maxlen=max_frames)  # 已结束的帧: (帧索引, 开始, 结束, [各阶段耗时])
+        self._spans = deque(maxlen=max_frames * SPANS_PER_FRAME)  # (阶段号, 开始, 耗时, 帧索引, 线程号, 键)
+        self._current = None  # 当前帧: [帧索引, 开始, 结束, [各阶段耗时]]
+        self._threads = {}  # {线程号: 线程名}
+
+    def reset(self):
+        """清除已记录的数据（例如在开始播放时）"""
+        self._origin = time.perf_counter()
+        self._frames.clear()
+        self._spans.clear()
+        self._current = None
+
+    def begin_frame(self, frame_idx: int):
+        """结束上一帧并开始记录新的一帧"""
+        self._finish_frame()
+        now = time.perf_counter()
+        self._current = [frame_idx, now, now, [0.0] * len(STAGES)]
+
+    def add(self, stage: str, started: float, key: Optional[str] = None, background: bool = False) -> float:
+        """
+        记录一个阶段
+
+        Args:
+            stage: 阶段名称，见 STAGES
+            started: 阶段开始时的 time.perf_counter()
+            key: 相关的图像键（写入 Chrome trace 的参数）
+            background: 是否为后台线程的阶段（不计入帧耗时）
+
+        Returns:
+            阶段结束的时间，可直接作为下一阶段的开始时间
+        """
+        ended = time.perf_counter()
+        index = _STAGE_INDEX[stage]
+        thread = threading.get_ident()
+        if thread not in self._threads:
+            self._threads[thread] = threading.current_thread().name
+        current = self._current
+        if background or current is None:
+            self._spans.append((index, started, ended - started, -1, thread, key))
+            return ended
+        current[3][index] += ended - started
+        if ended > current[2]:
+            current[2] = ended
+        self._spans.append((index, started, ended - started, current[0], thread, key))
+        return ended
+
+    def _finish_frame(self):
+        if self._current is not None:
+            self._frames.append(tuple(self._current))
+            self._current = None
+
+    def frame_count(self) -> int:
+        """已记录的帧数（包括当前帧）"""
+        return len(self._frames) + (self._current is not None)
+
+    def _frame_rows(self, last: Optional[int] = None) -> list:
+        rows = list(self._frames)
+        if self._current is not None:
+            rows.append(tuple(self._current))
+        return rows[-last:] if last else rows
+
+    def summary(self, last: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+        """
+        统计各阶段每帧的耗时
+
+        Args:
+            last: 只统计最近的帧数，为None时统计全部
+
+        Returns:
+            {阶段: {mean, p95, max}}（毫秒），另有 'total'（各阶段之和）和 'frames'：{count, fps}
+        """
+        rows = self._frame_rows(last)
+        result = {}
+        if not rows:
+            return result
+        durations = np.array([row[3] for row in rows], dtype=np.float64) * 1000
+        columns = {stage: durations[:, i] for i, stage in enumerate(STAGES)}
+        columns['total'] = durations.sum(axis=1)
+        for name, values in columns.items():
+            result[name] = {'mean': float(values.mean()), 'p95': float(np.percentile(values, 95)),
+                            'max': float(values.max())}
+        span = rows[-1][1] - rows[0][1]
+        result['frames'] = {'count': len(rows), 'fps': (len(rows) - 1) / span if span > 0 else 0.0}
+        return result
+
+    def format_summary(self, last: Optional[int] = HUD_FRAMES) -> str:
+        """返回多行的统计文本（界面上的帧耗时显示和日志使用）"""
+        summary = self.summary(last)
+        if not summary:
+            return "帧耗时：尚无记录"
+        frames = summary['frames']
+        lines = [f"最近 {frames['count']} 帧  {frames['fps']:.1f} 帧/秒",
+                 _pad('阶段', 11) + _pad('平均', 7, right=True) + _pad('P95', 7, right=True)
+                 + _pad('最大', 7, right=True) + '  (ms)']
+        for name in STAGES + ('total',):
+            stats = summary[name]
+            label = STAGE_LABELS.get(name, '合计')
+            lines.append(f"{_pad(label, 11)}{stats['mean']:>7.2f}{stats['p95']:>7.2f}{stats['max']:>7.2f}")
+        return "\n".join(lines)
+
+    def write_csv(self, path: str) -> int:
+        """
+        每帧一行写入CSV：帧索引、开始时间、各阶段耗时和合计（毫秒）
+
+        Args:
+            path: 输出路径
+
+        Returns:
+            写入的帧数
+        """
+        rows = self._frame_rows()
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'start_ms'] + [f'{stage}_ms' for stage in STAGES] + ['total_ms'])
+            for frame_idx, started, _, durations in rows:
+                writer.writerow([frame_idx, f"{(started - self._origin) * 1000:.3f}"]
+                                + [f"{value * 1000:.3f}" for value in durations]
+                                + [f"{sum(durations) * 1000:.3f}"])
+        return len(rows)
+
+    def chrome_trace(self) -> Dict[str, List[dict]]:
+        """
+        生成 Chrome trace（chrome://tracing 或 Perfetto 可打开）的事件
+
+        每帧一个 'frame N' 区间，各阶段为该帧区间内的子区间，后台线程的阶段在各自的线程行中。
+        """
+        pid = os.getpid()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread, 'args': {'name': name}}
+                  for thread, name in self._threads.items()]
+        main_thread = threading.main_thread().ident
+        for frame_idx, started, ended, _ in self._frame_rows():
+            events.append({'name': f'frame {frame_idx}', 'cat': 'frame', 'ph': 'X', 'pid': pid, 'tid': main_thread,
+                           'ts': (started - self._origin) * 1e6, 'dur': (ended - started) * 1e6,
+                           'args': {'frame': frame_idx}})
+        for index, started, duration, frame_idx, thread, key in list(self._spans):
+            args = {'frame': frame_idx} if frame_idx >= 0 else {}
+            if key:
+                args['key'] = key
+            events.append({'name': STAGES[index], 'cat': 'stage', 'ph': 'X', 'pid': pid, 'tid': thread,
+                           'ts': (started - self._origin) * 1e6, 'dur': duration * 1e6, 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path: str) -> int:
+        """
+        写入 Chrome trace JSON
+
+        Args:
+            path: 输出路径
+
+        Returns:
+            写入的帧数
+        """
+        trace = self.chrome_trace()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        return sum(1 for event in trace['traceEvents'] if event.get('cat') == 'frame')
+
+    def export(self, path: str) -> int:
+        """按扩展名写入CSV（.csv）或 Chrome trace JSON（其它），返回写入的帧数"""
+        if path.lower().endswith('.csv'):
+            return self.write_csv(path)
+        return self.write_chrome_trace(path)
@@ -1,22 +1,91 @@
 # -*- coding: utf-8 -*-
+import time
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import h5py
-from PIL import Image
-import cv2
+
+from src.core.depth import DepthColorizer
+from src.core.parallel import resolve_workers
+from src.core.segments import load_label_segments
+from src.utils.logger import get_logger
+
+logger = get_logger('model')
+decode_logger = get_logger('decode')
+
+# iter_images 每次超平面读取的帧数
+IMAGE_BATCH_FRAMES = 64
+
+
+def open_hdf5_readonly(file_path: str) -> h5py.File:
+    """
+    以只读方式打开HDF5文件，不使用HDF5文件锁
+
+    界面以 r+ 模式打开的文件会持有文件锁，后台的只读扫描需要跳过文件锁才能同时打开。
+
+    Args:
+        file_path: HDF5文件路径
+
+    Returns:
+        打开的 h5py.File
+    """
+    try:
+        return h5py.File(file_path, 'r', locking=False)
+    except TypeError:
+        # 旧版本 h5py 不支持 locking 参数
+        return h5py.File(file_path, 'r')
+    except OSError:
+        # 同一进程中已经打开的文件不能以不同的锁设置再次打开，此时按默认设置打开（共享已有的文件句柄）
+        return h5py.File(file_path, 'r')
+
+
+def is_image_dataset(dataset) -> bool:
+    """
+    判断数据集是否为图像
+    
+    Args:
+        dataset: HDF5数据集
+        
+    Returns:
+        是否为图像数据集
+    """
+    # 检查数据集名称路径，看是否在 images 目录下
+    dataset_name = dataset.name
+    if '/images/' in dataset_name:
+        # 如果在images目录下，进一步检查数据类型和维度
+        if dataset.dtype == np.uint8:
+            if len(dataset.shape) == 2:
+                # 二维uint8数组，很可能是压缩图像数据
+                return True
+            elif len(dataset.shape) >= 3 and (dataset.shape[-1] == 3 or dataset.shape[-1] == 4):
+                # 三维或四维数组，最后一维是通道数，是未压缩图像
+                return True
+        if '_depth' in dataset_name.rsplit('/', 1)[-1] and len(dataset.shape) == 3 and dataset.dtype.kind in 'uif':
+            # 单通道深度图 (帧, 高, 宽)，如 uint16 毫米或 float32 米
+            return True
+    
+    # 原有的检测逻辑（兼容其他情况）
+    return (len(dataset.shape) >= 3 and 
+            (dataset.shape[-1] == 3 or dataset.shape[-1] == 4) and
+            dataset.dtype in [np.uint8, np.int8])
 
 
 class HDF5Model:
     """HDF5数据模型，用于管理和处理HDF5数据"""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, mode: str = 'r+', colorize_depth: bool = False):
         """
         初始化HDF5模型
         
         Args:
             file_path: HDF5文件路径
+            mode: 打开模式，'r+' 可写入标注，'r' 为只读（不使用文件锁）
+            colorize_depth: 是否将深度图渲染为伪彩色图像（界面显示用），否则返回原始深度数据
         """
         self.file_path = file_path
+        self.mode = mode
+        self.colorize_depth = colorize_depth
         self.file = None
         self.frame_count = 0
         self.image_keys = []
@@ -24,6 +93,16 @@ class HDF5Model:
         self.languages = {}
         self.compressed = False
         self.compress_len = None
+
+        # 最近解码图像的LRU缓存: {(key, frame_idx, reduced): image}
+        self.image_cache_size = 64
+        self._image_cache = OrderedDict()
+
+        # 每路深度流的伪彩色渲染器（各自估计深度范围）: {key: DepthColorizer}
+        self._depth_colorizers = {}
+
+        # 逐帧计时（src.core.frame_timing.FrameTimer），为None时不计时
+        self.frame_timer = None
         
         # 打开文件并初始化
         self._open_file()
@@ -32,7 +111,10 @@ class HDF5Model:
     def _open_file(self):
         """打开HDF5文件"""
         try:
-            self.file = h5py.File(self.file_path, 'r+')
+            if self.mode == 'r':
+                self.file = open_hdf5_readonly(self.file_path)
+            else:
+                self.file = h5py.File(self.file_path, self.mode)
         except Exception as e:
             raise RuntimeError(f"无法打开HDF5文件: {e}")
     
@@ -46,15 +128,15 @@ class HDF5Model:
                 # 如果是压缩数据集，加载压缩长度信息
                 if 'compress_len' in self.file:
                     self.compress_len = self.file['compress_len'][()]
-                    print(f"检测到压缩数据集，压缩长度信息形状: {self.compress_len.shape}")
+                    logger.debug("检测到压缩数据集，压缩长度信息形状: %s", self.compress_len.shape)
                 else:
-                    print("警告: 检测到compress=True但未找到compress_len数据集")
+                    logger.warning("检测到compress=True但未找到compress_len数据集")
                     self.compressed = False
             else:
-                print("检测到非压缩数据集")
+                logger.debug("检测到非压缩数据集")
                 
         except Exception as e:
-            print(f"检测压缩信息时出错: {e}")
+            logger.error("检测压缩信息时出错: %s", e)
             self.compressed = False
             self.compress_len = None
     
@@ -74,10 +156,10 @@ class HDF5Model:
                     dataset = images_group[cam_name]
                     if isinstance(dataset, h5py.Dataset) and len(dataset.shape) > 0:
                         self.frame_count = dataset.shape[0]
-                        print(f"从图像数据集 {cam_name} 获取帧数: {self.frame_count}")
+                        logger.debug("从图像数据集 %s 获取帧数: %s", cam_name, self.frame_count)
                         break
         except Exception as e:
-            print(f"从图像组获取帧数时出错: {e}")
+            logger.error("从图像组获取帧数时出错: %s", e)
         
         # 如果没有从图像获取到帧数，从其他数据集获取
         if self.frame_count == 0:
@@ -88,7 +170,7 @@ class HDF5Model:
                         # 跳过明显是标量或小数据集的键
                         if dataset.shape[0] > 1:  # 至少要有2帧
                             self.frame_count = dataset.shape[0]
-                            print(f"从数据集 {key} 获取帧数: {self.frame_count}")
+                            logger.debug("从数据集 %s 获取帧数: %s", key, self.frame_count)
                             break
                 except Exception as e:
                     continue
@@ -96,9 +178,9 @@ class HDF5Model:
         # 如果仍然没有帧数，设置默认值
         if self.frame_count == 0:
             self.frame_count = 1
-            print("警告: 无法确定帧数，设置默认值为1")
+            logger.warning("无法确定帧数，设置默认值为1")
         
-        print(f"最终确定的帧数: {self.frame_count}")
+        logger.debug("最终确定的帧数: %s", self.frame_count)
         
         # 获取图像键和数据键
         self._find_keys()
@@ -131,22 +213,7 @@ class HDF5Model:
         Returns:
             是否为图像数据集
         """
-        # 检查数据集名称路径，看是否在 images 目录下
-        dataset_name = dataset.name
-        if '/images/' in dataset_name:
-            # 如果在images目录下，进一步检查数据类型和维度
-            if dataset.dtype == np.uint8:
-                if len(dataset.shape) == 2:
-                    # 二维uint8数组，很可能是压缩图像数据
-                    return True
-                elif len(dataset.shape) >= 3 and (dataset.shape[-1] == 3 or dataset.shape[-1] == 4):
-                    # 三维或四维数组，最后一维是通道数，是未压缩图像
-                    return True
-        
-        # 原有的检测逻辑（兼容其他情况）
-        return (len(dataset.shape) >= 3 and 
-                (dataset.shape[-1] == 3 or dataset.shape[-1] == 4) and
-                dataset.dtype in [np.uint8, np.int8])
+        return is_image_dataset(dataset)
     
     def _load_languages(self):
         """加载已有的language"""
@@ -166,84 +233,44 @@ class HDF5Model:
         
         try:
             language_data = self.file[key]
-            print(f"加载{key}数据集，形状: {language_data.shape}, 类型: {language_data.dtype}")
-            
-            # 遍历所有帧，标记已有的language
-            current_task = None
-            start_idx = None
-            
-            for i in range(self.frame_count):
-                # 处理编码，确保可以正确处理中文
-                try:
-                    if i < language_data.shape[0] and (len(language_data.shape) == 1 or language_data.shape[1] > 0):
-                        # 尝试直接获取字符串
-                        if len(language_data.shape) == 1:
-                            # 一维数组
-                            task_value = language_data[i]
-                        else:
-                            # 二维数组
-                            task_value = language_data[i, 0]
-                        
-                        # 处理可能的字节对象
-                        if isinstance(task_value, bytes):
-                            task = task_value.decode('utf-8', errors='replace')
-                        elif isinstance(task_value, str):
-                            task = task_value
-                        elif isinstance(task_value, (int, float)):
-                            task = str(task_value)
-                        else:
-                            task = str(task_value)
-                        
-                        # 去除前后空白
-                        task = task.strip()
-                        
-                        # 处理特殊格式，如果显示为 b'...'
-                        if task.startswith("b'") and task.endswith("'"):
-                            try:
-                                task = task[2:-1]
-                            except:
-                                pass
-                    else:
-                        task = ""
-                except Exception as e:
-                    print(f"解码帧 {i} 的{key}时出错: {e}")
-                    task = ""
-                
-                if task and task != "0" and task != 0:  # 忽略空值和0值
-                    if current_task is None or task != current_task:
-                        # 新任务开始或任务变更
-                        if current_task is not None and start_idx is not None:
-                            # 保存上一个任务
-                            key_languages[(start_idx, i - 1)] = current_task
-                        
-                        current_task = task
-                        start_idx = i
-                    # 若任务未变更，继续追踪当前任务，无需操作
-                elif current_task is not None:
-                    # 任务结束
-                    if start_idx is not None:
-                        key_languages[(start_idx, i - 1)] = current_task
-                    current_task = None
-                    start_idx = None
+            logger.debug("加载%s数据集，形状: %s, 类型: %s", key, language_data.shape, language_data.dtype)
             
-            # 保存最后一个任务
-            if current_task is not None and start_idx is not None:
-                key_languages[(start_idx, self.frame_count - 1)] = current_task
+            # 整列读取并按游程编码提取段
+            key_languages = load_label_segments(language_data, self.frame_count)
             
             # 保存到缓存
             self.languages[key] = key_languages
             
             # 打印加载的language信息
-            print(f"加载了 {len(key_languages)} 个{key}段")
+            logger.info("加载了 %s 个%s段", len(key_languages), key)
             for (start, end), desc in key_languages.items():
-                print(f"{key}段: {start}-{end}, 描述: '{desc}'")
+                logger.debug("%s段: %s-%s, 描述: '%s'", key, start, end, desc)
                 
         except Exception as e:
-            print(f"加载{key}数据时出错: {e}")
+            logger.error("加载%s数据时出错: %s", key, e)
             self.languages[key] = {}
     
+    def reopen(self, mode: str):
+        """
+        以新的打开模式重新打开文件，保留已解析的键、language段和解码缓存
+
+        预加载池以只读模式预热文件（不更新修改时间、不持有写锁），成为当前文件时再以
+        'r+' 重新打开。
+
+        Args:
+            mode: 打开模式，见 __init__
+        """
+        if mode == self.mode and self.file:
+            return
+        if self.file:
+            self.file.close()
+            self.file = None
+        self.mode = mode
+        self._open_file()
+
     def close(self):
         """关闭HDF5文件"""
+        self._image_cache.clear()
         if self.file:
             self.file.close()
             self.file = None
@@ -308,40 +335,269 @@ class HDF5Model:
                         h5py.check_string_dtype(dtype) is not None or  # 可变长度字符串
                         'string' in str(dtype).lower()):  # 其他字符串类型
                         compatible_keys.append(key)
-                        print(f"字段 '{key}' 适合保存标注 (类型: {dtype})")
+                        logger.debug("字段 '%s' 适合保存标注 (类型: %s)", key, dtype)
                     else:
-                        print(f"字段 '{key}' 不适合保存标注 (类型: {dtype})")
+                        logger.debug("字段 '%s' 不适合保存标注 (类型: %s)", key, dtype)
 
             except Exception as e:
-                print(f"检查字段 '{key}' 时出错: {e}")
+                logger.error("检查字段 '%s' 时出错: %s", key, e)
 
         return compatible_keys
     
-    def get_image(self, key: str, frame_idx: int) -> np.ndarray:
+    def get_image(self, key: str, frame_idx: int, reduced: bool = False) -> np.ndarray:
         """
         获取指定帧的图像，自动处理压缩和非压缩的情况
         
         Args:
             key: 图像键
             frame_idx: 帧索引
+            reduced: 是否返回半分辨率图像（拖动进度条时的快速预览）
             
         Returns:
             图像数据
         """
         if key not in self.image_keys or not (0 <= frame_idx < self.frame_count):
             return None
+
+        cached = self.get_cached_image(key, frame_idx, reduced)
+        if cached is not None:
+            return cached
         
         # 获取原始图像数据
-        raw_image_data = self.file[key][frame_idx]
-        
-        # 如果不是压缩数据集，直接返回
+        timer = self.frame_timer
+        if timer is None:
+            image = self.decode_row(key, frame_idx, self.file[key][frame_idx], reduced)
+        else:
+            started = time.perf_counter()
+            raw_image_data = self.file[key][frame_idx]
+            started = timer.add('read', started, key)
+            image = self.decode_row(key, frame_idx, raw_image_data, reduced)
+            timer.add('decode', started, key)
+
+        if image is not None:
+            self._image_cache[(key, frame_idx, reduced)] = image
+            while len(self._image_cache) > self.image_cache_size:
+                self._image_cache.popitem(last=False)
+        return image
+
+    def get_cached_image(self, key: str, frame_idx: int, reduced: bool = False) -> Optional[np.ndarray]:
+        """
+        从解码缓存中获取图像，不触发读取和解码
+
+        快速预览时优先返回已缓存的全分辨率图像。
+
+        Args:
+            key: 图像键
+            frame_idx: 帧索引
+            reduced: 是否接受半分辨率图像
+
+        Returns:
+            缓存的图像，未命中时返回None
+        """
+        for cache_key in ((key, frame_idx, False), (key, frame_idx, True)) if reduced else ((key, frame_idx, False),):
+            image = self._image_cache.get(cache_key)
+            if image is not None:
+                self._image_cache.move_to_end(cache_key)
+                return image
+        return None
+    
+    def iter_images(self, key: str, start: int = 0, end: Optional[int] = None, step: int = 1, rgb: bool = False,
+                    threads: Optional[int] = None,
+                    batch_frames: int = IMAGE_BATCH_FRAMES) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+        """
+        按顺序逐帧返回一段帧范围的图像
+
+        每 batch_frames 帧以一次超平面读取读出原始数据，再用线程池并行解码（OpenCV 解码时释放GIL），
+        内存中最多保留一批图像。不使用也不填充单帧的解码缓存。
+
+        Args:
+            key: 图像键
+            start: 起始帧
+            end: 结束帧（不包含），为None时到最后一帧
+            step: 帧间隔
+            rgb: 是否将 BGR 通道顺序转换为 RGB
+            threads: 解码线程数，为None时使用CPU核数
+            batch_frames: 每次读取的帧数
+
+        Returns:
+            (帧索引, 图像) 的迭代器，解码失败的帧为None
+
+        Raises:
+            ValueError: 键不是图像键或帧范围无效
+        """
+        frames = self._image_range(key, start, end, step)
+        dataset = self.file[key]
+        executor = self._decode_executor(key, threads)
+        try:
+            for offset in range(0, len(frames), max(1, batch_frames)):
+                batch = frames[offset:offset + max(1, batch_frames)]
+                rows = dataset[batch[0]:batch[-1] + 1:step]
+                convert = lambda item: self._convert_row(key, item[0], item[1], rgb)
+                items = zip(batch, rows)
+                yield from zip(batch, executor.map(convert, items) if executor else map(convert, items))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def get_image_range(self, key: str, start: int = 0, end: Optional[int] = None, step: int = 1,
+                        out: Optional[np.ndarray] = None, rgb: bool = False,
+                        threads: Optional[int] = None) -> np.ndarray:
+        """
+        读取一段帧范围的全部图像
+
+        所有帧的原始数据以一次超平面读取读出，压缩图像用线程池并行解码后直接写入输出数组。
+
+        Args:
+            key: 图像键
+            start: 起始帧
+            end: 结束帧（不包含），为None时到最后一帧
+            step: 帧间隔
+            out: 预先分配的 (帧数, 高, 宽[, 通道]) 输出数组，为None时按第一帧的形状分配
+            rgb: 是否将 BGR 通道顺序转换为 RGB
+            threads: 解码线程数，为None时使用CPU核数
+
+        Returns:
+            输出数组；解码失败或形状与第一帧不一致的帧保留为0
+
+        Raises:
+            ValueError: 键不是图像键、帧范围无效或 out 的帧数不符
+        """
+        frames = self._image_range(key, start, end, step)
+        if out is not None and len(out) != len(frames):
+            raise ValueError(f"输出数组的帧数 {len(out)} 与帧范围的帧数 {len(frames)} 不一致")
+        if not len(frames):
+            return out if out is not None else np.zeros((0,), dtype=np.uint8)
+
+        rows = self.file[key][frames[0]:frames[-1] + 1:step]
+        if (not self.compressed or "_depth" in key) and not (self.colorize_depth and "_depth" in key):
+            # 非压缩数据集（以及不渲染的深度图）读出的就是图像
+            images = rows[..., [2, 1, 0] + list(range(3, rows.shape[-1]))] if rgb and self._is_color(rows[0]) else rows
+            if out is None:
+                return images
+            out[...] = images
+            return out
+
+        first = self._convert_row(key, frames[0], rows[0], rgb)
+        if out is None:
+            if first is None:
+                raise ValueError(f"无法解码 {key} 第 {frames[0]} 帧，不能确定输出数组的形状")
+            out = np.zeros((len(frames),) + first.shape, dtype=first.dtype)
+
+        def decode_into(i):
+            image = first if i == 0 else self._convert_row(key, frames[i], rows[i], rgb)
+            if image is not None and image.shape == out.shape[1:]:
+                out[i] = image
+                return True
+            out[i] = 0
+            decode_logger.warning("跳过无法解码或形状不一致的帧，键: %s, 帧: %s", key, frames[i])
+            return False
+
+        executor = self._decode_executor(key, threads)
+        try:
+            list(executor.map(decode_into, range(len(frames))) if executor else map(decode_into, range(len(frames))))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        return out
+
+    def _image_range(self, key: str, start: int, end: Optional[int], step: int) -> range:
+        """检查图像键和帧范围，返回帧索引"""
+        if key not in self.image_keys:
+            raise ValueError(f"不是图像键: {key}")
+        end = self.frame_count if end is None else end
+        if step < 1 or not (0 <= start <= end <= self.frame_count):
+            raise ValueError(f"无效的帧范围: [{start}, {end})，步长 {step}，总帧数 {self.frame_count}")
+        return range(start, end, step)
+
+    def _decode_executor(self, key: str, threads: Optional[int]) -> Optional[ThreadPoolExecutor]:
+        """需要解码且线程数大于1时创建解码线程池"""
+        threads = resolve_workers(threads)
+        if threads <= 1 or not self.compressed or "_depth" in key:
+            return None
+        return ThreadPoolExecutor(max_workers=threads, thread_name_prefix='image-decode')
+
+    def _convert_row(self, key: str, frame_idx: int, raw_image_data: np.ndarray, rgb: bool) -> Optional[np.ndarray]:
+        """解码一行原始数据，需要时转换为 RGB"""
+        image = self.decode_row(key, frame_idx, raw_image_data)
+        if rgb and image is not None and self._is_color(image):
+            image = image[..., [2, 1, 0] + list(range(3, image.shape[-1]))]
+        return image
+
+    @staticmethod
+    def _is_color(image: np.ndarray) -> bool:
+        """是否为3或4通道的彩色图像"""
+        return image.ndim == 3 and image.shape[-1] in (3, 4)
+
+    def decode_row(self, key: str, frame_idx: int, raw_image_data: np.ndarray, reduced: bool = False) -> np.ndarray:
+        """
+        将从数据集读出的一行原始数据转换为图像（不使用解码缓存）
+
+        Args:
+            key: 图像键
+            frame_idx: 帧索引
+            raw_image_data: 数据集第 frame_idx 行的原始数据
+            reduced: 是否返回半分辨率图像
+
+        Returns:
+            图像数据
+        """
+        if self.colorize_depth and "_depth" in key:
+            return self._colorize_depth_row(key, raw_image_data, reduced)
         if not self.compressed:
-            return raw_image_data
-        
+            # 非压缩数据集直接返回，快速预览时隔行隔列采样
+            return np.ascontiguousarray(raw_image_data[::2, ::2]) if reduced and raw_image_data.ndim >= 2 else raw_image_data
         # 处理压缩图像
-        return self._decode_compressed_image(key, frame_idx, raw_image_data)
-    
-    def _decode_compressed_image(self, key: str, frame_idx: int, compressed_data: np.ndarray) -> np.ndarray:
+        return self._decode_compressed_image(key, frame_idx, raw_image_data, reduced)
+
+    def _colorize_depth_row(self, key: str, raw_image_data: np.ndarray, reduced: bool = False) -> Optional[np.ndarray]:
+        """将一行深度数据渲染为伪彩色图像，一维数据按 PNG 等编码的深度图解码"""
+        depth = raw_image_data
+        if depth.ndim == 1:
+            import cv2
+            depth = cv2.imdecode(depth, cv2.IMREAD_UNCHANGED)
+            if depth is None:
+                decode_logger.warning("无法解码深度图，键: %s", key)
+                return None
+        if depth.ndim == 3 and depth.shape[-1] != 1:
+            # 已经是多通道图像（如预先渲染的深度可视化），直接返回
+            return depth
+        if reduced:
+            depth = depth[::2, ::2]
+        colorizer = self._depth_colorizers.get(key)
+        if colorizer is None:
+            colorizer = self._depth_colorizers.setdefault(key, DepthColorizer())
+        return colorizer.colorize(depth)
+
+    def _compressed_camera_index(self, key: str) -> Optional[int]:
+        """返回压缩相机在 compress_len 中的行号：非深度图像键按键名排序后的索引"""
+        non_depth_keys = sorted(k for k in self.get_image_keys() if "_depth" not in k)
+        return non_depth_keys.index(key) if key in non_depth_keys else None
+
+    def get_compressed_frame(self, key: str, frame_idx: int) -> Optional[np.ndarray]:
+        """
+        返回指定帧去除填充后的JPEG数据，不解码
+
+        Args:
+            key: 图像键
+            frame_idx: 帧索引
+
+        Returns:
+            一维 uint8 数组；非压缩数据集、深度图像或压缩长度无效时返回None
+        """
+        if not self.compressed or self.compress_len is None or "_depth" in key:
+            return None
+        if key not in self.image_keys or not (0 <= frame_idx < self.frame_count):
+            return None
+        cam_id = self._compressed_camera_index(key)
+        if cam_id is None or cam_id >= self.compress_len.shape[0] or frame_idx >= self.compress_len.shape[1]:
+            return None
+        row = self.file[key][frame_idx]
+        length = int(self.compress_len[cam_id, frame_idx])
+        if length <= 0 or length > len(row):
+            return None
+        return row[:length]
+
+    def _decode_compressed_image(self, key: str, frame_idx: int, compressed_data: np.ndarray, reduced: bool = False) -> np.ndarray:
         """
         解码压缩的图像数据
         
@@ -349,6 +605,7 @@ class HDF5Model:
             key: 图像键
             frame_idx: 帧索引
             compressed_data: 压缩的图像数据
+            reduced: 是否直接以半分辨率解码（JPEG 的 DCT 缩放解码，明显快于全分辨率）
             
         Returns:
             解码后的图像数据
@@ -359,25 +616,18 @@ class HDF5Model:
                 return compressed_data
             
             # 获取该相机的索引
-            image_keys = self.get_image_keys()
-            
-            # 过滤出非深度图像键，并按键名排序以确保一致的索引
-            non_depth_keys = [k for k in image_keys if "_depth" not in k]
-            non_depth_keys.sort()  # 排序确保一致性
-            
-            if key not in non_depth_keys:
-                print(f"警告: 键 {key} 不在非深度图像键列表中: {non_depth_keys}")
+            cam_id = self._compressed_camera_index(key)
+            if cam_id is None:
+                decode_logger.warning("键 %s 不在非深度图像键列表中", key)
                 return compressed_data
             
-            cam_id = non_depth_keys.index(key)
-            
             if self.compress_len is None:
-                print(f"警告: 无法找到压缩长度信息，键: {key}")
+                decode_logger.warning("无法找到压缩长度信息，键: %s", key)
                 return compressed_data
             
             # 检查compress_len的形状和索引
             if cam_id >= self.compress_len.shape[0] or frame_idx >= self.compress_len.shape[1]:
-                print(f"警告: 索引超出范围，cam_id: {cam_id}, frame_idx: {frame_idx}, compress_len形状: {self.compress_len.shape}")
+                decode_logger.warning("索引超出范围，cam_id: %s, frame_idx: %s, compress_len形状: %s", cam_id, frame_idx, self.compress_len.shape)
                 return compressed_data
             
             # 获取该帧的压缩长度
@@ -386,10 +636,10 @@ class HDF5Model:
             # 检查压缩长度是否合理
             max_reasonable_length = len(compressed_data)
             if compressed_length <= 0 or compressed_length > max_reasonable_length:
-                print(f"警告: 无效的压缩长度: {compressed_length}，数据长度: {len(compressed_data)}")
+                decode_logger.warning("无效的压缩长度: %s，数据长度: %s", compressed_length, len(compressed_data))
                 # 对于无效的压缩长度，尝试使用整个数据长度
                 if len(compressed_data) > 0:
-                    print(f"尝试使用完整数据长度: {len(compressed_data)}")
+                    decode_logger.debug("尝试使用完整数据长度: %s", len(compressed_data))
                     compressed_length = len(compressed_data)
                 else:
                     return None
@@ -397,21 +647,22 @@ class HDF5Model:
             # 提取有效的压缩数据（去除填充）
             valid_compressed_data = compressed_data[:compressed_length]
             
-            # 使用OpenCV解码JPEG图像
-            decoded_image = cv2.imdecode(valid_compressed_data, cv2.IMREAD_COLOR)
+            # 使用OpenCV解码JPEG图像（延迟导入：只读取元数据和标注的脚本与工作进程不需要加载OpenCV）
+            import cv2
+            decoded_image = cv2.imdecode(valid_compressed_data, cv2.IMREAD_REDUCED_COLOR_2 if reduced else cv2.IMREAD_COLOR)
 
             if decoded_image is None:
-                print(f"警告: 无法解码图像，键: {key}, 帧: {frame_idx}")
+                decode_logger.warning("无法解码图像，键: %s, 帧: %s", key, frame_idx)
                 return None
             
             # 根据测试结果，OpenCV的BGR格式在PyQt5中显示正确
             # 不需要进行颜色转换
-            print(f"解码图像形状: {decoded_image.shape}, BGR格式（直接使用）")
+            decode_logger.debug("解码图像形状: %s, BGR格式（直接使用）", decoded_image.shape)
             
             return decoded_image
             
         except Exception as e:
-            print(f"解码压缩图像时出错，键: {key}, 帧: {frame_idx}, 错误: {e}")
+            decode_logger.error("解码压缩图像时出错，键: %s, 帧: %s, 错误: %s", key, frame_idx, e)
             return None
     
     def get_data(self, key: str, frame_idx: Optional[int] = None) -> Any:
@@ -462,7 +713,7 @@ class HDF5Model:
                 return dataset[()]
                     
         except Exception as e:
-            print(f"获取数据 {key} 时出错: {e}, 数据集形状: {dataset.shape}")
+            logger.error("获取数据 %s 时出错: %s, 数据集形状: %s", key, e, dataset.shape)
             # 发生错误时的安全处理
             try:
                 # 尝试直接获取标量值
@@ -490,7 +741,7 @@ class HDF5Model:
                     'size': dataset.size
                 }
         except Exception as e:
-            print(f"获取数据集 {key} 信息时出错: {e}")
+            logger.error("获取数据集 %s 信息时出错: %s", key, e)
             return {
                 'shape': '未知',
                 'dtype': '未知',
@@ -687,7 +938,7 @@ class HDF5Model:
                 return raw_value
                 
         except Exception as e:
-            print(f"获取帧 {frame_idx} 的值时出错: {e}")
+            logger.error("获取帧 %s 的值时出错: %s", frame_idx, e)
             return None
     
     def _values_equal(self, value1: Any, value2: Any) -> bool:
@@ -771,42 +1022,42 @@ class HDF5Model:
         """
         language_keys = []
         
-        print(f"检测HDF5文件中的language类型键，文件包含的所有键: {list(self.file.keys())}")
+        logger.debug("检测HDF5文件中的language类型键，文件包含的所有键: %s", list(self.file.keys()))
         
         # 查找所有可能是language类型的键
         for key in self.file.keys():
             dataset = self.file[key]
             if isinstance(dataset, h5py.Dataset):
-                print(f"检查键 '{key}': 形状={dataset.shape}, 数据类型={dataset.dtype}")
+                logger.debug("检查键 '%s': 形状=%s, 数据类型=%s", key, dataset.shape, dataset.dtype)
                 # 检查是否是字符串类型的数据集
                 if (dataset.dtype.kind in ['S', 'U', 'O'] or  # 字节字符串、Unicode字符串、对象
                     h5py.check_string_dtype(dataset.dtype) is not None):
                     language_keys.append(key)
-                    print(f"添加语言键: '{key}'")
+                    logger.debug("添加语言键: '%s'", key)
         
         # 确保"language"键在列表中（如果存在）
         if "language" in self.file and "language" not in language_keys:
             language_keys.append("language")
-            print("添加默认的'language'键")
+            logger.debug("添加默认的'language'键")
         
         # 如果没有找到任何language键，检查是否有其他文本相关的键
         if not language_keys:
-            print("没有找到字符串类型的键，检查其他可能的文本键...")
+            logger.debug("没有找到字符串类型的键，检查其他可能的文本键...")
             # 查找包含"language", "text", "description", "label"等词的键
             text_related_keywords = ['language', 'text', 'description', 'label', 'instruction', 'task']
             for key in self.file.keys():
                 key_lower = key.lower()
                 if any(keyword in key_lower for keyword in text_related_keywords):
                     language_keys.append(key)
-                    print(f"添加文本相关键: '{key}'")
+                    logger.debug("添加文本相关键: '%s'", key)
         
         # 如果仍然没有找到任何键，创建一个默认的"language"键
         if not language_keys:
-            print("没有找到任何language类型的键，将创建默认的'language'键")
+            logger.debug("没有找到任何language类型的键，将创建默认的'language'键")
             # 不在这里创建，而是返回默认键名，让调用者决定是否创建
             language_keys.append("language")
         
-        print(f"最终返回的language键列表: {language_keys}")
+        logger.debug("最终返回的language键列表: %s", language_keys)
         return sorted(language_keys)
     
     def create_language_key(self, key: str) -> bool:
@@ -820,7 +1071,7 @@ class HDF5Model:
             是否创建成功
         """
         if key in self.file:
-            print(f"键 '{key}' 已存在")
+            logger.debug("键 '%s' 已存在", key)
             return False
         
         try:
@@ -832,10 +1083,10 @@ class HDF5Model:
             if key not in self.data_keys:
                 self.data_keys.append(key)
             
-            print(f"成功创建language键 '{key}'")
+            logger.info("成功创建language键 '%s'", key)
             return True
         except Exception as e:
-            print(f"创建language键 '{key}' 失败: {e}")
+            logger.error("创建language键 '%s' 失败: %s", key, e)
             return False
     
     def set_language_for_key(self, key: str, start_frame: int, end_frame: int, description: str) -> bool:
@@ -856,7 +1107,7 @@ class HDF5Model:
             if key not in self.file:
                 success = self.create_language_key(key)
                 if not success:
-                    print(f"创建键 {key} 失败")
+                    logger.error("创建键 %s 失败", key)
                     return False
 
             # 获取数据集
@@ -865,12 +1116,12 @@ class HDF5Model:
 
             # 检查帧范围
             if start_frame < 0 or end_frame >= frame_count or start_frame > end_frame:
-                print(f"帧范围无效: {start_frame}-{end_frame}, 总帧数: {frame_count}")
+                logger.warning("帧范围无效: %s-%s, 总帧数: %s", start_frame, end_frame, frame_count)
                 return False
 
             # 检查数据集类型并相应处理
             dtype = dataset.dtype
-            print(f"数据集 '{key}' 的类型: {dtype}")
+            logger.debug("数据集 '%s' 的类型: %s", key, dtype)
 
             # 设置范围内的所有帧
             for frame in range(start_frame, end_frame + 1):
@@ -883,14 +1134,14 @@ class HDF5Model:
                             dataset[frame, 0] = description
                     else:
                         # 非字符串类型，尝试转换
-                        print(f"警告：字段 '{key}' 不是字符串类型 ({dtype})，无法保存文本标注")
+                        logger.warning("字段 '%s' 不是字符串类型 (%s)，无法保存文本标注", key, dtype)
                         return False
 
                 except Exception as frame_error:
-                    print(f"设置帧 {frame} 失败: {frame_error}")
+                    logger.error("设置帧 %s 失败: %s", frame, frame_error)
                     return False
 
-            print(f"成功设置 {key} 帧 {start_frame}-{end_frame}: {description}")
+            logger.info("成功设置 %s 帧 %s-%s: %s", key, start_frame, end_frame, description)
 
             # 更新缓存 - 修复bug：确保缓存字典中的key存在
             if key not in self.languages:
@@ -903,9 +1154,77 @@ class HDF5Model:
             return True
 
         except Exception as e:
-            print(f"设置 {key} 失败: {e}")
+            logger.error("设置 %s 失败: %s", key, e)
             return False
     
+    def set_languages_for_key(self, key: str, windows: List[Tuple[int, int, str]]) -> bool:
+        """
+        批量为指定键写入多个时间窗口的language描述
+
+        读取整列、在内存中覆盖各窗口后一次写回；没有描述的窗口保留原有值。
+        写入失败时恢复原来的整列（新建的键则删除），保证单个文件要么全部写入、要么保持不变。
+
+        Args:
+            key: 键名
+            windows: (start_frame, end_frame, description) 列表
+
+        Returns:
+            是否设置成功
+        """
+        created = False
+        if key not in self.file:
+            if not self.create_language_key(key):
+                logger.error("创建键 %s 失败", key)
+                return False
+            created = True
+
+        dataset = self.file[key]
+        dtype = dataset.dtype
+        if not (dtype.kind in ['S', 'U'] or h5py.check_string_dtype(dtype) is not None):
+            logger.warning("字段 '%s' 不是字符串类型 (%s)，无法保存文本标注", key, dtype)
+            return False
+
+        frame_count = dataset.shape[0]
+        for start_frame, end_frame, description in windows:
+            if description and (start_frame < 0 or end_frame >= frame_count or start_frame > end_frame):
+                logger.warning("帧范围无效: %s-%s, 总帧数: %s", start_frame, end_frame, frame_count)
+                return False
+
+        column = dataset[:, 0] if dataset.ndim > 1 else dataset[()]
+        backup = column.copy()
+        values = column.astype(object)
+        fixed_length = dtype.kind == 'S'
+        for start_frame, end_frame, description in windows:
+            if description:
+                values[start_frame:end_frame + 1] = description.encode('utf-8') if fixed_length else description
+
+        try:
+            self._write_label_column(dataset, values.astype(dtype) if fixed_length else values)
+            self.file.flush()
+        except Exception as e:
+            logger.error("批量写入 %s 失败，恢复原有数据: %s", key, e)
+            try:
+                if created:
+                    del self.file[key]
+                else:
+                    self._write_label_column(dataset, backup)
+                self.file.flush()
+            except Exception as restore_error:
+                logger.error("恢复 %s 失败: %s", key, restore_error)
+            return False
+
+        # 按写入后的整列重新计算段缓存
+        self.languages[key] = load_label_segments(dataset, self.frame_count)
+        logger.info("成功写入 %s 的 %s 个时间窗口", key, sum(1 for w in windows if w[2]))
+        return True
+
+    def _write_label_column(self, dataset, values: np.ndarray):
+        """一次写入标注数据集的整列（一维数据集或二维数据集的第一列）"""
+        if dataset.ndim > 1:
+            dataset[:, 0] = values
+        else:
+            dataset[...] = values
+
     def set_string_key_for_all_frames(self, key_name: str, value: str) -> bool:
         """
         为所有帧设置指定的字符串键值
@@ -920,12 +1239,12 @@ class HDF5Model:
         try:
             frame_count = self.get_frame_count()
             if frame_count == 0:
-                print("文件中没有帧数据")
+                logger.debug("文件中没有帧数据")
                 return False
             
             # 如果键已存在，询问是否覆盖
             if key_name in self.file:
-                print(f"键 '{key_name}' 已存在，将被覆盖")
+                logger.debug("键 '%s' 已存在，将被覆盖", key_name)
                 del self.file[key_name]
             
             # 编码值为bytes
@@ -948,10 +1267,10 @@ class HDF5Model:
                 for i in range(frame_count):
                     dataset[i] = value
                     
-                print(f"成功创建字符串键 '{key_name}' 并设置所有 {frame_count} 帧为: '{value}'")
+                logger.info("成功创建字符串键 '%s' 并设置所有 %s 帧为: '%s'", key_name, frame_count, value)
                 
             except Exception as e:
-                print(f"使用字符串类型失败，尝试使用字节类型: {e}")
+                logger.warning("使用字符串类型失败，尝试使用字节类型: %s", e)
                 
                 # 如果字符串类型失败，使用字节类型
                 max_len = max(50, len(value_bytes) + 10)  # 预留一些空间
@@ -966,7 +1285,7 @@ class HDF5Model:
                 for i in range(frame_count):
                     dataset[i, 0] = value_bytes
                     
-                print(f"成功创建字节键 '{key_name}' 并设置所有 {frame_count} 帧为: '{value}'")
+                logger.info("成功创建字节键 '%s' 并设置所有 %s 帧为: '%s'", key_name, frame_count, value)
             
             # 确保数据写入文件
             self.file.flush()
@@ -974,7 +1293,7 @@ class HDF5Model:
             return True
             
         except Exception as e:
-            print(f"设置字符串键失败: {e}")
+            logger.error("设置字符串键失败: %s", e)
             return False
     
     def get_languages_for_key(self, key: str) -> Dict[Tuple[int, int], str]:
@@ -999,79 +1318,20 @@ class HDF5Model:
         
         try:
             language_data = self.file[key]
-            print(f"加载{key}数据集，形状: {language_data.shape}, 类型: {language_data.dtype}")
-            
-            # 遍历所有帧，标记已有的language
-            current_task = None
-            start_idx = None
-            
-            for i in range(self.frame_count):
-                # 处理编码，确保可以正确处理中文
-                try:
-                    if i < language_data.shape[0]:
-                        # 尝试直接获取字符串
-                        if len(language_data.shape) == 1:
-                            # 一维数组
-                            task_value = language_data[i]
-                        else:
-                            # 二维数组
-                            task_value = language_data[i, 0] if language_data.shape[1] > 0 else ""
-                        
-                        # 处理可能的字节对象
-                        if isinstance(task_value, bytes):
-                            task = task_value.decode('utf-8', errors='replace')
-                        elif isinstance(task_value, str):
-                            task = task_value
-                        elif isinstance(task_value, (int, float)):
-                            task = str(task_value)
-                        else:
-                            task = str(task_value)
-                        
-                        # 去除前后空白
-                        task = task.strip()
-                        
-                        # 处理特殊格式，如果显示为 b'...'
-                        if task.startswith("b'") and task.endswith("'"):
-                            try:
-                                task = task[2:-1]
-                            except:
-                                pass
-                    else:
-                        task = ""
-                except Exception as e:
-                    print(f"解码帧 {i} 的{key}时出错: {e}")
-                    task = ""
-                
-                if task and task != "0" and task != 0:  # 忽略空值和0值
-                    if current_task is None or task != current_task:
-                        # 新任务开始或任务变更
-                        if current_task is not None and start_idx is not None:
-                            # 保存上一个任务
-                            languages[(start_idx, i - 1)] = current_task
-                        
-                        current_task = task
-                        start_idx = i
-                    # 若任务未变更，继续追踪当前任务，无需操作
-                elif current_task is not None:
-                    # 任务结束
-                    if start_idx is not None:
-                        languages[(start_idx, i - 1)] = current_task
-                    current_task = None
-                    start_idx = None
+            logger.debug("加载%s数据集，形状: %s, 类型: %s", key, language_data.shape, language_data.dtype)
             
-            # 保存最后一个任务
-            if current_task is not None and start_idx is not None:
-                languages[(start_idx, self.frame_count - 1)] = current_task
+            # 整列读取并按游程编码提取段
+            languages = load_label_segments(language_data, self.frame_count)
                 
             # 打印加载的language信息
-            print(f"加载了 {len(languages)} 个{key}段")
+            logger.info("加载了 %s 个%s段", len(languages), key)
             for (start, end), desc in languages.items():
-                print(f"{key}段: {start}-{end}, 描述: '{desc}'")
+                logger.debug("%s段: %s-%s, 描述: '%s'", key, start, end, desc)
             
             # 将加载的数据缓存起来
             self.languages[key] = languages
                 
         except Exception as e:
-            print(f"加载{key}数据时出错: {e}")
+            logger.error("加载%s数据时出错: %s", key, e)
         
         return languages 
\ No newline at end of file
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.hdf5_model import HDF5Model
+from src.core.frame_scores import load_frame_scores
+from src.utils.logger import get_logger
+
+logger = get_logger('model')
+
+
+class WarmEpisode:
+    """预先打开并预热的episode：模型、帧分数和打开时文件的修改时间"""
+
+    def __init__(self, model: HDF5Model, scores: Optional[Tuple[np.ndarray, str, float]], mtime: float):
+        self.model = model
+        self.scores = scores
+        self.mtime = mtime
+
+
+def warm_episode(file_path: str, data_dirs: Optional[List[str]] = None, warm_frames: int = 1) -> WarmEpisode:
+    """
+    打开并预热一个episode
+
+    以只读模式构建 HDF5Model（键发现、压缩检测和language段加载），解码各相机的前几帧
+    放入模型的解码缓存，并加载帧分数。取用的模型需要写入时由调用方以 'r+' 重新打开。
+
+    Args:
+        file_path: HDF5文件路径
+        data_dirs: 分数文件的额外查找目录
+        warm_frames: 预先解码的帧数
+
+    Returns:
+        预热完成的 WarmEpisode
+    """
+    # 只读打开：不更新文件的修改时间，也不持有写锁（其它进程仍可打开）
+    model = HDF5Model(file_path, mode='r', colorize_depth=True)
+    try:
+        mtime = os.path.getmtime(file_path)
+        for key in model.get_image_keys():
+            for frame_idx in range(min(warm_frames, model.get_frame_count())):
+                model.get_image(key, frame_idx)
+        scores = load_frame_scores(file_path, model.get_frame_count(), data_dirs, model.file)
+    except Exception:
+        model.close()
+        raise
+    return WarmEpisode(model, scores, mtime)
+
+
+class ModelPool:
+    """
+    相邻episode的预加载池
+
+    在后台线程中以只读模式打开并预热文件夹中相邻的文件，切换文件时直接取用。池中的
+    模型都是只读的（归还的模型也重新以只读打开），最多保留 capacity 个模型（包括正在
+    预热的），超出时按最近最少使用的顺序关闭。
+    """
+
+    def __init__(self, capacity: int = 3, data_dirs: Optional[List[str]] = None, warm_frames: int = 1):
+        """
+        初始化预加载池
+
+        Args:
+            capacity: 池中最多保留的模型数量
+            data_dirs: 分数文件的额外查找目录
+            warm_frames: 每个相机预先解码的帧数
+        """
+        self.capacity = max(0, capacity)
+        self.data_dirs = data_dirs
+        self.warm_frames = warm_frames
+        # {规范化路径: Future[WarmEpisode]}，按使用顺序排列
+        self._entries = OrderedDict()
+        # 已被淘汰、但预热尚未结束（模型仍以只读打开）的文件: {规范化路径: 模型关闭后置位的 Event}
+        self._closing = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-pool')
+
+    @staticmethod
+    def _normalize(file_path: str) -> str:
+        return os.path.abspath(file_path)
+
+    def prefetch(self, file_paths: Iterable[str]):
+        """
+        在后台预热指定的文件，已在池中的文件只更新使用顺序
+
+        池中不在本次列表内的模型优先被淘汰。
+
+        Args:
+            file_paths: 需要预热的文件路径，靠前的优先
+        """
+        wanted = [self._normalize(p) for p in file_paths][:self.capacity]
+        for path in reversed(wanted):
+            if path in self._entries:
+                self._entries.move_to_end(path)
+        for path in wanted:
+            if path not in self._entries:
+                self._entries[path] = self._executor.submit(warm_episode, path, self.data_dirs, self.warm_frames)
+                logger.debug("开始预加载: %s", path)
+        self._evict(keep=set(wanted))
+
+    def acquire(self, file_path: str) -> Optional[WarmEpisode]:
+        """
+        从池中取出文件对应的episode，调用方负责之后的关闭或归还
+
+        正在预热的文件会等待预热完成；预热失败或文件在预热后被修改时返回None。
+        取出的模型是只读的，需要写入时调用 model.reopen('r+')。
+
+        该文件之前被淘汰、但预热仍在进行时，先等待预热结束并关闭其模型：同一进程中
+        只读打开的文件无法再以 'r+' 打开。因此调用方在以 'r+' 打开任何文件之前都应先调用
+        acquire（返回None时也是如此）。
+
+        Args:
+            file_path: HDF5文件路径
+
+        Returns:
+            预热好的 WarmEpisode，池中没有时返回None
+        """
+        path = self._normalize(file_path)
+        closed = self._closing.pop(path, None)
+        if closed is not None:
+            closed.wait()
+        future = self._entries.pop(path, None)
+        if future is None:
+            return None
+        try:
+            episode = future.result()
+        except Exception as e:
+            logger.warning("预加载 %s 失败: %s", file_path, e)
+            return None
+
+        try:
+            modified = os.path.getmtime(file_path) != episode.mtime
+        except OSError:
+            modified = True
+        if modified:
+            logger.debug("文件在预加载后被修改，重新打开: %s", file_path)
+            episode.model.close()
+            return None
+        return episode
+
+    def release(self, model: HDF5Model, scores: Optional[Tuple[np.ndarray, str, float]] = None):
+        """
+        将不再显示的模型归还到池中，再次切换回来时无需重新解析
+
+        模型以只读模式重新打开，在池中不持有写锁。
+
+        Args:
+            model: 归还的模型
+            scores: 该模型对应的帧分数
+        """
+        path = self._normalize(model.file_path)
+        try:
+            model.file.flush()
+            model.reopen('r')
+            mtime = os.path.getmtime(path)
+        except Exception:
+            model.close()
+            return
+
+        previous = self._entries.pop(path, None)
+        if previous is not None:
+            self._discard(path, previous)
+
+        future = Future()
+        future.set_result(WarmEpisode(model, scores, mtime))
+        self._entries[path] = future
+        self._evict()
+
+    def _evict(self, keep: Optional[set] = None):
+        """按最近最少使用的顺序关闭超出容量的模型，keep 中的路径最后淘汰"""
+        keep = keep or set()
+        while len(self._entries) > self.capacity:
+            victim = next((p for p in self._entries if p not in keep), None)
+            if victim is None:
+                victim = next(iter(self._entries))
+            logger.debug("关闭预加载的模型: %s", victim)
+            self._discard(victim, self._entries.pop(victim))
+
+    def _discard(self, path: str, future: Future):
+        """关闭（或在预热完成后关闭）池中的模型，尚未关闭时记录在 _closing 中"""
+        if future.cancel():
+            return
+        closed = threading.Event()
+        self._closing[path] = closed
+
+        def close_result(f):
+            try:
+                if not f.cancelled() and f.exception() is None:
+                    f.result().model.close()
+            finally:
+                closed.set()
+                if self._closing.get(path) is closed:
+                    self._closing.pop(path, None)
+
+        future.add_done_callback(close_result)
+
+    def clear(self):
+        """关闭池中的所有模型"""
+        while self._entries:
+            self._discard(*self._entries.popitem())
+
+    def shutdown(self):
+        """关闭池中的所有模型并停止后台线程"""
+        self.clear()
+        self._executor.shutdown(wait=True)
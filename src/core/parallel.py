@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+
+# 待处理的文件少于该数量时在当前进程中顺序处理，避免进程池的启动开销
+PARALLEL_THRESHOLD = 32
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """返回实际使用的进程数，为None或0时使用CPU核数"""
+    return max(1, workers or os.cpu_count() or 1)
+
+
+def iter_parallel(func: Callable[..., Any], items: Sequence[Any], *args: Any, workers: Optional[int] = None,
+                  should_stop: Optional[Callable[[], bool]] = None,
+                  threshold: int = PARALLEL_THRESHOLD, isolated: bool = False) -> Iterator[Any]:
+    """
+    在进程池中对每个元素调用 func(item, *args)，按输入顺序逐个返回结果
+
+    元素较少或只有一个进程时在当前进程中顺序执行（isolated 为True时除外）。func 必须是
+    模块级函数，子进程以 spawn 方式启动，避免在带有GUI线程的进程中 fork。
+
+    Args:
+        func: 处理单个元素的函数
+        items: 待处理的元素
+        args: 传给 func 的其余参数（对所有元素相同）
+        workers: 进程池大小，为None时使用CPU核数；1表示在当前进程中执行
+        should_stop: 返回True时提前结束
+        threshold: 少于该数量的元素在当前进程中顺序执行
+        isolated: 总是在子进程中执行。界面进程中以只读方式打开HDF5文件时使用：同一进程
+            已只读打开的文件无法再以 'r+' 打开，在子进程中读取不影响界面打开同一文件
+
+    Yields:
+        func 的返回值
+    """
+    if not items:
+        return
+    workers = resolve_workers(workers)
+    if isolated:
+        workers = min(workers, len(items))
+    elif workers <= 1 or len(items) < threshold:
+        for item in items:
+            if should_stop and should_stop():
+                return
+            yield func(item, *args)
+        return
+
+    chunksize = max(1, min(64, len(items) // (workers * 4)))
+    context = multiprocessing.get_context('spawn')
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        for result in executor.map(func, items, *(repeat(arg) for arg in args), chunksize=chunksize):
+            if should_stop and should_stop():
+                return
+            yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from src.core.hdf5_model import HDF5Model
+from src.utils.logger import get_logger
+
+logger = get_logger('decode')
+
+
+# 每次读取的最少帧数：按帧分块（或不分块）的数据集也按块读取
+MIN_BLOCK_FRAMES = 16
+
+# 光标之后预读的块数
+READ_AHEAD_BLOCKS = 2
+
+
+class PlaybackReader:
+    """
+    顺序播放用的图像读取器
+
+    逐帧调用 HDF5Model.get_image 时，每帧都要单独读取一次；若数据集按多帧分块压缩，
+    HDF5 的 chunk cache 放不下整个chunk 时同一个chunk会被反复解压。播放读取器按数据集的
+    chunk 形状以整块（chunk 帧数的整数倍，不少于 MIN_BLOCK_FRAMES 帧）为单位一次读取，
+    在后台线程中预读光标之后的块，帧从内存中的环形缓冲区切片后再解码；光标越过的块立即释放。
+    跳转到缓冲区之外的帧时丢弃缓冲区重新读取。
+    """
+
+    def __init__(self, model: HDF5Model, keys: Optional[Iterable[str]] = None,
+                 read_ahead: int = READ_AHEAD_BLOCKS, min_block_frames: int = MIN_BLOCK_FRAMES):
+        """
+        初始化播放读取器
+
+        Args:
+            model: 已打开的模型（读取器使用期间不能关闭）
+            keys: 要读取的图像键，为None时为全部图像键
+            read_ahead: 光标之后预读的块数
+            min_block_frames: 每块的最少帧数
+        """
+        self.model = model
+        self.read_ahead = max(0, read_ahead)
+        self.block_frames = {}  # {key: 每块帧数}
+        self._blocks = {}  # {key: {块号: Future[原始数据]}}，即环形缓冲区
+        self._stats = {}  # {key: [帧数, 取帧耗时, 等待读取耗时]}
+        self._read_seconds = {}  # {key: 后台读取耗时}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='playback-read')
+        for key in (model.get_image_keys() if keys is None else keys):
+            if key not in model.image_keys:
+                continue
+            chunks = model.file[key].chunks
+            chunk_frames = chunks[0] if chunks else 1
+            self.block_frames[key] = chunk_frames * max(1, -(-min_block_frames // chunk_frames))
+            self._blocks[key] = {}
+            self._stats[key] = [0, 0.0, 0.0]
+            self._read_seconds[key] = 0.0
+
+    def get_image(self, key: str, frame_idx: int) -> Optional[np.ndarray]:
+        """
+        读取一帧图像（与 HDF5Model.get_image 的结果相同）
+
+        Args:
+            key: 图像键
+            frame_idx: 帧索引
+
+        Returns:
+            图像数据，读取器不包含该键或帧超出范围时返回None
+        """
+        if key not in self.block_frames or not (0 <= frame_idx < self.model.get_frame_count()):
+            return None
+        started = time.perf_counter()
+        block_frames = self.block_frames[key]
+        block = frame_idx // block_frames
+        blocks = self._blocks[key]
+
+        # 释放光标越过的块，跳转到缓冲区之外时全部丢弃
+        for passed in [b for b in blocks if b < block or b > block + self.read_ahead]:
+            blocks.pop(passed).cancel()
+        for ahead in range(block, block + self.read_ahead + 1):
+            if ahead not in blocks and ahead * block_frames < self.model.get_frame_count():
+                blocks[ahead] = self._executor.submit(self._read_block, key, ahead)
+
+        waited = time.perf_counter()
+        rows = blocks[block].result()
+        waited = time.perf_counter() - waited
+        row = rows[frame_idx - block * block_frames]
+
+        timer = self.model.frame_timer
+        if timer is not None:
+            # 主线程上的读取耗时即等待预读的时间
+            decode_started = timer.add('read', started, key)
+        image = self.model.decode_row(key, frame_idx, row)
+        if timer is not None:
+            timer.add('decode', decode_started, key)
+        stats = self._stats[key]
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+        stats[2] += waited
+        return image
+
+    def _read_block(self, key: str, block: int) -> np.ndarray:
+        """以一次超平面读取读出一整块的原始数据（在预读线程中运行）"""
+        started = time.perf_counter()
+        start = block * self.block_frames[key]
+        rows = self.model.file[key][start:min(start + self.block_frames[key], self.model.get_frame_count())]
+        with self._lock:
+            self._read_seconds[key] += time.perf_counter() - started
+        timer = self.model.frame_timer
+        if timer is not None:
+            timer.add('read', started, key, background=True)
+        return rows
+
+    def buffered_bytes(self) -> int:
+        """环形缓冲区中已读取的数据量"""
+        total = 0
+        for blocks in self._blocks.values():
+            for future in blocks.values():
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    total += future.result().nbytes
+        return total
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        各相机的播放吞吐量
+
+        Returns:
+            {key: {'frames': 帧数, 'seconds': 取帧（等待读取和解码）总耗时, 'wait_seconds': 等待读取的耗时,
+                   'read_seconds': 后台读取耗时, 'fps': 持续吞吐量（帧/秒）}}
+        """
+        result = {}
+        with self._lock:
+            read_seconds = dict(self._read_seconds)
+        for key, (frames, seconds, waited) in self._stats.items():
+            result[key] = {'frames': frames, 'seconds': seconds, 'wait_seconds': waited,
+                           'read_seconds': read_seconds[key], 'fps': frames / seconds if seconds > 0 else 0.0}
+        return result
+
+    def log_stats(self):
+        """在日志中输出各相机的播放吞吐量"""
+        for key, stats in self.stats().items():
+            if stats['frames']:
+                logger.info("播放吞吐量 %s: %.1f 帧/秒（%s 帧，等待读取 %.0f ms，后台读取 %.0f ms）", key,
+                            stats['fps'], stats['frames'], stats['wait_seconds'] * 1000,
+                            stats['read_seconds'] * 1000)
+
+    def close(self):
+        """停止预读并释放缓冲区（模型不关闭）"""
+        for blocks in self._blocks.values():
+            for future in blocks.values():
+                future.cancel()
+            blocks.clear()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import h5py
+import numpy as np
+
+from src.core.hdf5_model import HDF5Model, open_hdf5_readonly
+from src.core.thumbnails import ThumbnailDecoder, image_signature
+from src.utils.cache_paths import get_cache_dir, path_digest
+from src.utils.logger import get_logger
+
+logger = get_logger('decode')
+
+
+# 代理图像的高度（像素），宽度按相机的宽高比计算
+PROXY_HEIGHT = 240
+
+# 所有代理文件的默认总大小上限
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+
+# 代理文件格式版本，格式变化时递增
+PROXY_VERSION = 1
+
+# 每批解码并写入的帧数
+BUILD_BLOCK = 32
+
+
+def default_proxy_dir() -> str:
+    """返回默认的代理文件目录"""
+    return get_cache_dir('proxies')
+
+
+def proxy_file_name(file_path: str, height: int = PROXY_HEIGHT) -> str:
+    """返回源文件对应的代理文件名"""
+    return f"{path_digest(file_path)}_{height}.h5"
+
+
+def read_proxy_signature(proxy_path: str, height: int = PROXY_HEIGHT) -> Optional[str]:
+    """读取代理文件记录的源图像签名，文件不存在、版本或高度不符时返回None"""
+    try:
+        with open_hdf5_readonly(proxy_path) as f:
+            if f.attrs.get('version') != PROXY_VERSION or f.attrs.get('height') != height:
+                return None
+            return str(f.attrs.get('signature', ''))
+    except Exception:
+        return None
+
+
+def build_proxy(file_path: str, proxy_path: str, height: int = PROXY_HEIGHT, force: bool = False,
+                threads: int = 1, should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+    """
+    为一个episode生成低分辨率代理文件
+
+    代理文件是一个HDF5文件，每个彩色相机一个与源文件同名的 (帧数, 高, 宽, 3) 未压缩
+    uint8 数据集，每帧一个chunk，读取一帧只需一次连续读取、无需解码。代理文件记录源文件
+    的图像内容签名，签名一致时跳过（force 为True时除外）。先写临时文件再替换。
+
+    Args:
+        file_path: 源HDF5文件路径
+        proxy_path: 代理文件路径
+        height: 代理图像高度
+        force: 是否忽略已有的代理文件
+        threads: 解码线程数（OpenCV 解码时释放GIL）
+        should_stop: 返回True时提前结束（不保留未完成的代理文件）
+
+    Returns:
+        path, proxy, status（built/fresh/stopped/skipped/error）, signature, bytes, frames, seconds, message
+    """
+    started = time.perf_counter()
+    result = {'path': file_path, 'proxy': proxy_path, 'status': 'error', 'signature': None,
+              'bytes': 0, 'frames': 0, 'seconds': 0.0, 'message': ''}
+    tmp_path = proxy_path + '.tmp'
+    executor = None
+    try:
+        model = HDF5Model(file_path, mode='r')
+        try:
+            signature = image_signature(model)
+            result['signature'] = signature
+            if not force and read_proxy_signature(proxy_path, height) == signature:
+                result['status'] = 'fresh'
+                result['bytes'] = os.path.getsize(proxy_path)
+                return result
+
+            decoder = ThumbnailDecoder(model, height)
+            frame_count = model.get_frame_count()
+            # 第一帧不能解码为彩色图像的相机（如深度图）以及原图不高于代理高度的相机不生成代理
+            cameras = {}
+            for key in model.get_image_keys():
+                source = model.get_image(key, 0)
+                if source is None or source.shape[0] <= height:
+                    continue
+                image = decoder.decode(key, 0)
+                if image is not None:
+                    cameras[key] = image.shape
+            if not cameras:
+                result['status'] = 'skipped'
+                result['message'] = "没有需要生成代理的彩色相机"
+                return result
+
+            if threads > 1:
+                executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='proxy-decode')
+            with h5py.File(tmp_path, 'w') as proxy:
+                proxy.attrs['version'] = PROXY_VERSION
+                proxy.attrs['height'] = height
+                proxy.attrs['signature'] = signature
+                proxy.attrs['source'] = os.path.abspath(file_path)
+                proxy.attrs['frame_count'] = frame_count
+                for key, shape in cameras.items():
+                    dataset = proxy.create_dataset(key, (frame_count,) + shape, dtype=np.uint8, chunks=(1,) + shape)
+                    for start in range(0, frame_count, BUILD_BLOCK):
+                        if should_stop and should_stop():
+                            result['status'] = 'stopped'
+                            return result
+                        frames = range(start, min(start + BUILD_BLOCK, frame_count))
+                        decode = lambda frame, key=key: decoder.decode(key, frame)
+                        images = list(executor.map(decode, frames) if executor else map(decode, frames))
+                        block = np.zeros((len(frames),) + shape, dtype=np.uint8)
+                        for i, image in enumerate(images):
+                            # 解码失败的帧保留为黑色
+                            if image is not None and image.shape == shape:
+                                block[i] = image
+                        dataset[start:start + len(frames)] = block
+            os.replace(tmp_path, proxy_path)
+            result['status'] = 'built'
+            result['frames'] = frame_count
+            result['bytes'] = os.path.getsize(proxy_path)
+        finally:
+            model.close()
+    except Exception as e:
+        result['message'] = str(e)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if result['status'] != 'built' and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        result['seconds'] = time.perf_counter() - started
+    return result
+
+
+class ProxyReader:
+    """只读打开的代理文件"""
+
+    def __init__(self, proxy_path: str):
+        self.proxy_path = proxy_path
+        self.file = open_hdf5_readonly(proxy_path)
+        self.keys = set()
+        self.file.visititems(lambda name, obj: self.keys.add(name) if isinstance(obj, h5py.Dataset) else None)
+
+    def get_image(self, key: str, frame_idx: int) -> Optional[np.ndarray]:
+        """
+        读取一帧代理图像
+
+        Args:
+            key: 源文件中的图像键
+            frame_idx: 帧索引
+
+        Returns:
+            (高, 宽, 3) 的 uint8 数组，没有该相机或帧时返回None
+        """
+        if key not in self.keys:
+            return None
+        dataset = self.file[key]
+        if not (0 <= frame_idx < dataset.shape[0]):
+            return None
+        return dataset[frame_idx]
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class ProxyStore:
+    """
+    按episode缓存的低分辨率代理文件
+
+    代理文件保存在缓存目录下、按源文件路径命名，文件内记录源图像的内容签名用于判断是否
+    过期。SQLite 索引记录每个代理文件的大小和最近使用时间，总大小超过上限时按最近最少
+    使用的顺序删除其它episode的代理文件。
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None, height: int = PROXY_HEIGHT):
+        """
+        打开（必要时创建）代理目录和索引
+
+        Args:
+            root: 代理文件目录，为None时使用缓存目录下的 proxies
+            max_bytes: 总大小上限，指定时写入索引供之后使用；为None时使用索引中记录的上限或默认值
+            height: 代理图像高度
+        """
+        self.root = root or default_proxy_dir()
+        os.makedirs(self.root, exist_ok=True)
+        self.height = height
+        self.connection = sqlite3.connect(os.path.join(self.root, 'index.sqlite'), timeout=30)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS proxies ("
+            "proxy TEXT PRIMARY KEY, source TEXT, bytes INTEGER, last_used REAL)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+        if max_bytes is not None:
+            self.connection.execute("INSERT OR REPLACE INTO settings (name, value) VALUES ('max_bytes', ?)",
+                                    (str(int(max_bytes)),))
+            self.connection.commit()
+            self.max_bytes = int(max_bytes)
+        else:
+            row = self.connection.execute("SELECT value FROM settings WHERE name = 'max_bytes'").fetchone()
+            self.max_bytes = int(row[0]) if row else DEFAULT_MAX_BYTES
+
+    def proxy_path(self, file_path: str) -> str:
+        """返回源文件对应的代理文件路径"""
+        return os.path.join(self.root, proxy_file_name(file_path, self.height))
+
+    def open(self, model: HDF5Model) -> Optional[ProxyReader]:
+        """
+        打开与已打开模型的图像内容一致的代理文件，并更新其最近使用时间
+
+        Args:
+            model: 源文件的模型
+
+        Returns:
+            代理文件读取器，没有有效的代理文件时返回None
+        """
+        proxy_path = self.proxy_path(model.file_path)
+        if not os.path.exists(proxy_path):
+            return None
+        try:
+            if read_proxy_signature(proxy_path, self.height) != image_signature(model):
+                return None
+            reader = ProxyReader(proxy_path)
+        except Exception as e:
+            logger.warning("打开代理文件失败 (%s): %s", proxy_path, e)
+            return None
+        self.record(model.file_path, proxy_path)
+        return reader
+
+    def build(self, file_path: str, force: bool = False, threads: int = 1,
+              should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """在当前进程中生成代理文件，记录到索引并按上限淘汰（参数和返回值见 build_proxy）"""
+        result = build_proxy(file_path, self.proxy_path(file_path), self.height, force, threads, should_stop)
+        if result['status'] in ('built', 'fresh'):
+            self.record(file_path, result['proxy'], result['bytes'])
+            result['evicted'] = self.evict(keep=[result['proxy']])
+        return result
+
+    def record(self, file_path: str, proxy_path: str, size: Optional[int] = None):
+        """记录（或更新）代理文件的大小和最近使用时间"""
+        if size is None:
+            try:
+                size = os.path.getsize(proxy_path)
+            except OSError:
+                return
+        self.connection.execute("INSERT OR REPLACE INTO proxies (proxy, source, bytes, last_used) VALUES (?, ?, ?, ?)",
+                                (proxy_path, os.path.abspath(file_path), size, time.time()))
+        self.connection.commit()
+
+    def total_bytes(self) -> int:
+        """索引中所有代理文件的总大小"""
+        return self.connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM proxies").fetchone()[0]
+
+    def evict(self, keep: Iterable[str] = ()) -> List[str]:
+        """
+        总大小超过上限时按最近最少使用的顺序删除代理文件
+
+        目录中不在索引里的代理文件（如索引被删除后）先以文件修改时间作为最近使用时间加入索引。
+
+        Args:
+            keep: 不删除的代理文件路径
+
+        Returns:
+            被删除的代理文件路径
+        """
+        self._index_untracked()
+        keep = set(keep)
+        removed = []
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return removed
+        rows = self.connection.execute("SELECT proxy, bytes FROM proxies ORDER BY last_used").fetchall()
+        for proxy_path, size in rows:
+            if total <= self.max_bytes:
+                break
+            if proxy_path in keep:
+                continue
+            try:
+                os.remove(proxy_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("删除代理文件失败 (%s): %s", proxy_path, e)
+                continue
+            self.connection.execute("DELETE FROM proxies WHERE proxy = ?", (proxy_path,))
+            total -= size
+            removed.append(proxy_path)
+        self.connection.commit()
+        if removed:
+            logger.info("代理文件超过大小上限，删除了 %s 个最近最少使用的代理文件", len(removed))
+        return removed
+
+    def _index_untracked(self):
+        """将目录中不在索引里的代理文件加入索引，并移除索引中已不存在的文件"""
+        tracked = {row[0] for row in self.connection.execute("SELECT proxy FROM proxies")}
+        with os.scandir(self.root) as entries:
+            present = {entry.path: entry.stat() for entry in entries if entry.name.endswith('.h5')}
+        missing = tracked - present.keys()
+        if missing:
+            self.connection.executemany("DELETE FROM proxies WHERE proxy = ?", [(p,) for p in missing])
+        untracked = present.keys() - tracked
+        if untracked:
+            self.connection.executemany(
+                "INSERT INTO proxies (proxy, source, bytes, last_used) VALUES (?, NULL, ?, ?)",
+                [(p, present[p].st_size, present[p].st_mtime) for p in untracked])
+        if missing or untracked:
+            self.connection.commit()
+
+    def close(self):
+        self.connection.close()
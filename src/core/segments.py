@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+import h5py
+
+
+# 视为"未标注"的帧值
+EMPTY_LABELS = ('', '0')
+
+
+def _normalize_label(value) -> str:
+    """将数据集中的单个值转换为去除首尾空白的字符串"""
+    if isinstance(value, bytes):
+        text = value.decode('utf-8', errors='replace')
+    else:
+        text = str(value)
+    text = text.strip()
+    # 处理特殊格式，如果显示为 b'...'
+    if text.startswith("b'") and text.endswith("'"):
+        text = text[2:-1]
+    return text
+
+
+def is_label_dataset(obj) -> bool:
+    """是否为字符串类型的数据集（可作为标注字段）"""
+    return isinstance(obj, h5py.Dataset) and (
+        obj.dtype.kind in ('S', 'U') or h5py.check_string_dtype(obj.dtype) is not None)
+
+
+def read_label_column(dataset: h5py.Dataset, frame_count: Optional[int] = None) -> np.ndarray:
+    """
+    一次性读取标注数据集的第一列并转换为字符串数组
+
+    整列只读取一次，只对不同的取值做解码，不逐帧访问数据集。
+
+    Args:
+        dataset: 一维或二维的HDF5数据集
+        frame_count: 总帧数；数据集较短时用空字符串补齐，较长时截断
+
+    Returns:
+        长度为 frame_count 的 object 数组，元素为 str
+    """
+    if dataset.ndim == 0 or dataset.shape[0] == 0 or (dataset.ndim > 1 and dataset.shape[1] == 0):
+        raw = np.empty(0, dtype=object)
+    elif dataset.ndim == 1:
+        raw = dataset[()]
+    else:
+        raw = dataset[:, 0]
+
+    if frame_count is None:
+        frame_count = len(raw)
+    raw = raw[:frame_count]
+
+    labels = np.full(frame_count, '', dtype=object)
+    if len(raw):
+        uniques, inverse = np.unique(np.asarray(raw), return_inverse=True)
+        decoded = np.array([_normalize_label(u) for u in uniques], dtype=object)
+        labels[:len(raw)] = decoded[inverse.ravel()]
+    return labels
+
+
+def labeled_mask(labels: np.ndarray) -> np.ndarray:
+    """返回每帧是否已标注的布尔数组（空字符串和"0"视为未标注）"""
+    return ~np.isin(labels, EMPTY_LABELS)
+
+
+def label_runs(labels: np.ndarray) -> List[Tuple[int, int, str]]:
+    """
+    按游程编码计算连续且取值相同的已标注段
+
+    Args:
+        labels: read_label_column 返回的字符串数组
+
+    Returns:
+        [(start, end, label)]，end 为包含的结束帧
+    """
+    if len(labels) == 0:
+        return []
+    uniques, codes = np.unique(labels, return_inverse=True)
+    codes = codes.ravel().astype(np.int64)
+    codes[~labeled_mask(labels)] = -1
+
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(codes)])) - 1
+    keep = codes[starts] >= 0
+    return [(int(s), int(e), uniques[codes[s]]) for s, e in zip(starts[keep], ends[keep])]
+
+
+def load_label_segments(dataset: h5py.Dataset, frame_count: Optional[int] = None) -> Dict[Tuple[int, int], str]:
+    """
+    读取标注数据集并返回标注段
+
+    Args:
+        dataset: 标注数据集
+        frame_count: 总帧数
+
+    Returns:
+        {(start, end): label}，与 HDF5Model.languages 的格式一致
+    """
+    labels = read_label_column(dataset, frame_count)
+    return {(start, end): label for start, end, label in label_runs(labels)}
+
+
+def label_coverage(labels: np.ndarray) -> float:
+    """返回已标注帧占总帧数的比例"""
+    if len(labels) == 0:
+        return 0.0
+    return float(labeled_mask(labels).mean())
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.hdf5_model import HDF5Model
+from src.utils.cache_paths import get_cache_dir, path_digest
+from src.utils.logger import get_logger
+
+logger = get_logger('decode')
+
+
+# 各层级的采样间隔（帧），由密到疏。稀疏层级的采样帧都是最密层级的采样帧，
+# 因此只保存最密层级，其余层级是它的步长切片
+MIPMAP_STRIDES = (8, 32, 128)
+
+# 缩略图高度（像素），宽度按相机的宽高比计算
+THUMBNAIL_HEIGHT = 48
+
+# 缓存格式版本，格式变化时递增
+THUMBNAIL_VERSION = 1
+
+
+def thumbnail_cache_path(file_path: str) -> str:
+    """返回episode缩略图的磁盘缓存路径"""
+    return os.path.join(get_cache_dir('thumbnails'), path_digest(file_path) + '.npz')
+
+
+def image_signature(model: HDF5Model) -> str:
+    """
+    计算episode图像内容的签名，用作缩略图缓存的键
+
+    界面以 r+ 模式打开文件就会更新修改时间，保存标注也会改变文件大小，因此不使用
+    修改时间和大小，而是由帧数、compress_len 以及各相机数据集的形状和首尾两帧计算。
+
+    Args:
+        model: 已打开的模型
+
+    Returns:
+        十六进制签名
+    """
+    digest = hashlib.sha1(str(model.get_frame_count()).encode())
+    if model.compress_len is not None:
+        digest.update(np.ascontiguousarray(model.compress_len).tobytes())
+    for key in sorted(model.get_image_keys()):
+        dataset = model.file[key]
+        digest.update(f"{key}{dataset.shape}{dataset.dtype}".encode())
+        if dataset.shape[0]:
+            digest.update(np.ascontiguousarray(dataset[0]).tobytes())
+            digest.update(np.ascontiguousarray(dataset[-1]).tobytes())
+    return digest.hexdigest()
+
+
+class ThumbnailMipmap:
+    """
+    一个episode各相机的缩略图 mipmap
+
+    最密层级每 strides[0] 帧保存一张缩略图，稀疏层级（如每32、128帧）取它的步长切片。
+    images[key] 为 (采样数, 高, 宽, 3) 的 uint8 数组，filled[key] 标记已生成的采样。
+    """
+
+    def __init__(self, frame_count: int, strides: Sequence[int] = MIPMAP_STRIDES,
+                 height: int = THUMBNAIL_HEIGHT, signature: str = ''):
+        """
+        初始化空的 mipmap
+
+        Args:
+            frame_count: 总帧数
+            strides: 各层级的采样间隔，均应为最小间隔的整数倍
+            height: 缩略图高度
+            signature: 图像内容签名
+        """
+        self.frame_count = frame_count
+        self.strides = tuple(sorted(strides))
+        self.height = height
+        self.signature = signature
+        self.images = {}  # {key: (采样数, 高, 宽, 3) uint8}
+        self.filled = {}  # {key: (采样数,) bool}
+
+    @property
+    def base_stride(self) -> int:
+        """最密层级的采样间隔"""
+        return self.strides[0]
+
+    @property
+    def sample_count(self) -> int:
+        """最密层级的采样数"""
+        return (self.frame_count + self.base_stride - 1) // self.base_stride
+
+    def keys(self):
+        """有缩略图的图像键"""
+        return list(self.images)
+
+    def add_camera(self, key: str, width: int):
+        """为相机分配缩略图数组"""
+        self.images[key] = np.zeros((self.sample_count, self.height, width, 3), dtype=np.uint8)
+        self.filled[key] = np.zeros(self.sample_count, dtype=bool)
+
+    def set_thumbnail(self, key: str, sample: int, image: np.ndarray):
+        """写入一张缩略图（先写图像再标记，其它线程读取时不会看到未写完的标记）"""
+        self.images[key][sample] = image
+        self.filled[key][sample] = True
+
+    def is_complete(self) -> bool:
+        """所有相机的所有采样是否都已生成"""
+        return all(filled.all() for filled in self.filled.values())
+
+    def stride_for_spacing(self, frames_per_thumbnail: float) -> int:
+        """
+        选择适合当前显示密度的层级
+
+        Args:
+            frames_per_thumbnail: 每张缩略图在时间轴上占据的帧数
+
+        Returns:
+            不超过该帧数的最稀疏层级的采样间隔，都超过时返回最密层级
+        """
+        usable = [stride for stride in self.strides if stride <= frames_per_thumbnail]
+        return usable[-1] if usable else self.base_stride
+
+    def nearest(self, key: str, frame: int, stride: Optional[int] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        返回离指定帧最近的缩略图，不解码
+
+        Args:
+            key: 图像键
+            frame: 帧索引
+            stride: 在该层级的采样中查找，为None时使用最密层级；
+                    对应的采样尚未生成时使用所有已生成采样中最近的一张
+
+        Returns:
+            (缩略图对应的帧号, 图像)，没有可用的缩略图时返回None
+        """
+        filled = self.filled.get(key)
+        if filled is None or not len(filled):
+            return None
+        step = max(1, (stride or self.base_stride) // self.base_stride)
+        sample = int(round(frame / (self.base_stride * step))) * step
+        sample = max(0, min(sample, (len(filled) - 1) // step * step))
+        if not filled[sample]:
+            candidates = np.flatnonzero(filled)
+            if not len(candidates):
+                return None
+            sample = int(candidates[np.argmin(np.abs(candidates * self.base_stride - frame))])
+        return sample * self.base_stride, self.images[key][sample]
+
+    def save(self, path: str):
+        """写入 .npz 缓存（先写临时文件再替换）"""
+        keys = self.keys()
+        meta = {'version': THUMBNAIL_VERSION, 'frame_count': self.frame_count, 'strides': self.strides,
+                'height': self.height, 'signature': self.signature, 'keys': keys}
+        arrays = {'meta': np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)}
+        for i, key in enumerate(keys):
+            arrays[f'images_{i}'] = self.images[key]
+            arrays[f'filled_{i}'] = self.filled[key]
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ThumbnailMipmap']:
+        """读取 .npz 缓存，文件不存在、损坏或版本不符时返回None"""
+        try:
+            with np.load(path) as data:
+                meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+                if meta.get('version') != THUMBNAIL_VERSION:
+                    return None
+                mipmap = cls(meta['frame_count'], meta['strides'], meta['height'], meta['signature'])
+                for i, key in enumerate(meta['keys']):
+                    mipmap.images[key] = data[f'images_{i}']
+                    mipmap.filled[key] = data[f'filled_{i}']
+            return mipmap
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("读取缩略图缓存失败 (%s): %s", path, e)
+            return None
+
+
+class ThumbnailDecoder:
+    """
+    将单帧解码为固定高度的缩略图
+
+    JPEG 使用 DCT 缩放解码（1/2、1/4、1/8），按相机的第一帧选择不低于缩略图高度的最大缩放比例，
+    再用 INTER_AREA 缩放到缩略图尺寸。
+    """
+
+    def __init__(self, model: HDF5Model, height: int = THUMBNAIL_HEIGHT):
+        self.model = model
+        self.height = height
+        self._flags = {}  # {key: cv2.imdecode 的标志}
+        self._widths = {}  # {key: 缩略图宽度}
+
+    def decode(self, key: str, frame_idx: int) -> Optional[np.ndarray]:
+        """
+        解码一帧缩略图
+
+        Args:
+            key: 图像键
+            frame_idx: 帧索引
+
+        Returns:
+            (高, 宽, 3) 的 uint8 数组；深度图等不能显示为彩色缩略图的数据返回None
+        """
+        import cv2
+
+        jpeg = self.model.get_compressed_frame(key, frame_idx)
+        if jpeg is not None:
+            image = cv2.imdecode(jpeg, self._flags.get(key, cv2.IMREAD_COLOR))
+            if image is not None and key not in self._flags:
+                self._flags[key] = self._reduced_flag(image.shape[0])
+        elif self.model.compressed and "_depth" not in key:
+            return None
+        else:
+            image = self.model.file[key][frame_idx]
+
+        if image is None or image.ndim != 3 or image.shape[-1] not in (3, 4) or image.dtype != np.uint8:
+            return None
+        if key not in self._widths:
+            self._widths[key] = max(1, int(round(image.shape[1] * self.height / image.shape[0])))
+        return cv2.resize(image[..., :3], (self._widths[key], self.height), interpolation=cv2.INTER_AREA)
+
+    def _reduced_flag(self, full_height: int) -> int:
+        """选择解码后高度仍不低于缩略图高度的最大缩放比例"""
+        import cv2
+
+        for factor, flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                             (2, cv2.IMREAD_REDUCED_COLOR_2)):
+            if full_height // factor >= self.height:
+                return flag
+        return cv2.IMREAD_COLOR
+
+
+def build_thumbnails(file_path: str, strides: Sequence[int] = MIPMAP_STRIDES, height: int = THUMBNAIL_HEIGHT,
+                     cache_path: Optional[str] = None,
+                     on_update: Optional[Callable[[ThumbnailMipmap], None]] = None,
+                     should_stop: Optional[Callable[[], bool]] = None) -> Optional[ThumbnailMipmap]:
+    """
+    生成（或从磁盘缓存读取）episode的缩略图 mipmap
+
+    以只读方式单独打开文件，可在后台线程中调用。从最稀疏的层级开始生成，逐级加密，
+    每完成一个层级调用一次 on_update，界面可以先显示稀疏的缩略图。中途停止时保存
+    已生成的部分，下次从缓存继续。
+
+    Args:
+        file_path: HDF5文件路径
+        strides: 各层级的采样间隔
+        height: 缩略图高度
+        cache_path: 缓存文件路径，为None时使用缓存目录下按文件路径命名的文件
+        on_update: 每完成一个层级（以及读取到完整缓存时）的回调
+        should_stop: 返回True时提前结束
+
+    Returns:
+        mipmap；文件没有可显示的相机或提前结束时返回None
+    """
+    cache_path = cache_path or thumbnail_cache_path(file_path)
+    model = HDF5Model(file_path, mode='r')
+    try:
+        signature = image_signature(model)
+        mipmap = ThumbnailMipmap.load(cache_path)
+        if (mipmap is None or mipmap.signature != signature or mipmap.strides != tuple(sorted(strides))
+                or mipmap.height != height):
+            mipmap = ThumbnailMipmap(model.get_frame_count(), strides, height, signature)
+        elif mipmap.is_complete():
+            if on_update and mipmap.keys():
+                on_update(mipmap)
+            return mipmap if mipmap.keys() else None
+
+        decoder = ThumbnailDecoder(model, height)
+        # 第一帧不能解码为彩色缩略图的相机（如深度图）不生成缩略图
+        cameras = []
+        for key in model.get_image_keys():
+            if key in mipmap.images:
+                cameras.append(key)
+                continue
+            image = decoder.decode(key, 0)
+            if image is not None:
+                mipmap.add_camera(key, image.shape[1])
+                mipmap.set_thumbnail(key, 0, image)
+                cameras.append(key)
+
+        stopped = False
+        for stride in reversed(mipmap.strides):
+            step = stride // mipmap.base_stride
+            for key in cameras:
+                filled = mipmap.filled[key]
+                for sample in range(0, mipmap.sample_count, step):
+                    if filled[sample]:
+                        continue
+                    if should_stop and should_stop():
+                        stopped = True
+                        break
+                    image = decoder.decode(key, sample * mipmap.base_stride)
+                    if image is not None:
+                        mipmap.set_thumbnail(key, sample, image)
+                    else:
+                        # 单帧解码失败时保留黑色缩略图，避免每次都重新生成
+                        filled[sample] = True
+                if stopped:
+                    break
+            if stopped:
+                break
+            if on_update and cameras:
+                on_update(mipmap)
+
+        try:
+            mipmap.save(cache_path)
+        except Exception as e:
+            logger.warning("写入缩略图缓存失败 (%s): %s", cache_path, e)
+        if stopped or not cameras:
+            return None
+        logger.debug("缩略图生成完成: %s (%s 个相机，每相机 %s 张)", file_path, len(cameras), mipmap.sample_count)
+        return mipmap
+    finally:
+        model.close()
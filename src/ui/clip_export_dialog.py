@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QLineEdit,
+                             QPushButton, QComboBox, QCheckBox, QSpinBox, QFileDialog, QMessageBox)
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from src.core.clip_export import DEFAULT_CLIP_FPS, export_clip, plan_clip_jobs
+from src.core.parallel import iter_parallel, resolve_workers
+
+
+class ClipExportWorker(QThread):
+    """在后台导出视频片段（任务多于一个时使用进程池）"""
+
+    clipExported = pyqtSignal(int, int, dict)  # 已完成数、总数、export_clip 的结果
+    exportFinished = pyqtSignal(list, float)  # 全部结果、耗时（秒）
+
+    def __init__(self, jobs: List[Dict[str, Any]], parent=None):
+        super().__init__(parent)
+        self.jobs = jobs
+
+    def run(self):
+        started = time.perf_counter()
+        workers = min(resolve_workers(None), len(self.jobs))
+        threads = resolve_workers(None) if workers == 1 else 1
+        results = []
+        for done, result in enumerate(iter_parallel(export_clip, self.jobs, threads, workers=workers,
+                                                    should_stop=self.isInterruptionRequested, threshold=2), 1):
+            results.append(result)
+            self.clipExported.emit(done, len(self.jobs), result)
+        self.exportFinished.emit(results, time.perf_counter() - started)
+
+
+class ClipExportDialog(QDialog):
+    """导出视频片段的选项对话框"""
+
+    def __init__(self, parent=None, file_path: str = "", windows: Sequence[Sequence[Any]] = (),
+                 cameras: Sequence[str] = (), selected_index: Optional[int] = None):
+        """
+        初始化对话框
+
+        Args:
+            parent: 父窗口
+            file_path: 当前HDF5文件路径
+            windows: 时间轴上的时间窗口 (start, end, 标注)
+            cameras: 可导出的相机
+            selected_index: 当前选中的时间窗口序号
+        """
+        super().__init__(parent)
+        self.file_path = file_path
+        self.windows = [tuple(window[:3]) for window in windows]
+        self.cameras = list(cameras)
+        self.selected_index = selected_index
+
+        self.setWindowTitle("导出片段视频")
+        self.setModal(True)
+        self.setup_ui()
+
+    def setup_ui(self):
+        """设置用户界面"""
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.scope_combo = QComboBox()
+        self.scope_combo.addItem(f"全部时间窗口（{len(self.windows)} 个）")
+        if self.selected_index is not None:
+            start, end, _ = self.windows[self.selected_index]
+            self.scope_combo.addItem(f"当前选中的时间窗口（{start}-{end}）")
+            self.scope_combo.setCurrentIndex(1)
+        form.addRow("范围:", self.scope_combo)
+
+        self.layout_combo = QComboBox()
+        self.layout_combo.addItems([f"每个相机一个视频（{len(self.cameras)} 个相机）", "多相机拼接为一个视频"])
+        form.addRow("相机:", self.layout_combo)
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("MP4", 'mp4')
+        self.format_combo.addItem("AVI（MJPEG）", 'avi')
+        form.addRow("格式:", self.format_combo)
+
+        self.fps_spinbox = QSpinBox()
+        self.fps_spinbox.setRange(1, 120)
+        self.fps_spinbox.setValue(DEFAULT_CLIP_FPS)
+        form.addRow("帧率:", self.fps_spinbox)
+
+        self.label_checkbox = QCheckBox("在画面上加标注文字")
+        self.label_checkbox.setChecked(True)
+        form.addRow("", self.label_checkbox)
+
+        self.passthrough_checkbox = QCheckBox("直接写入源JPEG数据，不重新编码（更快，但红蓝通道与界面显示相反）")
+        self.passthrough_checkbox.setToolTip("仅 AVI、单相机且不加文字时可用。源JPEG按原样写入，播放时红蓝通道与界面显示相反；"
+                                             "默认重新编码，颜色与界面显示一致")
+        form.addRow("", self.passthrough_checkbox)
+
+        output_layout = QHBoxLayout()
+        default_dir = os.path.join(os.path.dirname(os.path.abspath(self.file_path)), "clips") if self.file_path else ""
+        self.output_edit = QLineEdit(default_dir)
+        browse_button = QPushButton("浏览...")
+        browse_button.clicked.connect(self.browse_output)
+        output_layout.addWidget(self.output_edit)
+        output_layout.addWidget(browse_button)
+        form.addRow("输出目录:", output_layout)
+        layout.addLayout(form)
+
+        button_layout = QHBoxLayout()
+        self.ok_button = QPushButton("导出")
+        self.ok_button.setDefault(True)
+        cancel_button = QPushButton("取消")
+        button_layout.addWidget(self.ok_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+
+        self.ok_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+        for widget in (self.layout_combo, self.format_combo):
+            widget.currentIndexChanged.connect(self.update_passthrough)
+        self.label_checkbox.toggled.connect(self.update_passthrough)
+        self.passthrough_checkbox.toggled.connect(self.confirm_passthrough)
+        self.update_passthrough()
+
+    def update_passthrough(self):
+        """只有 AVI、单相机且不加文字时才能直接写入JPEG数据"""
+        available = (self.format_combo.currentData() == 'avi' and self.layout_combo.currentIndex() == 0
+                     and not self.label_checkbox.isChecked())
+        self.passthrough_checkbox.setEnabled(available)
+        if not available:
+            self.passthrough_checkbox.setChecked(False)
+
+    def confirm_passthrough(self, checked: bool):
+        """勾选直接写入时提示颜色差异，用户确认后才保留勾选"""
+        if not checked:
+            return
+        reply = QMessageBox.warning(
+            self, "颜色与界面不一致",
+            "直接写入的视频使用源JPEG数据，播放时红色和蓝色互换，与界面显示及重新编码的视频不一致。\n\n"
+            "仍然使用直接写入？",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            self.passthrough_checkbox.setChecked(False)
+
+    def browse_output(self):
+        """选择输出目录"""
+        folder = QFileDialog.getExistingDirectory(self, "选择输出目录", self.output_edit.text())
+        if folder:
+            self.output_edit.setText(folder)
+
+    def get_jobs(self) -> List[Dict[str, Any]]:
+        """按对话框中的选项生成导出任务"""
+        selected_only = self.scope_combo.currentIndex() == 1
+        return plan_clip_jobs(self.file_path, self.windows, self.output_edit.text().strip(), self.cameras,
+                              tiled=self.layout_combo.currentIndex() == 1, fmt=self.format_combo.currentData(),
+                              burn_label=self.label_checkbox.isChecked(),
+                              passthrough=self.passthrough_checkbox.isChecked(), fps=self.fps_spinbox.value(),
+                              window_indices=[self.selected_index] if selected_only else None)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+import os
+from typing import Optional
+
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+from PyQt5.QtWidgets import QApplication, QStyle
+
+from src.core.folder_catalog import HDF5_EXTENSIONS, natural_sort_key
+
+
+class _TreeNode:
+    """目录树中的一个节点（目录或HDF5文件）"""
+
+    __slots__ = ('name', 'path', 'is_dir', 'parent', 'children', 'pending', 'listed', 'row')
+
+    def __init__(self, name: str, path: str, is_dir: bool, parent: Optional['_TreeNode'] = None):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.parent = parent
+        self.children = []  # 已插入模型的子节点
+        self.pending = []  # 已列出但尚未插入模型的子项 (name, is_dir)，插入时才创建节点
+        self.listed = False  # 是否已经列出目录内容
+        self.row = 0  # 在父节点 children 中的位置（子节点只追加，插入时确定）
+
+
+class DatasetTreeModel(QAbstractItemModel):
+    """
+    数据集根目录的延迟加载树模型
+
+    只有在目录被展开时才列出其内容（os.scandir，不对每个文件调用 stat），
+    子节点按批插入，目录下文件很多时视图滚动到末尾才继续加载。
+    """
+
+    # 每次 fetchMore 插入的子节点数
+    FETCH_BATCH = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = None
+        style = QApplication.style()
+        self._dir_icon = style.standardIcon(QStyle.SP_DirIcon)
+        self._file_icon = style.standardIcon(QStyle.SP_FileIcon)
+
+    def set_root(self, root_path: Optional[str]):
+        """
+        设置数据集根目录
+
+        Args:
+            root_path: 根目录路径，为None时清空
+        """
+        self.beginResetModel()
+        self._root = _TreeNode(os.path.basename(root_path), root_path, True) if root_path else None
+        self.endResetModel()
+
+    def root_path(self) -> Optional[str]:
+        """返回根目录路径"""
+        return self._root.path if self._root is not None else None
+
+    def _node(self, index: QModelIndex) -> Optional[_TreeNode]:
+        return index.internalPointer() if index.isValid() else self._root
+
+    def file_path(self, index: QModelIndex) -> Optional[str]:
+        """返回索引对应的HDF5文件路径，索引为目录时返回None"""
+        node = self._node(index)
+        return node.path if node is not None and index.isValid() and not node.is_dir else None
+
+    def index_for_path(self, file_path: str, fetch: bool = True) -> QModelIndex:
+        """
+        返回路径对应的索引，沿途按需列出目录
+
+        Args:
+            file_path: 根目录下的文件或目录路径
+            fetch: 是否加载尚未加载的目录内容；为False时只在已加载的节点中查找
+
+        Returns:
+            对应的索引，不在根目录下时返回无效索引
+        """
+        if self._root is None:
+            return QModelIndex()
+        relative = os.path.relpath(os.path.abspath(file_path), os.path.abspath(self._root.path))
+        if relative.startswith(os.pardir):
+            return QModelIndex()
+
+        index = QModelIndex()
+        for part in ([] if relative == os.curdir else relative.split(os.sep)):
+            node = self._node(index)
+            while True:
+                child = next((c for c in node.children if c.name == part), None)
+                if child is not None or not fetch or not self.canFetchMore(index):
+                    break
+                self.fetchMore(index)
+            if child is None:
+                return QModelIndex()
+            index = self.createIndex(child.row, 0, child)
+        return index
+
+    def _list_directory(self, node: _TreeNode):
+        """列出目录内容：子目录在前，HDF5文件在后，各自按自然排序，忽略隐藏项"""
+        node.listed = True
+        directories = []
+        files = []
+        try:
+            with os.scandir(node.path) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            directories.append(entry.name)
+                        elif entry.name.endswith(HDF5_EXTENSIONS):
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return
+        directories.sort(key=natural_sort_key)
+        files.sort(key=natural_sort_key)
+        node.pending = [(name, True) for name in directories] + [(name, False) for name in files]
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._node(parent)
+        if node is None or column != 0 or not (0 <= row < len(node.children)):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        node = self._node(parent)
+        return len(node.children) if node is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        if node is None or not node.is_dir:
+            return False
+        # 未列出的目录先显示为可展开，展开时再列出
+        return not node.listed or bool(node.children or node.pending)
+
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return node is not None and node.is_dir and (not node.listed or bool(node.pending))
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        if node is None or not node.is_dir:
+            return
+        if not node.listed:
+            self._list_directory(node)
+        batch = node.pending[:self.FETCH_BATCH]
+        if not batch:
+            return
+        first = len(node.children)
+        self.beginInsertRows(parent, first, first + len(batch) - 1)
+        for offset, (name, is_dir) in enumerate(batch):
+            child = _TreeNode(name, os.path.join(node.path, name), is_dir, node)
+            child.row = first + offset
+            node.children.append(child)
+        del node.pending[:len(batch)]
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return node.name
+        if role == Qt.DecorationRole:
+            return self._dir_icon if node.is_dir else self._file_icon
+        if role == Qt.ToolTipRole:
+            return node.path
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return "数据集"
+        return None
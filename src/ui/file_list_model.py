@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import bisect
+
+from PyQt5.QtCore import (Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QThread, QObject,
+                          QFileSystemWatcher, QTimer, pyqtSignal)
+
+from src.core.folder_catalog import FolderCatalog, list_hdf5_files, natural_sort_key, record_duration, record_coverage
+
+
+# 排序使用的数据角色：返回可直接比较的原始值
+SORT_ROLE = Qt.UserRole + 1
+
+# 未知数值的排序值，排在所有已知值之前
+_UNKNOWN = -1.0
+
+
+class FileCatalogModel(QAbstractTableModel):
+    """文件列表的表格模型，行按文件名自然排序，目录信息到达后逐批填充各列"""
+
+    COLUMNS = ('文件名', '帧数', '时长(秒)', '相机', '压缩', '标注覆盖')
+    NAME, FRAMES, DURATION, CAMERAS, COMPRESSED, COVERAGE = range(len(COLUMNS))
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths = []  # 行号到文件路径
+        self._keys = []  # 各行文件名的自然排序键（与 _paths 对应）
+        self._rows = {}  # 文件路径到行号，增删行后为None，下次查找时重建
+        self._records = {}  # 文件路径到目录记录
+
+    def set_files(self, file_paths: List[str]):
+        """
+        设置文件列表并清空已有的目录信息
+
+        Args:
+            file_paths: 按自然排序排列的文件路径
+        """
+        self.beginResetModel()
+        self._paths = list(file_paths)
+        self._keys = [natural_sort_key(os.path.basename(p)) for p in self._paths]
+        self._rows = None
+        self._records = {}
+        self.endResetModel()
+
+    def update_records(self, records: List[Dict[str, Any]]):
+        """
+        填充一批目录记录
+
+        Args:
+            records: FolderCatalog 生成的记录
+        """
+        rows = []
+        index = self._row_index()
+        for record in records:
+            row = index.get(record['path'])
+            if row is not None:
+                self._records[record['path']] = record
+                rows.append(row)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), len(self.COLUMNS) - 1))
+
+    def insert_files(self, file_paths: List[str]):
+        """
+        按文件名自然排序的位置逐个插入文件，已有的行和目录信息保持不变
+
+        行号索引在整批插入后才重建（见 _row_index），每插入一行只做一次二分查找。
+
+        Args:
+            file_paths: 新增的文件路径
+        """
+        index = self._row_index()
+        added = [(natural_sort_key(os.path.basename(p)), p) for p in set(file_paths) if p not in index]
+        for key, path in sorted(added):
+            row = bisect.bisect_right(self._keys, key)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._paths.insert(row, path)
+            self._keys.insert(row, key)
+            self._rows = None
+            self.endInsertRows()
+
+    def remove_files(self, file_paths: List[str]):
+        """
+        移除文件对应的行
+
+        Args:
+            file_paths: 被删除的文件路径
+        """
+        index = self._row_index()
+        for row in sorted((index[p] for p in set(file_paths) if p in index), reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            path = self._paths.pop(row)
+            del self._keys[row]
+            self._records.pop(path, None)
+            self._rows = None
+            self.endRemoveRows()
+
+    def _row_index(self) -> Dict[str, int]:
+        """返回文件路径到行号的索引，增删行后在第一次查找时重建（每批变化只重建一次）"""
+        if self._rows is None:
+            self._rows = {path: row for row, path in enumerate(self._paths)}
+        return self._rows
+
+    def path_at(self, row: int) -> Optional[str]:
+        """返回指定行的文件路径"""
+        return self._paths[row] if 0 <= row < len(self._paths) else None
+
+    def row_of(self, file_path: str) -> int:
+        """返回文件所在的行，不在列表中时返回-1"""
+        return self._row_index().get(file_path, -1)
+
+    def record_of(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """返回文件的目录记录，尚未编目时返回None"""
+        return self._records.get(file_path)
+
+    def file_paths(self) -> List[str]:
+        """返回所有文件路径"""
+        return list(self._paths)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        path = self._paths[row]
+        record = self._records.get(path)
+
+        if role == Qt.DisplayRole:
+            if column == self.NAME:
+                return os.path.basename(path)
+            if record is None:
+                return ""
+            if record.get('error'):
+                return "错误" if column == self.FRAMES else ""
+            return self._display_value(record, column)
+        if role == SORT_ROLE:
+            if column == self.NAME:
+                return row
+            return self._sort_value(record, column)
+        if role == Qt.ToolTipRole:
+            return self._tooltip(path, record)
+        if role == Qt.TextAlignmentRole and column != self.NAME:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def _display_value(self, record: Dict[str, Any], column: int) -> str:
+        if column == self.FRAMES:
+            return "" if record['frames'] is None else str(record['frames'])
+        if column == self.DURATION:
+            duration = record_duration(record)
+            return "" if duration is None else f"{duration:.1f}"
+        if column == self.CAMERAS:
+            return str(len(record['cameras']))
+        if column == self.COMPRESSED:
+            return "是" if record['compressed'] else "否"
+        if column == self.COVERAGE:
+            coverage = record_coverage(record)
+            return "无" if coverage is None else f"{coverage:.0%}"
+        return ""
+
+    def _sort_value(self, record: Optional[Dict[str, Any]], column: int) -> float:
+        if record is None or record.get('error'):
+            return _UNKNOWN
+        if column == self.FRAMES:
+            return float(record['frames'] if record['frames'] is not None else _UNKNOWN)
+        if column == self.DURATION:
+            duration = record_duration(record)
+            return _UNKNOWN if duration is None else duration
+        if column == self.CAMERAS:
+            return float(len(record['cameras']))
+        if column == self.COMPRESSED:
+            return float(record['compressed'])
+        if column == self.COVERAGE:
+            coverage = record_coverage(record)
+            return _UNKNOWN if coverage is None else coverage
+        return _UNKNOWN
+
+    def _tooltip(self, path: str, record: Optional[Dict[str, Any]]) -> str:
+        lines = [path]
+        if record is None:
+            lines.append("正在编目...")
+        elif record.get('error'):
+            lines.append(f"读取失败: {record['error']}")
+        else:
+            if record['cameras']:
+                lines.append("相机: " + ", ".join(record['cameras']))
+            for field, coverage in sorted(record['annotation'].items()):
+                lines.append(f"{field}: {coverage:.0%}")
+        return "\n".join(lines)
+
+
+class FileCatalogProxyModel(QSortFilterProxyModel):
+    """按原始值排序、按文件名筛选的代理模型"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.setFilterKeyColumn(FileCatalogModel.NAME)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+
+class CatalogWorker(QThread):
+    """
+    在后台线程中构建文件夹目录，结果分批通过信号发送
+
+    文件总是在子进程中扫描：界面进程只读打开的文件无法同时以 'r+' 加载，
+    在本进程中扫描时用户打开正在编目的文件会失败。
+    """
+
+    batchReady = pyqtSignal(list)  # 一批目录记录
+    catalogFinished = pyqtSignal(int, float)  # 文件数、耗时（秒）
+
+    def __init__(self, folder: str, file_paths: List[str], parent=None, prune: bool = True):
+        super().__init__(parent)
+        self.folder = folder
+        self.file_paths = list(file_paths)
+        self.prune = prune
+
+    def run(self):
+        started = time.perf_counter()
+        catalog = FolderCatalog(self.folder)
+        records = catalog.build(self.file_paths, on_batch=self.batchReady.emit,
+                                should_stop=self.isInterruptionRequested, prune=self.prune, isolated=True)
+        self.catalogFinished.emit(len(records), time.perf_counter() - started)
+
+
+class FolderWatcher(QObject):
+    """
+    监视文件夹中HDF5文件的增删
+
+    使用 QFileSystemWatcher 接收目录变化通知，并以较长间隔轮询作为补充
+    （网络文件系统上可能收不到通知）。变化经过去抖后与已知文件列表比较，
+    只发送新增和删除的文件。
+    """
+
+    filesChanged = pyqtSignal(list, list)  # 新增的文件、删除的文件
+
+    def __init__(self, parent=None, debounce_ms: int = 500, poll_interval_ms: int = 10000):
+        """
+        初始化文件夹监视器
+
+        Args:
+            parent: 父对象
+            debounce_ms: 去抖间隔（毫秒），拷贝大量文件时合并为一次扫描
+            poll_interval_ms: 轮询间隔（毫秒），0 表示不轮询
+        """
+        super().__init__(parent)
+        self.folder = None
+        self._known = set()
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._schedule_rescan)
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self.rescan)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_interval_ms)
+        self._poll_timer.timeout.connect(self.rescan)
+        self._poll_enabled = poll_interval_ms > 0
+
+    def watch(self, folder: Optional[str], file_paths: List[str]):
+        """
+        开始监视文件夹
+
+        Args:
+            folder: 文件夹路径，为None时停止监视
+            file_paths: 当前已知的文件列表
+        """
+        self.stop()
+        self.folder = folder
+        self._known = set(file_paths)
+        if folder:
+            self._watcher.addPath(folder)
+            if self._poll_enabled:
+                self._poll_timer.start()
+
+    def stop(self):
+        """停止监视"""
+        directories = self._watcher.directories()
+        if directories:
+            self._watcher.removePaths(directories)
+        self._debounce_timer.stop()
+        self._poll_timer.stop()
+        self.folder = None
+        self._known = set()
+
+    def _schedule_rescan(self, path: str):
+        self._debounce_timer.start()
+
+    def rescan(self):
+        """重新列出文件夹并发送与上次相比的变化"""
+        if not self.folder:
+            return
+        try:
+            current = set(list_hdf5_files(self.folder))
+        except OSError:
+            # 文件夹被删除或暂时不可访问
+            current = set()
+        added = sorted(current - self._known)
+        removed = sorted(self._known - current)
+        self._known = current
+        if added or removed:
+            self.filesChanged.emit(added, removed)
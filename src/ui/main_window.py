@@ -2,18 +2,54 @@
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QFileDialog, QMessageBox,
-    QListWidget, QListWidgetItem, QScrollArea, QGridLayout
+    QListWidget, QScrollArea, QGridLayout,
+    QTableView, QTreeView, QHeaderView, QAbstractItemView, QLineEdit, QCheckBox
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 from PyQt5.QtGui import QKeyEvent, QImage, QPixmap
 import os
+import time
 import numpy as np
 
 from src.core.hdf5_model import HDF5Model
+from src.core.frame_scores import load_frame_scores, score_at
+from src.core.model_pool import ModelPool
+from src.core.folder_catalog import list_hdf5_files, natural_sort_key, record_coverage
+from src.core.annotation_io import find_annotation_windows, build_annotation_json, write_json_atomic
+from src.core.proxy_store import ProxyStore
+from src.core.playback import PlaybackReader
+from src.core.clip_export import export_cameras
+from src.core.frame_timing import FrameTimer
 from src.ui.image_window import ImageWindow
 from src.ui.timeline_widget import TimelineWidget
+from src.ui.clip_export_dialog import ClipExportDialog, ClipExportWorker
+from src.ui.file_list_model import FileCatalogModel, FileCatalogProxyModel, CatalogWorker, FolderWatcher
+from src.ui.dataset_tree_model import DatasetTreeModel
 from src.core.phrase_library import PhraseLibrary
 from src.ui.phrase_selection_dialog import PhraseSelectionDialog
+from src.utils.logger import get_logger
+
+logger = get_logger('ui')
+
+
+class ProxyWorker(QThread):
+    """在后台线程中为文件生成低分辨率代理文件"""
+
+    proxyReady = pyqtSignal(str, dict)  # 源文件路径、build_proxy 的结果
+
+    def __init__(self, file_path: str, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+    def run(self):
+        # SQLite 连接不能跨线程使用，在工作线程中单独打开索引
+        store = ProxyStore()
+        try:
+            result = store.build(self.file_path, threads=max(1, (os.cpu_count() or 2) // 2),
+                                 should_stop=self.isInterruptionRequested)
+        finally:
+            store.close()
+        self.proxyReady.emit(self.file_path, result)
 
 
 class MainWindow(QMainWindow):
@@ -73,12 +109,49 @@ class MainWindow(QMainWindow):
         # 存储文件夹中的所有HDF5文件列表
         self.hdf5_files = []
         
-        # 当前打开的文件在列表中的索引
+        # 当前打开的文件在文件列表视图（排序/筛选后）中的行号
         self.current_file_index = -1
+
+        # 后台构建文件夹目录的线程，以及其运行期间排队等待编目的文件
+        self.catalog_worker = None
+        self.pending_catalog_paths = []
+
+        # 监视已打开文件夹中文件的增删
+        self.folder_watcher = FolderWatcher(self)
+        self.folder_watcher.filesChanged.connect(self.on_folder_files_changed)
+
+        # 文件夹模式下在后台预加载当前文件前后各 prefetch_radius 个文件，
+        # 预加载池最多保留 warm_model_count 个模型（包括刚离开的文件）
+        self.prefetch_radius = 1
+        self.warm_model_count = 3
+        self.model_pool = ModelPool(self.warm_model_count, self.get_score_data_dirs())
+
+        # 低分辨率代理：启用时图像网格和播放读取代理文件（没有时在后台生成）；
+        # 未启用时已有的代理文件只用于拖动进度条时的快速预览
+        self.use_proxies = False
+        self.proxy_store = ProxyStore()
+        self.proxy_reader = None
+        self.proxy_worker = None
+
+        # 播放时按chunk整块预读图像的读取器（只在播放期间存在）
+        self.playback_reader = None
+
+        # 后台导出视频片段
+        self.clip_export_worker = None
+
+        # 逐帧计时：frame_timer 保存记录（第一次启用时创建，停用后仍可导出），
+        # active_frame_timer 只在启用时不为None，各渲染阶段据此决定是否计时
+        self.frame_timer = None
+        self.active_frame_timer = None
+        self.timing_hud = None
         
         # 图像展示区滚动布局
         self.images_scroll_area = None
         self.images_grid_layout = None
+        self.image_labels = {}  # 图像键到网格中图像标签的映射
+
+        # 等待渲染的帧（帧变化合并后只渲染最新的一帧）
+        self.pending_frame = None
         
         # 当前选中的时间窗口
         self.selected_time_window = None
@@ -86,10 +159,11 @@ class MainWindow(QMainWindow):
         # 当前文件路径
         self.current_file_path = None
 
-        # 每帧分数映射 (从 data/<basename>.json 加载)
-        self.frame_scores = {}
+        # 每帧分数 (从 data/<basename>.json 加载)，按帧索引的稠密 float32 数组，NaN 表示缺失
+        self.frame_scores = None
         self.scores_loaded = False
         self.scores_source = None
+        self.scores_elapsed = 0.0  # 帧分数的解析耗时（秒）
 
         # 初始化短语库
         self.phrase_library = PhraseLibrary()
@@ -124,8 +198,10 @@ class MainWindow(QMainWindow):
         # 创建右侧显示和控制区域
         self.create_right_panel()
         
-        # 创建底部状态栏
+        # 创建底部状态栏（右侧固定显示帧分数的来源和解析耗时，不被临时消息覆盖）
         self.statusBar().showMessage("准备就绪")
+        self.scores_status_label = QLabel("")
+        self.statusBar().addPermanentWidget(self.scores_status_label)
         
         # 移除播放定时器 - 播放控制已移到TimelineWidget中
         
@@ -133,6 +209,17 @@ class MainWindow(QMainWindow):
         self.resize_timer = QTimer(self)
         self.resize_timer.setSingleShot(True)
         self.resize_timer.timeout.connect(self.on_resize_finished)
+
+        # 帧渲染合并定时器：同一轮事件循环内的多次帧变化只渲染最后一帧
+        self.frame_render_timer = QTimer(self)
+        self.frame_render_timer.setSingleShot(True)
+        self.frame_render_timer.setInterval(0)
+        self.frame_render_timer.timeout.connect(self.render_pending_frame)
+
+        # 帧耗时显示的刷新定时器（不逐帧刷新，避免显示本身成为开销）
+        self.timing_hud_timer = QTimer(self)
+        self.timing_hud_timer.setInterval(500)
+        self.timing_hud_timer.timeout.connect(self.update_timing_hud)
         
         # 移除时间轴的多选信号连接 - 不再需要
     
@@ -155,19 +242,58 @@ class MainWindow(QMainWindow):
         self.open_file_btn.clicked.connect(self.open_file)
         self.open_folder_btn = QPushButton("打开文件夹")
         self.open_folder_btn.clicked.connect(self.open_folder)
+        self.open_dataset_btn = QPushButton("打开数据集")
+        self.open_dataset_btn.clicked.connect(self.open_dataset_root)
         file_open_layout.addWidget(self.open_file_btn)
         file_open_layout.addWidget(self.open_folder_btn)
+        file_open_layout.addWidget(self.open_dataset_btn)
         file_layout.addLayout(file_open_layout)
+
+        # 数据集目录树：只在展开目录时列出其内容，打开数据集根目录后显示
+        self.dataset_tree_model = DatasetTreeModel(self)
+        self.dataset_tree_view = QTreeView()
+        self.dataset_tree_view.setModel(self.dataset_tree_model)
+        self.dataset_tree_view.setHeaderHidden(True)
+        self.dataset_tree_view.setUniformRowHeights(True)
+        self.dataset_tree_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.dataset_tree_view.setMinimumHeight(180)
+        self.dataset_tree_view.clicked.connect(self.on_dataset_item_clicked)
+        self.dataset_tree_view.hide()
+        file_layout.addWidget(self.dataset_tree_view)
         
         # 添加文件列表
         file_list_label = QLabel("文件列表:")
         file_list_label.setStyleSheet("font-weight: bold; margin-top: 5px;")
         file_layout.addWidget(file_list_label)
         
-        self.file_list_widget = QListWidget()
-        self.file_list_widget.setMinimumHeight(150)
-        self.file_list_widget.itemClicked.connect(self.on_file_selected)
-        file_layout.addWidget(self.file_list_widget)
+        self.file_filter_edit = QLineEdit()
+        self.file_filter_edit.setPlaceholderText("筛选文件名...")
+        self.file_filter_edit.setClearButtonEnabled(True)
+        file_layout.addWidget(self.file_filter_edit)
+
+        # 文件列表：帧数、时长、相机、压缩和标注覆盖等列由后台编目逐批填充，可按任意列排序
+        self.file_list_model = FileCatalogModel(self)
+        self.file_list_proxy = FileCatalogProxyModel(self)
+        self.file_list_proxy.setSourceModel(self.file_list_model)
+        self.file_filter_edit.textChanged.connect(self.file_list_proxy.setFilterFixedString)
+
+        self.file_list_view = QTableView()
+        self.file_list_view.setModel(self.file_list_proxy)
+        self.file_list_view.setMinimumHeight(150)
+        self.file_list_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.file_list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.file_list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.file_list_view.setSortingEnabled(True)
+        self.file_list_view.sortByColumn(FileCatalogModel.NAME, Qt.AscendingOrder)
+        self.file_list_view.setWordWrap(False)
+        self.file_list_view.verticalHeader().hide()
+        # 固定行高，避免大文件夹下逐行计算尺寸
+        self.file_list_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.file_list_view.verticalHeader().setDefaultSectionSize(22)
+        self.file_list_view.horizontalHeader().setDefaultSectionSize(56)
+        self.file_list_view.setColumnWidth(FileCatalogModel.NAME, 160)
+        self.file_list_view.clicked.connect(self.on_file_selected)
+        file_layout.addWidget(self.file_list_view)
         
         # 添加文件导航按钮
         file_nav_layout = QHBoxLayout()
@@ -180,6 +306,29 @@ class MainWindow(QMainWindow):
         file_nav_layout.addWidget(self.prev_file_btn)
         file_nav_layout.addWidget(self.next_file_btn)
         file_layout.addLayout(file_nav_layout)
+
+        self.proxy_checkbox = QCheckBox("使用低分辨率代理（播放更流畅）")
+        self.proxy_checkbox.setToolTip("从缓存的低分辨率代理文件读取图像，没有代理文件时在后台生成")
+        self.proxy_checkbox.toggled.connect(self.set_use_proxies)
+        file_layout.addWidget(self.proxy_checkbox)
+
+        timing_layout = QHBoxLayout()
+        self.timing_checkbox = QCheckBox("显示帧耗时")
+        self.timing_checkbox.setToolTip("记录每帧各阶段（读取、解码、颜色转换、缩放、控件更新、时间轴和分数曲线绘制）的耗时，"
+                                        "并显示在图像区域左上角；开始播放时清除之前的记录")
+        self.timing_checkbox.toggled.connect(self.set_frame_timing)
+        self.export_timing_btn = QPushButton("导出帧耗时")
+        self.export_timing_btn.setToolTip("导出为 CSV（每帧一行）或 Chrome trace JSON（chrome://tracing、Perfetto）")
+        self.export_timing_btn.clicked.connect(self.export_frame_timing)
+        self.export_timing_btn.setEnabled(False)
+        timing_layout.addWidget(self.timing_checkbox)
+        timing_layout.addWidget(self.export_timing_btn)
+        file_layout.addLayout(timing_layout)
+
+        # 排序或筛选变化后重新定位当前文件
+        for proxy_signal in (self.file_list_proxy.layoutChanged, self.file_list_proxy.rowsInserted,
+                             self.file_list_proxy.rowsRemoved, self.file_list_proxy.modelReset):
+            proxy_signal.connect(self.sync_current_file_row)
         
         left_layout.addWidget(file_group)
         
@@ -370,6 +519,13 @@ class MainWindow(QMainWindow):
         self.save_json_btn.setEnabled(False)
         save_layout.addWidget(self.save_json_btn)
 
+        # 导出片段视频按钮
+        self.export_clips_btn = QPushButton("导出片段视频")
+        self.export_clips_btn.setToolTip("将时间窗口导出为带标注文字的视频片段")
+        self.export_clips_btn.clicked.connect(self.export_clips)
+        self.export_clips_btn.setEnabled(False)
+        save_layout.addWidget(self.export_clips_btn)
+
         left_layout.addWidget(save_group)
         
         # 添加到主布局
@@ -460,6 +616,8 @@ class MainWindow(QMainWindow):
         # 创建时间轴小部件
         self.timeline_widget = TimelineWidget()
         self.timeline_widget.frameChanged.connect(self.on_frame_changed)
+        self.timeline_widget.scrubbingChanged.connect(self.on_scrubbing_changed)
+        self.timeline_widget.playingChanged.connect(self.on_playing_changed)
         self.timeline_widget.windowAdded.connect(self.on_window_added)
         # 设置时间轴的最大高度，让它不占用太多空间
         self.timeline_widget.setMaximumHeight(200)
@@ -483,14 +641,64 @@ class MainWindow(QMainWindow):
         if file_path:
             # 清除当前文件夹和文件列表状态
             self.current_folder = None
+            self.stop_catalog_worker()
+            self.folder_watcher.stop()
             self.hdf5_files = []
             self.current_file_index = -1
-            self.file_list_widget.clear()
+            self.file_list_model.set_files([])
             
             # 单文件模式，无需特殊处理
             
             self.load_hdf5_file(file_path)
     
+    def open_dataset_root(self):
+        """打开数据集根目录，以目录树方式递归浏览其中的HDF5文件"""
+        root_path = QFileDialog.getExistingDirectory(self, "选择数据集根目录")
+
+        if root_path:
+            self.dataset_tree_model.set_root(root_path)
+            self.dataset_tree_view.show()
+            self.statusBar().showMessage(f"数据集根目录: {root_path}，展开目录并点击文件以加载")
+
+    def on_dataset_item_clicked(self, index):
+        """
+        点击目录树中的文件时加载该文件，并将其所在目录作为当前文件夹
+
+        Args:
+            index: 目录树中被点击的索引
+        """
+        file_path = self.dataset_tree_model.file_path(index)
+        if file_path is None:
+            return
+
+        folder_path = os.path.dirname(file_path)
+        if self.current_folder != folder_path:
+            # 切换到新目录：文件列表、编目和监视都作用于该目录，便于上一个/下一个文件导航
+            self.load_folder_files(folder_path, initial_file=file_path)
+            return
+
+        source_row = self.file_list_model.row_of(file_path)
+        if source_row < 0:
+            self.load_hdf5_file(file_path)
+            return
+        proxy_index = self.file_list_proxy.mapFromSource(self.file_list_model.index(source_row, 0))
+        if proxy_index.isValid():
+            self.file_list_view.selectRow(proxy_index.row())
+            self.on_file_selected(proxy_index)
+        else:
+            # 被文件名筛选隐藏时直接加载
+            self.load_hdf5_file(file_path)
+            self.sync_current_file_row()
+
+    def reveal_in_dataset_tree(self, file_path):
+        """在目录树中选中当前文件（只在已加载的节点中查找，不额外列出目录）"""
+        if not self.dataset_tree_view.isVisible():
+            return
+        index = self.dataset_tree_model.index_for_path(file_path, fetch=False)
+        if index.isValid() and self.dataset_tree_view.currentIndex() != index:
+            self.dataset_tree_view.setCurrentIndex(index)
+            self.dataset_tree_view.scrollTo(index)
+
     def open_folder(self):
         """打开文件夹并加载其中的所有HDF5文件"""
         folder_path = QFileDialog.getExistingDirectory(self, "选择包含HDF5文件的文件夹")
@@ -511,52 +719,47 @@ class MainWindow(QMainWindow):
         Returns:
             排序键
         """
-        import re
+        return natural_sort_key(file_name)
         
-        # 将文件名拆分为文本和数字部分
-        def atoi(text):
-            return int(text) if text.isdigit() else text
-        
-        # 将每个数字和非数字部分分开，并转换数字为整数
-        parts = re.split(r'(\d+)', file_name)
-        return [atoi(part) for part in parts]
-        
-    def load_folder_files(self, folder_path):
-        """加载文件夹中的所有HDF5文件"""
-        # 清除之前的文件列表
-        self.file_list_widget.clear()
-        self.hdf5_files = []
-        
-        # 查找文件夹中的所有HDF5文件
-        file_names = []
-        for file_name in os.listdir(folder_path):
-            if (file_name.endswith(('.hdf5', '.h5'))) and (not file_name.startswith('.')):
-                file_names.append(file_name)
-        
-        # 使用自然排序对文件名进行排序
-        file_names.sort(key=self.natural_sort_key)
-        print(f"排序后的文件列表: {file_names}")
-        
-        # 添加排序后的文件到列表
-        for file_name in file_names:
-            file_path = os.path.join(folder_path, file_name)
-            self.hdf5_files.append(file_path)
-            
-            # 添加到列表小部件
-            item = QListWidgetItem(file_name)
-            item.setToolTip(file_path)
-            self.file_list_widget.addItem(item)
+    def load_folder_files(self, folder_path, initial_file=None):
+        """
+        加载文件夹中的所有HDF5文件
+
+        Args:
+            folder_path: 文件夹路径
+            initial_file: 首先加载的文件，为None或不在文件夹中时加载列表中的第一个文件
+        """
+        self.stop_catalog_worker()
+        self.current_folder = folder_path
+
+        # 查找文件夹中的所有HDF5文件（按自然排序）
+        self.hdf5_files = list_hdf5_files(folder_path)
+        logger.debug("排序后的文件列表: %s", self.hdf5_files)
+        self.file_list_model.set_files(self.hdf5_files)
+
+        # 监视文件夹，新增或删除的文件增量更新到列表中
+        self.folder_watcher.watch(folder_path, self.hdf5_files)
         
         # 更新状态栏信息
         if self.hdf5_files:
-            self.statusBar().showMessage(f"找到 {len(self.hdf5_files)} 个HDF5文件")
-            
-            # 文件夹模式，无需特殊处理
+            self.statusBar().showMessage(f"找到 {len(self.hdf5_files)} 个HDF5文件，正在编目...")
+
+            # 在后台并行读取各文件的帧数、相机和标注覆盖等信息
+            self.start_catalog(self.hdf5_files)
             
-            # 默认加载第一个文件
-            self.current_file_index = 0
-            self.file_list_widget.setCurrentRow(0)
-            self.load_hdf5_file(self.hdf5_files[0])
+            # 默认加载列表中的第一个文件
+            row = 0
+            file_path = self.file_path_at_row(0)
+            source_row = self.file_list_model.row_of(initial_file) if initial_file else -1
+            if source_row >= 0:
+                # 指定的文件被文件名筛选隐藏时行号为-1，仍然加载该文件
+                row = self.file_list_proxy.mapFromSource(self.file_list_model.index(source_row, 0)).row()
+                file_path = initial_file
+            self.current_file_index = row
+            if row >= 0:
+                self.file_list_view.selectRow(row)
+            if file_path is not None:
+                self.load_hdf5_file(file_path)
             
             # 启用文件导航按钮
             self.update_file_navigation_buttons()
@@ -564,6 +767,38 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("文件夹中没有找到HDF5文件")
             # 无HDF5文件，无需特殊处理
     
+    def open_current_model(self, file_path):
+        """
+        以可写模式打开要显示的文件，优先使用后台预热好的模型
+
+        无法以 'r+' 打开（例如其它进程正在写入或持有文件锁）时以只读模式打开，
+        可以查看但不能保存标注。
+
+        Args:
+            file_path: HDF5文件路径
+
+        Returns:
+            (HDF5Model, 预加载池中取出的 WarmEpisode 或None)
+        """
+        # acquire 同时等待该文件被淘汰的预热任务关闭只读模型，之后才能以 'r+' 打开
+        episode = self.model_pool.acquire(file_path)
+        if episode is not None:
+            logger.debug("使用预加载的模型: %s", file_path)
+            model = episode.model
+            # 池中的模型是只读的，成为当前文件后以可写模式重新打开
+            try:
+                model.reopen('r+')
+            except (RuntimeError, OSError) as e:
+                logger.warning("无法以可写模式打开 %s，改为只读: %s", file_path, e)
+                model.reopen('r')
+            return model, episode
+
+        try:
+            return HDF5Model(file_path, colorize_depth=True), None
+        except (RuntimeError, OSError) as e:
+            logger.warning("无法以可写模式打开 %s，改为只读: %s", file_path, e)
+            return HDF5Model(file_path, mode='r', colorize_depth=True), None
+
     def load_hdf5_file(self, file_path):
         """加载HDF5文件"""
         try:
@@ -571,7 +806,7 @@ class MainWindow(QMainWindow):
             self.current_file_path = file_path
 
             # 清理旧的时间轴数据和字段选择状态
-            print("清理旧的时间轴数据和字段选择状态")
+            logger.debug("清理旧的时间轴数据和字段选择状态")
 
             # 重置字段选择状态
             self.current_annotation_field = None
@@ -590,17 +825,26 @@ class MainWindow(QMainWindow):
             for timeline in self.timeline_widget.timelines:
                 timeline.segments = [seg for seg in timeline.segments if seg.key != "annotation"]
 
-            # 关闭之前的模型
+            # 播放读取器在后台读取之前的模型，归还模型前先关闭
+            self.close_playback_reader()
+
+            # 将之前的模型归还到预加载池，切换回来时无需重新打开
             if self.hdf5_model:
-                self.hdf5_model.close()
+                self.hdf5_model.frame_timer = None
+                previous_scores = (self.frame_scores, self.scores_source, self.scores_elapsed) if self.scores_loaded else None
+                self.model_pool.release(self.hdf5_model, previous_scores)
+                self.hdf5_model = None
 
             # 关闭所有图像窗口
             for window in self.image_windows.values():
                 window.close()
             self.image_windows = {}
 
-            # 创建新的HDF5模型
-            self.hdf5_model = HDF5Model(file_path)
+            self.hdf5_model, episode = self.open_current_model(file_path)
+            self.hdf5_model.frame_timer = self.active_frame_timer
+
+            # 打开（或在后台生成）低分辨率代理文件，第一帧即可从代理读取
+            self.open_proxy_for_current_file()
 
             # 更新UI
             self.update_ui_with_model()
@@ -608,45 +852,70 @@ class MainWindow(QMainWindow):
             # 更新状态栏
             file_name = os.path.basename(file_path)
             compression_status = "压缩" if self.hdf5_model.is_compressed() else "非压缩"
-            self.statusBar().showMessage(f"已加载文件: {file_name} ({compression_status}数据集)")
-            self.setWindowTitle(f"HDF5文件可视化与标注工具 - {file_name}")
+            read_only = "，只读，无法保存标注" if self.hdf5_model.mode == 'r' else ""
+            self.statusBar().showMessage(f"已加载文件: {file_name} ({compression_status}数据集{read_only})")
+            self.setWindowTitle(f"HDF5文件可视化与标注工具 - {file_name}" + ("（只读）" if read_only else ""))
 
             # 初始化时间轴
-            print("初始化时间轴")
+            logger.debug("初始化时间轴")
 
             # 默认显示所有图像
             # 尝试加载与该HDF5同名的JSON分数文件（优先 repo/data）
             try:
-                self.load_frame_scores_for_current_file()
+                if episode is not None:
+                    self.apply_frame_scores(episode.scores)
+                else:
+                    self.load_frame_scores_for_current_file()
             except Exception:
                 # 加载失败不要中断流程
                 pass
 
-            self.display_all_images()
-
-            # 确保状态栏显示当前帧与分数
+            # 显示当前帧的所有图像，并确保状态栏显示当前帧与分数
             try:
                 current_frame = self.timeline_widget.get_current_frame()
-                self.on_frame_changed(current_frame)
+                self.render_frame(current_frame)
             except Exception:
                 pass
 
+            # 在后台生成时间轴的缩略图胶片条
+            self.timeline_widget.load_thumbnails(file_path)
+
+            # 在后台预加载相邻的文件
+            self.prefetch_neighbour_files()
+
+            # 浏览数据集时在目录树中同步选中当前文件
+            self.reveal_in_dataset_tree(file_path)
+
             # 注意：不再自动加载标注数据，需要用户手动选择字段后加载
-            print("HDF5文件加载完成，请选择需要标注的字段")
+            logger.info("HDF5文件加载完成，请选择需要标注的字段")
 
         except Exception as e:
             QMessageBox.critical(self, "错误", f"无法加载HDF5文件: {e}")
             self.statusBar().showMessage("文件加载失败")
     
+    def prefetch_neighbour_files(self):
+        """在后台预加载文件列表中与当前文件相邻的文件（近的优先）"""
+        if self.current_file_index < 0:
+            return
+
+        neighbours = []
+        for distance in range(1, self.prefetch_radius + 1):
+            for row in (self.current_file_index + distance, self.current_file_index - distance):
+                file_path = self.file_path_at_row(row)
+                if file_path is not None:
+                    neighbours.append(file_path)
+        self.model_pool.prefetch(neighbours)
+
     # 移除restore_selected_keys方法 - 不再需要
     
-    def on_file_selected(self, item):
+    def on_file_selected(self, index):
         """当文件列表中的文件被选中时的处理函数"""
-        file_path = item.toolTip()
-        index = self.file_list_widget.row(item)
+        file_path = self.file_path_at_row(index.row())
+        if file_path is None:
+            return
         
         # 更新当前文件索引
-        self.current_file_index = index
+        self.current_file_index = index.row()
         
         # 加载选中的文件
         self.load_hdf5_file(file_path)
@@ -658,22 +927,111 @@ class MainWindow(QMainWindow):
         """加载上一个文件"""
         if self.current_file_index > 0:
             self.current_file_index -= 1
-            self.file_list_widget.setCurrentRow(self.current_file_index)
-            self.load_hdf5_file(self.hdf5_files[self.current_file_index])
+            self.file_list_view.selectRow(self.current_file_index)
+            self.load_hdf5_file(self.file_path_at_row(self.current_file_index))
             self.update_file_navigation_buttons()
     
     def next_file(self):
         """加载下一个文件"""
-        if self.current_file_index < len(self.hdf5_files) - 1:
+        if self.current_file_index < self.file_list_proxy.rowCount() - 1:
             self.current_file_index += 1
-            self.file_list_widget.setCurrentRow(self.current_file_index)
-            self.load_hdf5_file(self.hdf5_files[self.current_file_index])
+            self.file_list_view.selectRow(self.current_file_index)
+            self.load_hdf5_file(self.file_path_at_row(self.current_file_index))
             self.update_file_navigation_buttons()
     
     def update_file_navigation_buttons(self):
         """更新文件导航按钮的启用状态"""
         self.prev_file_btn.setEnabled(self.current_file_index > 0)
-        self.next_file_btn.setEnabled(self.current_file_index < len(self.hdf5_files) - 1)
+        self.next_file_btn.setEnabled(0 <= self.current_file_index < self.file_list_proxy.rowCount() - 1)
+
+    def file_path_at_row(self, row: int):
+        """
+        返回文件列表视图中指定行的文件路径
+
+        Args:
+            row: 视图（排序/筛选后）中的行号
+
+        Returns:
+            文件路径，行号无效时返回None
+        """
+        proxy_index = self.file_list_proxy.index(row, 0)
+        if not proxy_index.isValid():
+            return None
+        return self.file_list_model.path_at(self.file_list_proxy.mapToSource(proxy_index).row())
+
+    def sync_current_file_row(self, *args):
+        """文件列表排序或筛选变化后，重新定位当前文件所在的行并保持选中"""
+        row = -1
+        source_row = self.file_list_model.row_of(self.current_file_path) if self.current_file_path else -1
+        if source_row >= 0:
+            row = self.file_list_proxy.mapFromSource(self.file_list_model.index(source_row, 0)).row()
+        self.current_file_index = row
+        if row >= 0 and self.file_list_view.currentIndex().row() != row:
+            self.file_list_view.selectRow(row)
+        self.update_file_navigation_buttons()
+
+    def start_catalog(self, file_paths, prune: bool = True):
+        """
+        在后台为文件编目；已有编目在运行时排队，完成后再增量编目
+
+        Args:
+            file_paths: 需要编目的文件
+            prune: 是否从目录缓存中移除不在 file_paths 中的文件
+        """
+        if self.catalog_worker is not None and self.catalog_worker.isRunning():
+            self.pending_catalog_paths.extend(file_paths)
+            return
+
+        self.catalog_worker = CatalogWorker(self.current_folder, file_paths, self, prune=prune)
+        self.catalog_worker.batchReady.connect(self.file_list_model.update_records)
+        self.catalog_worker.catalogFinished.connect(self.on_catalog_finished)
+        self.catalog_worker.start()
+
+    def on_folder_files_changed(self, added, removed):
+        """
+        文件夹中的文件增删后增量更新文件列表，不影响当前选中和已加载的文件
+
+        Args:
+            added: 新增的文件
+            removed: 删除的文件
+        """
+        self.file_list_model.remove_files(removed)
+        self.file_list_model.insert_files(added)
+        self.hdf5_files = self.file_list_model.file_paths()
+
+        # 新增的文件以及之前读取失败的文件（可能是当时仍在写入）重新编目
+        retry = [p for p in self.hdf5_files
+                 if p not in added and (self.file_list_model.record_of(p) or {}).get('error')]
+        if added or retry:
+            self.start_catalog(added + retry, prune=False)
+
+        logger.info("文件夹更新: 新增 %s 个，删除 %s 个文件", len(added), len(removed))
+        self.statusBar().showMessage(f"文件夹更新: 新增 {len(added)} 个，删除 {len(removed)} 个文件")
+
+    def on_catalog_finished(self, file_count: int, elapsed: float):
+        """文件夹编目完成后在状态栏显示统计信息，并处理排队的编目"""
+        if self.pending_catalog_paths:
+            pending = list(dict.fromkeys(self.pending_catalog_paths))
+            self.pending_catalog_paths = []
+            self.catalog_worker = None
+            self.start_catalog(pending, prune=False)
+            return
+
+        incomplete = 0
+        for path in self.file_list_model.file_paths():
+            record = self.file_list_model.record_of(path)
+            if record is not None and (record_coverage(record) or 0.0) < 1.0:
+                incomplete += 1
+        self.statusBar().showMessage(
+            f"编目完成: {file_count} 个文件，{incomplete} 个未完整标注，耗时 {elapsed:.1f} 秒")
+
+    def stop_catalog_worker(self):
+        """停止正在进行的文件夹编目"""
+        self.pending_catalog_paths = []
+        if self.catalog_worker is not None:
+            self.catalog_worker.requestInterruption()
+            self.catalog_worker.wait()
+            self.catalog_worker = None
     
     def display_all_images(self):
         """显示当前帧的所有图像"""
@@ -682,6 +1040,7 @@ class MainWindow(QMainWindow):
         
         # 清除之前的图像
         self.clear_image_grid()
+        self.image_labels = {}
         
         # 获取所有图像键
         image_keys = self.hdf5_model.get_image_keys()
@@ -691,6 +1050,7 @@ class MainWindow(QMainWindow):
         
         # 获取当前帧
         current_frame = self.timeline_widget.get_current_frame()
+        fast = self.timeline_widget.scrubbing
         
         # 获取滚动区域的可用大小
         scroll_area_size = self.images_scroll_area.size()
@@ -707,7 +1067,7 @@ class MainWindow(QMainWindow):
         # 为每个图像键创建并显示图像（水平排列）
         for i, key in enumerate(image_keys):
             # 获取图像数据
-            image_data = self.hdf5_model.get_image(key, current_frame)
+            image_data = self.get_display_image(key, current_frame, fast)
             
             if image_data is not None:
                 # 创建图像容器
@@ -743,8 +1103,10 @@ class MainWindow(QMainWindow):
                 # 将图像容器添加到网格（水平排列，都在第0行）
                 self.images_grid_layout.addWidget(image_container, 0, i)
                 
+                self.image_labels[key] = image_label
+
                 # 显示图像
-                self.display_image_in_label(image_data, image_label)
+                self.display_image_in_label(image_data, image_label, fast)
         
         # 设置网格布局的拉伸因子，让所有列均匀分布
         for col in range(num_images):
@@ -752,6 +1114,182 @@ class MainWindow(QMainWindow):
         
         # 确保只有一行，并让这一行占据所有可用空间
         self.images_grid_layout.setRowStretch(0, 1)
+
+    def refresh_image_grid(self, frame: int, fast: bool = False):
+        """
+        在已有的图像网格中刷新指定帧的图像
+
+        只替换各标签的图像，不重建网格部件；图像键与网格不一致时退回到完整重建。
+
+        Args:
+            frame: 帧索引
+            fast: 是否使用快速预览（缓存/半分辨率图像和快速缩放）
+        """
+        if not self.hdf5_model or self.images_grid_layout is None:
+            return
+
+        image_keys = self.hdf5_model.get_image_keys()
+        if not self.image_labels or set(self.image_labels) != set(image_keys):
+            self.display_all_images()
+            return
+
+        for key, label in self.image_labels.items():
+            self.display_image_in_label(self.get_display_image(key, frame, fast), label, fast)
+
+    def get_display_image(self, key: str, frame: int, fast: bool = False):
+        """
+        获取用于显示的图像
+
+        快速预览时优先使用已缓存的全分辨率图像，否则以半分辨率解码。
+
+        Args:
+            key: 图像键
+            frame: 帧索引
+            fast: 是否使用快速预览
+
+        Returns:
+            图像数据
+        """
+        if self.proxy_reader is not None and (self.use_proxies or fast):
+            started = time.perf_counter()
+            image = self.proxy_reader.get_image(key, frame)
+            if image is not None:
+                if self.active_frame_timer is not None:
+                    self.active_frame_timer.add('read', started, key)
+                return image
+        if self.timeline_widget.playing and not fast:
+            if self.playback_reader is None:
+                self.playback_reader = PlaybackReader(self.hdf5_model)
+            image = self.playback_reader.get_image(key, frame)
+            if image is not None:
+                return image
+        return self.hdf5_model.get_image(key, frame, reduced=fast)
+
+    def on_playing_changed(self, playing: bool):
+        """停止播放时关闭播放读取器（开始播放后在读取第一帧时创建）；计时记录以一次播放为单位"""
+        if playing:
+            if self.active_frame_timer is not None:
+                self.active_frame_timer.reset()
+        else:
+            self.close_playback_reader()
+            if self.active_frame_timer is not None:
+                logger.info("本次播放的帧耗时:\n%s", self.active_frame_timer.format_summary(None))
+            self.export_timing_btn.setEnabled(self.frame_timer is not None and self.frame_timer.frame_count() > 0)
+
+    def close_playback_reader(self):
+        """关闭播放读取器，并在日志中输出这次播放各相机的吞吐量"""
+        if self.playback_reader is not None:
+            self.playback_reader.log_stats()
+            self.playback_reader.close()
+            self.playback_reader = None
+
+    def set_frame_timing(self, enabled: bool):
+        """
+        启用或停用逐帧计时和帧耗时显示
+
+        Args:
+            enabled: 是否启用；停用后不再计时，已有的记录仍可导出
+        """
+        if enabled and self.frame_timer is None:
+            self.frame_timer = FrameTimer()
+        self.active_frame_timer = self.frame_timer if enabled else None
+        if self.hdf5_model:
+            self.hdf5_model.frame_timer = self.active_frame_timer
+        self.timeline_widget.set_frame_timer(self.active_frame_timer)
+
+        if enabled:
+            if self.timing_hud is None:
+                # 放在滚动区域上（而不是可滚动的图像容器中），始终显示在左上角
+                self.timing_hud = QLabel(self.images_scroll_area)
+                self.timing_hud.setAttribute(Qt.WA_TransparentForMouseEvents)
+                self.timing_hud.setStyleSheet('background-color: rgba(0, 0, 0, 0.65); color: #7CFC00; '
+                                              'font-family: monospace; font-size: 11px; padding: 4px 6px; '
+                                              'border-radius: 4px;')
+            self.update_timing_hud()
+            self.timing_hud.show()
+            self.timing_hud_timer.start()
+        else:
+            self.timing_hud_timer.stop()
+            if self.timing_hud is not None:
+                self.timing_hud.hide()
+        self.export_timing_btn.setEnabled(self.frame_timer is not None and self.frame_timer.frame_count() > 0)
+
+    def update_timing_hud(self):
+        """刷新帧耗时显示（最近的帧）"""
+        if self.timing_hud is None or self.frame_timer is None:
+            return
+        self.timing_hud.setText(self.frame_timer.format_summary())
+        self.timing_hud.adjustSize()
+        self.timing_hud.move(8, 8)
+        self.timing_hud.raise_()
+        if not self.export_timing_btn.isEnabled() and self.frame_timer.frame_count() > 0:
+            self.export_timing_btn.setEnabled(True)
+
+    def export_frame_timing(self):
+        """将计时记录导出为 CSV 或 Chrome trace JSON"""
+        if self.frame_timer is None or self.frame_timer.frame_count() == 0:
+            QMessageBox.information(self, "导出帧耗时", "还没有帧耗时记录，请先勾选「显示帧耗时」并播放")
+            return
+        default_dir = os.path.dirname(self.current_file_path) if self.current_file_path else ""
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "导出帧耗时", os.path.join(default_dir, "frame_timing.json"),
+            "Chrome trace (*.json);;CSV (*.csv)")
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += ".csv" if "csv" in selected_filter.lower() else ".json"
+        try:
+            frames = self.frame_timer.export(path)
+        except OSError as e:
+            QMessageBox.warning(self, "导出失败", f"无法写入 {path}: {e}")
+            return
+        self.statusBar().showMessage(f"已导出 {frames} 帧的耗时记录: {path}")
+
+    def set_use_proxies(self, enabled: bool):
+        """启用或停用低分辨率代理，并重新渲染当前帧"""
+        self.use_proxies = enabled
+        if self.hdf5_model:
+            self.open_proxy_for_current_file()
+            self.render_frame(self.timeline_widget.get_current_frame())
+
+    def open_proxy_for_current_file(self):
+        """打开当前文件的代理文件；启用代理但没有有效的代理文件时在后台生成"""
+        self.close_proxy()
+        self.stop_proxy_worker()
+        if not self.hdf5_model:
+            return
+        self.proxy_reader = self.proxy_store.open(self.hdf5_model)
+        if self.proxy_reader is None and self.use_proxies:
+            self.proxy_worker = ProxyWorker(self.current_file_path, self)
+            self.proxy_worker.proxyReady.connect(self.on_proxy_ready)
+            self.proxy_worker.start()
+            self.statusBar().showMessage("正在后台生成低分辨率代理...")
+
+    def on_proxy_ready(self, file_path: str, result: dict):
+        """后台生成代理文件完成后，若仍是当前文件则切换到代理并重新渲染"""
+        self.proxy_worker = None
+        if result['status'] not in ('built', 'fresh'):
+            if result['status'] != 'stopped':
+                logger.warning("生成代理文件失败 (%s): %s %s", file_path, result['status'], result['message'])
+            return
+        logger.info("代理文件已生成: %s (%.1f MB, %.1f 秒)", file_path, result['bytes'] / 1e6, result['seconds'])
+        if file_path == self.current_file_path and self.hdf5_model and self.proxy_reader is None:
+            self.proxy_reader = self.proxy_store.open(self.hdf5_model)
+            self.render_frame(self.timeline_widget.get_current_frame())
+
+    def close_proxy(self):
+        """关闭当前的代理文件"""
+        if self.proxy_reader is not None:
+            self.proxy_reader.close()
+            self.proxy_reader = None
+
+    def stop_proxy_worker(self):
+        """停止正在进行的代理生成（未完成的代理文件不保留）"""
+        if self.proxy_worker is not None:
+            self.proxy_worker.proxyReady.disconnect(self.on_proxy_ready)
+            self.proxy_worker.requestInterruption()
+            self.proxy_worker.wait()
+            self.proxy_worker = None
     
     def clear_image_grid(self):
         """清除图像网格中的所有图像"""
@@ -766,8 +1304,15 @@ class MainWindow(QMainWindow):
             if widget:
                 widget.deleteLater()
     
-    def display_image_in_label(self, image_data, label):
-        """在标签中显示图像"""
+    def display_image_in_label(self, image_data, label, fast: bool = False):
+        """
+        在标签中显示图像
+
+        Args:
+            image_data: 图像数据
+            label: 目标标签
+            fast: 是否使用快速缩放（拖动进度条时使用）
+        """
         if image_data is None:
             label.clear()
             label.setText("无图像数据")
@@ -781,6 +1326,9 @@ class MainWindow(QMainWindow):
             label.setStyleSheet(label.styleSheet() + "color: #ff6666;")
             return
 
+        timer = self.active_frame_timer
+        started = time.perf_counter() if timer is not None else 0.0
+
         # 将numpy数组转换为QImage
         height, width, channels = image_data.shape
         bytes_per_line = channels * width
@@ -799,6 +1347,8 @@ class MainWindow(QMainWindow):
         # 创建QImage和QPixmap
         q_image = QImage(image_data.data, width, height, bytes_per_line, format)
         pixmap = QPixmap.fromImage(q_image)
+        if timer is not None:
+            started = timer.add('convert', started)
         
         # 获取标签的实际可用大小（减去边距和边框）
         label_size = label.size()
@@ -810,8 +1360,10 @@ class MainWindow(QMainWindow):
             available_width, 
             available_height,
             Qt.KeepAspectRatio, 
-            Qt.SmoothTransformation
+            Qt.FastTransformation if fast else Qt.SmoothTransformation
         )
+        if timer is not None:
+            started = timer.add('scale', started)
         
         # 设置图像标签
         label.setPixmap(scaled_pixmap)
@@ -822,7 +1374,7 @@ class MainWindow(QMainWindow):
         try:
             current_frame = self.timeline_widget.get_current_frame() if hasattr(self, 'timeline_widget') else None
             if getattr(self, 'scores_loaded', False) and current_frame is not None:
-                sc = self.frame_scores.get(current_frame, None)
+                sc = score_at(self.frame_scores, current_frame)
                 overlay = label.findChild(QLabel, 'score_overlay')
                 if overlay is None:
                     overlay = QLabel(label)
@@ -858,76 +1410,66 @@ class MainWindow(QMainWindow):
             # 不要因为overlay失败而中断主流程
             # print(f"score overlay error: {e}")
             pass
+        if timer is not None:
+            timer.add('widget', started)
     
     def load_frame_scores_for_current_file(self):
-        """尝试从 repository 的 `data/` 目录或 HDF5 同目录加载与当前 HDF5 同名的 JSON 文件，解析其中的 `score` 字段为 frame->score 映射。"""
-        # 重置
-        self.frame_scores = {}
-        self.scores_loaded = False
-        self.scores_source = None
+        """
+        加载与当前 HDF5 同名的帧分数
 
+        依次查找 repository 的 `data/` 目录和 HDF5 同目录下的 `.npy` 旁路文件、
+        HDF5 内的分数数据集以及 JSON 文件（`score` 字段），结果为按帧索引的稠密数组。
+        """
         if not self.current_file_path:
-            return False
+            return self.apply_frame_scores(None)
 
-        import json
+        total_frames = self.hdf5_model.get_frame_count() if self.hdf5_model else None
+        h5file = self.hdf5_model.file if self.hdf5_model else None
+        result = load_frame_scores(self.current_file_path, total_frames, self.get_score_data_dirs(), h5file)
+        return self.apply_frame_scores(result)
 
-        # 优先查找 repo 根下的 data/ 目录
+    def get_score_data_dirs(self):
+        """分数文件的额外查找目录：优先查找 repo 根下的 data/ 目录"""
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-        data_dir = os.path.join(project_root, 'data')
-        base = os.path.splitext(os.path.basename(self.current_file_path))[0]
-
-        candidates = [
-            os.path.join(data_dir, base + '.json'),
-            os.path.join(os.path.dirname(self.current_file_path), base + '.json')
-        ]
-
-        for p in candidates:
-            if os.path.exists(p):
-                try:
-                    with open(p, 'r', encoding='utf-8') as f:
-                        doc = json.load(f)
-
-                    scores = doc.get('score') if isinstance(doc, dict) else None
-
-                    # 兼容不同格式
-                    if not scores:
-                        # 尝试其他常见键
-                        scores = doc.get('scores') or doc.get('score_list')
-
-                    if isinstance(scores, list):
-                        for entry in scores:
-                            if isinstance(entry, dict):
-                                for k, v in entry.items():
-                                    try:
-                                        idx = int(k)
-                                        self.frame_scores[idx] = v
-                                    except Exception:
-                                        continue
-                    elif isinstance(scores, dict):
-                        for k, v in scores.items():
-                            try:
-                                idx = int(k)
-                                self.frame_scores[idx] = v
-                            except Exception:
-                                continue
-
-                    self.scores_loaded = True
-                    self.scores_source = p
-                    print(f"已加载帧分数: {len(self.frame_scores)} 条, 来自: {p}")
-                    # 将分数数据传递给时间轴用于绘图
-                    try:
-                        if hasattr(self, 'timeline_widget') and self.timeline_widget:
-                            self.timeline_widget.plot_scores(self.frame_scores)
-                    except Exception:
-                        pass
-                    return True
+        return [os.path.join(project_root, 'data')]
 
-                except Exception as e:
-                    print(f"加载JSON分数失败 ({p}): {e}")
-                    continue
+    def apply_frame_scores(self, result):
+        """
+        使用加载结果更新当前文件的帧分数和得分曲线
 
-        print("未找到匹配的 JSON 分数文件或加载失败")
-        return False
+        Args:
+            result: load_frame_scores 的返回值 (分数数组, 来源, 解析耗时秒)，未找到时为None
+
+        Returns:
+            是否有可用的帧分数
+        """
+        # 重置
+        self.frame_scores = None
+        self.scores_loaded = False
+        self.scores_source = None
+
+        if result is None:
+            logger.info("未找到匹配的分数文件或加载失败")
+            self.scores_status_label.setText("")
+            self.scores_status_label.setToolTip("")
+            # 清除上一个文件残留的得分曲线
+            self.timeline_widget.plot_scores(None)
+            return False
+
+        self.frame_scores, self.scores_source, elapsed = result
+        self.scores_elapsed = elapsed
+        self.scores_loaded = True
+        count = int(np.isfinite(self.frame_scores).sum())
+        logger.info("已加载帧分数: %s 条, 来自: %s, 解析耗时 %.1f ms", count, self.scores_source, elapsed * 1000)
+        self.scores_status_label.setText(f"帧分数 {count} 条，解析 {elapsed * 1000:.1f} ms")
+        self.scores_status_label.setToolTip(f"来源: {self.scores_source}")
+
+        # 将分数数据传递给时间轴用于绘图
+        try:
+            self.timeline_widget.plot_scores(self.frame_scores)
+        except Exception:
+            pass
+        return True
 
     def update_ui_with_model(self):
         """使用模型数据更新UI"""
@@ -943,12 +1485,12 @@ class MainWindow(QMainWindow):
                 self.data_list_widget.addItem(key)
             # 确保列表是启用状态
             self.data_list_widget.setEnabled(True)
-            print(f"找到 {len(annotation_keys)} 个适合标注的字段")
+            logger.debug("找到 %s 个适合标注的字段", len(annotation_keys))
         else:
             # 如果没有适合的字段，显示提示
             self.data_list_widget.addItem("没有找到适合标注的字段")
             self.data_list_widget.setEnabled(False)
-            print("警告：没有找到适合标注的字段")
+            logger.warning("没有找到适合标注的字段")
 
         # 更新时间轴帧数
         frame_count = self.hdf5_model.get_frame_count()
@@ -957,29 +1499,67 @@ class MainWindow(QMainWindow):
         # 启用保存按钮和字段管理按钮
         self.save_annotations_btn.setEnabled(True)
         self.save_json_btn.setEnabled(True)  # 新增
+        self.export_clips_btn.setEnabled(self.clip_export_worker is None)
         self.create_field_button.setEnabled(True)  # 启用创建字段按钮
     
     def on_frame_changed(self, frame: int):
         """
         当时间轴上的当前帧改变时的处理函数
 
+        帧变化被合并：只记录最新请求的帧，在当前事件循环处理完后统一渲染一次。
+
         Args:
             frame: 新的帧索引
         """
         if not self.hdf5_model:
             return
 
+        self.pending_frame = frame
+        if not self.frame_render_timer.isActive():
+            self.frame_render_timer.start()
+
+    def render_pending_frame(self):
+        """渲染最近一次请求的帧"""
+        frame = self.pending_frame
+        self.pending_frame = None
+        if frame is not None:
+            self.render_frame(frame)
+
+    def on_scrubbing_changed(self, scrubbing: bool):
+        """
+        拖动进度条状态变化的处理函数
+
+        Args:
+            scrubbing: 是否正在拖动；松开时以全分辨率重新渲染当前帧
+        """
+        if not scrubbing and self.hdf5_model:
+            self.frame_render_timer.stop()
+            self.pending_frame = None
+            self.render_frame(self.timeline_widget.get_current_frame())
+
+    def render_frame(self, frame: int):
+        """
+        渲染指定帧：图像窗口、图像网格、状态栏和subtask信息
+
+        Args:
+            frame: 帧索引
+        """
+        if not self.hdf5_model:
+            return
+
+        fast = self.timeline_widget.scrubbing
+
         # 更新所有图像窗口
         for key, window in self.image_windows.items():
             if window.isVisible():
-                image_data = self.hdf5_model.get_image(key, frame)
+                image_data = self.get_display_image(key, frame, fast)
                 window.set_image(image_data)
 
         # 更新状态栏
         self.statusBar().showMessage(f"当前帧: {frame}/{self.hdf5_model.get_frame_count() - 1}")
 
         # 更新图像网格中的所有图像
-        self.display_all_images()
+        self.refresh_image_grid(frame, fast)
 
         # 更新当前subtask信息显示
         self.update_subtask_info_display(frame)
@@ -1032,7 +1612,7 @@ class MainWindow(QMainWindow):
                 self.selected_window_index = i
                 # 更新subtask信息显示
                 self.update_subtask_info_display(segment.start)
-                print(f"选中时间窗口: {start}-{end}, 描述: {description}")
+                logger.debug("选中时间窗口: %s-%s, 描述: %s", start, end, description)
                 break
 
     def on_subtask_info_clicked(self, event):
@@ -1076,11 +1656,11 @@ class MainWindow(QMainWindow):
                     self.timeline_widget.update_window_segment_with_time(
                         self.selected_window_index, old_start, old_end, new_start, new_end, new_description
                     )
-                    print(f"更新标注: 窗口 {old_start}-{old_end} -> {new_start}-{new_end}, 描述: {new_description}")
+                    logger.debug("更新标注: 窗口 %s-%s -> %s-%s, 描述: %s", old_start, old_end, new_start, new_end, new_description)
                 else:
                     # 只更新描述
                     self.timeline_widget.update_window_segment(self.selected_window_index, new_description)
-                    print(f"更新标注: 窗口{start}-{end}, 新描述: {new_description}")
+                    logger.debug("更新标注: 窗口%s-%s, 新描述: %s", start, end, new_description)
 
                 # 更新当前显示
                 current_frame = self.timeline_widget.get_current_frame()
@@ -1214,7 +1794,7 @@ class MainWindow(QMainWindow):
         current_frame = self.timeline_widget.get_current_frame()
         self.update_subtask_info_display(current_frame)
 
-        print(f"已加载字段 '{field_name}' 用于标注")
+        logger.info("已加载字段 '%s' 用于标注", field_name)
 
         # 更新时间轴清除按钮状态
         self.timeline_widget.update_clear_button_state()
@@ -1241,7 +1821,7 @@ class MainWindow(QMainWindow):
         current_frame = self.timeline_widget.get_current_frame()
         self.update_subtask_info_display(current_frame)
 
-        print("已清除时间轴标注")
+        logger.info("已清除时间轴标注")
 
     def create_new_annotation_field(self):
         """创建新的标注字段"""
@@ -1303,13 +1883,13 @@ class MainWindow(QMainWindow):
                     f"成功创建标注字段 '{field_name}'\n\n"
                     f"您现在可以选择该字段并开始标注。"
                 )
-                print(f"成功创建新标注字段: {field_name}")
+                logger.info("成功创建新标注字段: %s", field_name)
             else:
                 QMessageBox.critical(self, "创建失败", f"创建字段 '{field_name}' 失败")
 
         except Exception as e:
             QMessageBox.critical(self, "错误", f"创建字段时发生错误: {str(e)}")
-            print(f"创建字段失败: {e}")
+            logger.error("创建字段失败: %s", e)
 
     def delete_selected_field(self):
         """删除选中的标注字段"""
@@ -1370,11 +1950,11 @@ class MainWindow(QMainWindow):
                 self, "删除成功",
                 f"字段 '{field_name}' 已成功删除"
             )
-            print(f"成功删除字段: {field_name}")
+            logger.info("成功删除字段: %s", field_name)
 
         except Exception as e:
             QMessageBox.critical(self, "删除失败", f"删除字段 '{field_name}' 时发生错误: {str(e)}")
-            print(f"删除字段失败: {e}")
+            logger.error("删除字段失败: %s", e)
 
     def load_field_annotations(self, field_name):
         """从HDF5文件加载指定字段的标注数据"""
@@ -1403,14 +1983,14 @@ class MainWindow(QMainWindow):
                         # 创建时间轴段
                         self.timeline_widget.create_window_segment([start, end, display_text])
 
-                    print(f"从HDF5文件加载了字段 '{field_name}' 的 {len(languages)} 个标注")
+                    logger.info("从HDF5文件加载了字段 '%s' 的 %s 个标注", field_name, len(languages))
                 else:
-                    print(f"字段 '{field_name}' 中没有找到标注数据")
+                    logger.debug("字段 '%s' 中没有找到标注数据", field_name)
             else:
-                print(f"HDF5文件中没有字段 '{field_name}'")
+                logger.debug("HDF5文件中没有字段 '%s'", field_name)
 
         except Exception as e:
-            print(f"加载字段 '{field_name}' 的标注数据失败: {e}")
+            logger.error("加载字段 '%s' 的标注数据失败: %s", field_name, e)
             import traceback
             traceback.print_exc()
 
@@ -1439,20 +2019,20 @@ class MainWindow(QMainWindow):
             data = self.hdf5_model.get_data(key, current_frame)
             
             if data is None:
-                print(f"{key}: 无数据")
+                logger.debug("%s: 无数据", key)
                 return
             
             # 显示数据
             if isinstance(data, np.ndarray):
                 if data.size > 100:  # 数据太大，只显示形状
-                    print(f"{key}: 形状={data.shape}, 类型={data.dtype}")
+                    logger.debug("%s: 形状=%s, 类型=%s", key, data.shape, data.dtype)
                 else:
                     # 处理可能的字节字符串
                     text = str(data)
                     # 限制显示长度，避免界面卡顿
                     if len(text) > 200:
                         text = text[:200] + "..."
-                    print(f"{key}: {text}")
+                    logger.debug("%s: %s", key, text)
             else:
                 # 处理单个字节字符串或其他类型
                 if isinstance(data, bytes):
@@ -1467,19 +2047,18 @@ class MainWindow(QMainWindow):
                 if len(text) > 200:
                     text = text[:200] + "..."
                 # 简化数据显示，不再需要data_value_label
-            print(f"{key}: {text}")
+            logger.debug("%s: %s", key, text)
 
         except Exception as e:
             # 捕获所有异常，防止软件崩溃
             error_msg = f"{key}: 数据读取错误 - {str(e)[:100]}"
-            print(error_msg)
-            print(f"更新数据显示时出错: {key}, 错误: {e}")
+            logger.error("更新数据显示时出错: %s, 错误: %s", key, e)
 
             # 尝试获取数据集基本信息
             try:
                 info = self.hdf5_model.get_data_info(key)
                 if info:
-                    print(f"{key}: 形状={info.get('shape', '未知')}, 类型={info.get('dtype', '未知')}")
+                    logger.debug("%s: 形状=%s, 类型=%s", key, info.get('shape', '未知'), info.get('dtype', '未知'))
             except:
                 pass
     
@@ -1520,9 +2099,20 @@ class MainWindow(QMainWindow):
         for window in self.image_windows.values():
             window.close()
         
-        # 关闭HDF5模型
+        # 停止缩略图和代理生成、文件夹编目和监视
+        self.timeline_widget.stop_thumbnails()
+        self.close_playback_reader()
+        self.stop_clip_export()
+        self.stop_proxy_worker()
+        self.close_proxy()
+        self.proxy_store.close()
+        self.stop_catalog_worker()
+        self.folder_watcher.stop()
+
+        # 关闭HDF5模型和预加载池
         if self.hdf5_model:
             self.hdf5_model.close()
+        self.model_pool.shutdown()
         
         # 接受关闭事件
         event.accept()
@@ -1546,11 +2136,11 @@ class MainWindow(QMainWindow):
 
     def on_window_added(self, start_frame, end_frame):
         """处理新增时间窗口事件"""
-        print(f"主窗口收到新增时间窗口事件: {start_frame}-{end_frame}")
+        logger.debug("主窗口收到新增时间窗口事件: %s-%s", start_frame, end_frame)
         # 更新当前subtask信息显示
         current_frame = self.timeline_widget.current_frame
         self.update_subtask_info_display(current_frame)
-        print(f"新增时间窗口: {start_frame}-{end_frame}")
+        logger.debug("新增时间窗口: %s-%s", start_frame, end_frame)
         # 可以在这里添加额外的处理逻辑，比如自动跳转到新窗口
         self.timeline_widget.set_current_frame(start_frame)
 
@@ -1603,7 +2193,7 @@ class MainWindow(QMainWindow):
         success = self.timeline_widget.save_annotations(self.hdf5_model, self.current_annotation_field)
 
         if success:
-            print(f"标注数据已成功保存到HDF5文件字段 '{self.current_annotation_field}': {self.current_file_path}")
+            logger.info("标注数据已成功保存到HDF5文件字段 '%s': %s", self.current_annotation_field, self.current_file_path)
             # 显示保存成功的详细信息
             QMessageBox.information(
                 self, "保存成功",
@@ -1612,16 +2202,82 @@ class MainWindow(QMainWindow):
                 f"字段: {self.current_annotation_field}"
             )
         else:
-            print("保存标注数据失败")
+            logger.error("保存标注数据失败")
 
     def load_existing_annotations(self):
         """从HDF5文件加载已有的标注数据（已弃用，现在通过字段选择加载）"""
         # 这个方法现在不再自动调用，标注数据的加载通过用户选择字段来控制
-        print("load_existing_annotations方法已弃用，请使用字段选择功能加载标注数据")
+        logger.debug("load_existing_annotations方法已弃用，请使用字段选择功能加载标注数据")
         pass
 
     # 移除execute_batch_setting方法 - 不再需要
 
+    def export_clips(self):
+        """将时间轴上的时间窗口导出为视频片段（在后台进程中编码）"""
+        if not self.hdf5_model or not self.timeline_widget.time_windows:
+            QMessageBox.information(self, "提示", "没有时间窗口可以导出")
+            return
+        cameras = export_cameras(self.hdf5_model)
+        if not cameras:
+            QMessageBox.information(self, "提示", "当前文件没有可导出的彩色相机")
+            return
+
+        windows = self.timeline_widget.time_windows
+        selected = self.selected_window_index if self.selected_window_index is not None and \
+            self.selected_window_index < len(windows) else None
+        dialog = ClipExportDialog(self, self.current_file_path, windows, cameras, selected)
+        if dialog.exec_() != ClipExportDialog.Accepted:
+            return
+        try:
+            jobs = dialog.get_jobs()
+        except ValueError as e:
+            QMessageBox.warning(self, "导出失败", str(e))
+            return
+        if not jobs:
+            return
+        if not dialog.output_edit.text().strip():
+            QMessageBox.warning(self, "导出失败", "请选择输出目录")
+            return
+
+        self.export_clips_btn.setEnabled(False)
+        self.clip_export_worker = ClipExportWorker(jobs, self)
+        self.clip_export_worker.clipExported.connect(self.on_clip_exported)
+        self.clip_export_worker.exportFinished.connect(self.on_clip_export_finished)
+        self.clip_export_worker.start()
+        self.statusBar().showMessage(f"正在导出 {len(jobs)} 个视频片段...")
+
+    def on_clip_exported(self, done: int, total: int, result: dict):
+        """显示导出进度"""
+        if result['status'] != 'exported':
+            logger.warning("导出视频片段失败 (%s): %s", result['output'], result['message'])
+        self.statusBar().showMessage(f"正在导出视频片段 {done}/{total}...")
+
+    def on_clip_export_finished(self, results: list, seconds: float):
+        """导出完成后汇报结果和速度"""
+        self.clip_export_worker = None
+        self.export_clips_btn.setEnabled(self.hdf5_model is not None)
+        exported = [result for result in results if result['status'] == 'exported']
+        failed = [result for result in results if result['status'] != 'exported']
+        frames = sum(result['frames'] for result in exported)
+        message = (f"导出 {len(exported)} 个视频片段，共 {frames} 帧，耗时 {seconds:.1f} 秒"
+                   f"（{frames / seconds if seconds > 0 else 0:.0f} 帧/秒）")
+        logger.info(message)
+        self.statusBar().showMessage(message)
+        if failed:
+            details = "\n".join(f"{os.path.basename(result['output'])}: {result['message']}" for result in failed[:10])
+            QMessageBox.warning(self, "部分片段导出失败", f"{message}\n失败 {len(failed)} 个：\n{details}")
+        elif exported:
+            QMessageBox.information(self, "导出完成",
+                                    f"{message}\n输出目录: {os.path.dirname(exported[0]['output'])}")
+
+    def stop_clip_export(self):
+        """停止正在进行的视频片段导出（已开始的片段会完成）"""
+        if self.clip_export_worker is not None:
+            self.clip_export_worker.exportFinished.disconnect(self.on_clip_export_finished)
+            self.clip_export_worker.requestInterruption()
+            self.clip_export_worker.wait()
+            self.clip_export_worker = None
+
     def save_annotations_as_json(self):
         """保存标注数据为JSON文件"""
         if not self.timeline_widget.time_windows:
@@ -1643,19 +2299,11 @@ class MainWindow(QMainWindow):
         from src.core.phrase_library import PhraseMapping
         phrase_mapping = PhraseMapping()
 
-        annotations = []
+        windows = []
         for start, end, description in self.timeline_widget.time_windows:
             # 获取英文翻译，如果没有映射则使用原文
             english_translation = phrase_mapping.get_english_translation(description)
-            save_description = english_translation if english_translation else description
-
-            annotation_data = {
-                "start_frame": start,
-                "end_frame": end,
-                "description": save_description,  # 只保存英文标注
-                "duration_frames": end - start + 1
-            }
-            annotations.append(annotation_data)
+            windows.append((start, end, english_translation if english_translation else description))
 
         # 选择保存文件
         from PyQt5.QtWidgets import QFileDialog
@@ -1677,31 +2325,26 @@ class MainWindow(QMainWindow):
                 file_path += '.json'
 
             try:
-                import json
                 from PyQt5.QtCore import QDateTime
 
-                # 准备保存的数据结构，使用选择的字段名作为数据键
-                save_data = {
-                    "total_frames": self.timeline_widget.total_frames,
-                    self.current_annotation_field: annotations,  # 使用选择的字段名作为键
-                    "annotation_field": self.current_annotation_field,  # 记录标注字段名
-                    "created_time": QDateTime.currentDateTime().toString("ddd MMM dd hh:mm:ss yyyy"),
-                    "source_file": self.current_file_path if hasattr(self, 'current_file_path') else "unknown"
-                }
+                # 准备保存的数据结构，使用选择的字段名作为数据键（与命令行导出共用同一格式）
+                save_data = build_annotation_json(
+                    self.current_annotation_field, windows, self.timeline_widget.total_frames,
+                    self.current_file_path if hasattr(self, 'current_file_path') else "unknown",
+                    created_time=QDateTime.currentDateTime().toString("ddd MMM dd hh:mm:ss yyyy"))
 
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(save_data, f, ensure_ascii=False, indent=2)
+                write_json_atomic(file_path, save_data)
 
                 QMessageBox.information(
                     self, "成功",
                     f"标注数据已保存到: {file_path}\n字段: {self.current_annotation_field}\n格式: JSON"
                 )
-                print(f"标注数据已保存到JSON文件: {file_path} (字段: {self.current_annotation_field})")
+                logger.info("标注数据已保存到JSON文件: %s (字段: %s)", file_path, self.current_annotation_field)
                 return True
 
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"保存JSON文件失败: {str(e)}")
-                print(f"保存JSON标注数据失败: {e}")
+                logger.error("保存JSON标注数据失败: %s", e)
                 return False
 
         return False
@@ -1726,30 +2369,9 @@ class MainWindow(QMainWindow):
                 for timeline in self.timeline_widget.timelines:
                     timeline.segments = [seg for seg in timeline.segments if seg.key != "annotation"]
 
-                # 检测JSON格式并加载时间窗口
-                annotations_data = []
-                loaded_field = None
-
-                # 新格式：检查是否有annotation_field字段
-                if "annotation_field" in data:
-                    loaded_field = data["annotation_field"]
-                    annotations_data = data.get(loaded_field, [])
-                    print(f"检测到新格式JSON，字段: {loaded_field}")
-                # 兼容旧格式：直接查找annotations键
-                elif "annotations" in data:
-                    annotations_data = data["annotations"]
-                    loaded_field = "annotations"
-                    print("检测到旧格式JSON，使用默认annotations字段")
-                else:
-                    # 尝试查找其他可能的标注字段
-                    for key, value in data.items():
-                        if (isinstance(value, list) and key not in ["total_frames", "created_time", "source_file"]
-                            and len(value) > 0 and isinstance(value[0], dict)
-                            and "start_frame" in value[0]):
-                            annotations_data = value
-                            loaded_field = key
-                            print(f"自动检测到标注字段: {key}")
-                            break
+                # 检测JSON格式并加载时间窗口（annotation_field 指定的字段、旧格式 annotations 或自动检测）
+                loaded_field, annotations_data = find_annotation_windows(data)
+                logger.debug("JSON标注字段: %s", loaded_field)
 
                 if not annotations_data:
                     QMessageBox.warning(self, "格式错误", "JSON文件中没有找到有效的标注数据")
@@ -1772,9 +2394,9 @@ class MainWindow(QMainWindow):
                         self.current_annotation_field = loaded_field
                         self.current_field_label.setText(f"当前字段: {loaded_field}")
                         # 清除按钮现在在TimelineWidget中，会自动更新状态
-                        print(f"已设置当前标注字段为: {loaded_field}")
+                        logger.info("已设置当前标注字段为: %s", loaded_field)
 
-                print(f"从 {file_path} 加载了 {len(self.timeline_widget.time_windows)} 个时间窗口")
+                logger.info("从 %s 加载了 %s 个时间窗口", file_path, len(self.timeline_widget.time_windows))
 
                 # 更新时间轴显示
                 self.timeline_widget.update()
@@ -1792,7 +2414,7 @@ class MainWindow(QMainWindow):
 
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"加载JSON文件失败: {str(e)}")
-                print(f"加载JSON标注数据失败: {e}")
+                logger.error("加载JSON标注数据失败: %s", e)
                 return False
 
         return False
\ No newline at end of file
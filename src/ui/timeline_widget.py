@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QPushButton, QComboBox, QSpinBox, QInputDialog, QMessageBox, QFrame, QSizePolicy
-from PyQt5.QtCore import Qt, pyqtSignal, QRect, QTimer, QPoint, QDateTime
-from PyQt5.QtGui import QPainter, QColor, QBrush, QPen, QMouseEvent
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QPushButton, QComboBox, QSpinBox, QInputDialog, QMessageBox, QFrame, QSizePolicy, QMenu
+from PyQt5.QtCore import Qt, pyqtSignal, QRect, QTimer, QPoint, QDateTime, QThread
+from PyQt5.QtGui import QPainter, QColor, QBrush, QPen, QMouseEvent, QImage, QPixmap
 from typing import Dict, List, Tuple, Optional, Set, Any
 import random
 import hashlib
+import time
+import numpy as np
 
-# Matplotlib for score plotting
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from src.core.frame_scores import scores_to_array, score_range, minmax_envelope
+from src.core.annotation_io import validate_windows
+from src.core.thumbnails import build_thumbnails
+from src.utils.logger import get_logger
+
+logger = get_logger('timeline')
 
 
 class TimelineSegment:
@@ -246,7 +251,7 @@ class RangeSelector:
     def set_snap_points(self, points):
         """设置吸附点列表"""
         self.snap_points = sorted(points)
-        print(f"设置吸附点: {self.snap_points}")
+        logger.debug("设置吸附点: %s", self.snap_points)
 
 
 class TimelineBar(QWidget):
@@ -281,6 +286,7 @@ class TimelineBar(QWidget):
         self.selected_segments = []  # 多选模式下选中的段
         self.is_multi_select_mode = False  # 是否处于多选模式
         self.ctrl_was_pressed = False  # 记录Ctrl键是否被按下
+        self.frame_timer = None  # 逐帧计时（FrameTimer），为None时不计时
 
         # 拖拽相关属性
         self.dragging_segment = None  # 当前拖拽的段
@@ -313,21 +319,11 @@ class TimelineBar(QWidget):
         # 重绘
         self.update()
 
-        # 更新score垂直指示线位置（如果已绘制）
-        try:
-            self.update_score_vline()
-        except Exception:
-            pass
-        
         # 只有在帧实际变化时才发出信号
         if prev_frame != self.current_frame:
-            print(f"发出帧变化信号: {self.current_frame}")
+            logger.debug("发出帧变化信号: %s", self.current_frame)
             # 发出帧变化信号
             self.frameChanged.emit(self.current_frame)
-        else:
-            print(f"帧未变化，不发送信号")
-            
-        print(f"*** TimelineBar({self.key}).set_current_frame完成 ***\n")
     
     def add_segment(self, segment: TimelineSegment):
         """添加时间轴段"""
@@ -354,9 +350,9 @@ class TimelineBar(QWidget):
         """切换范围选择器的激活状态"""
         self.range_selector.active = active
         if active:
-            print(f"TimelineBar({self.key}): 激活范围选择器")
+            logger.debug("TimelineBar(%s): 激活范围选择器", self.key)
         else:
-            print(f"TimelineBar({self.key}): 关闭范围选择器")
+            logger.debug("TimelineBar(%s): 关闭范围选择器", self.key)
         self.update()
     
     def get_selected_range(self) -> Tuple[int, int]:
@@ -364,6 +360,14 @@ class TimelineBar(QWidget):
         return (self.range_selector.start, self.range_selector.end)
     
     def paintEvent(self, event):
+        """绘制时间轴，启用逐帧计时时计入 timeline 阶段"""
+        timer = self.frame_timer
+        started = time.perf_counter() if timer is not None else 0.0
+        self._paint_timeline(event)
+        if timer is not None:
+            timer.add('timeline', started, self.key)
+
+    def _paint_timeline(self, event):
         """绘制时间轴"""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
@@ -560,10 +564,10 @@ class TimelineBar(QWidget):
                     # 多选模式：切换段的选中状态
                     if clicked_segment in self.selected_segments:
                         self.selected_segments.remove(clicked_segment)
-                        print(f"取消选中段 {clicked_segment.start}-{clicked_segment.end}")
+                        logger.debug("取消选中段 %s-%s", clicked_segment.start, clicked_segment.end)
                     else:
                         self.selected_segments.append(clicked_segment)
-                        print(f"选中段 {clicked_segment.start}-{clicked_segment.end}")
+                        logger.debug("选中段 %s-%s", clicked_segment.start, clicked_segment.end)
 
                     # 更新UI
                     self.update()
@@ -579,14 +583,14 @@ class TimelineBar(QWidget):
                         self.drag_start_pos = pos
                         self.drag_start_frame = frame
                         self.setCursor(Qt.SizeHorCursor)
-                        print(f"开始调整段左边界: {clicked_segment.start}-{clicked_segment.end}")
+                        logger.debug("开始调整段左边界: %s-%s", clicked_segment.start, clicked_segment.end)
                     elif abs(pos - segment_end_pos) <= 5:  # 点击右边缘
                         self.dragging_segment = clicked_segment
                         self.drag_mode = 'resize_right'
                         self.drag_start_pos = pos
                         self.drag_start_frame = frame
                         self.setCursor(Qt.SizeHorCursor)
-                        print(f"开始调整段右边界: {clicked_segment.start}-{clicked_segment.end}")
+                        logger.debug("开始调整段右边界: %s-%s", clicked_segment.start, clicked_segment.end)
                     else:  # 点击段的中间部分
                         # 选中段
                         self.selected_segments.clear()
@@ -601,7 +605,7 @@ class TimelineBar(QWidget):
 
                         # 发送段点击信号
                         self.segmentClicked.emit(clicked_segment)
-                        print(f"选中并开始移动段: {clicked_segment.start}-{clicked_segment.end}")
+                        logger.debug("选中并开始移动段: %s-%s", clicked_segment.start, clicked_segment.end)
 
                     self.update()
             else:
@@ -618,7 +622,7 @@ class TimelineBar(QWidget):
             if self.selected_segments:
                 self.selected_segments.clear()
                 self.update()
-                print("清除所有选中的段")
+                logger.debug("清除所有选中的段")
 
     def mouseDoubleClickEvent(self, event: QMouseEvent):
         """处理鼠标双击事件 - 用于编辑段的标注"""
@@ -695,7 +699,7 @@ class TimelineBar(QWidget):
                             else:
                                 segment.color = QColor(100, 150, 200)
 
-                            print(f"更新段时间和标注: {segment.start}-{segment.end}, 标注: '{segment.subtask}'")
+                            logger.debug("更新段时间和标注: %s-%s, 标注: '%s'", segment.start, segment.end, segment.subtask)
                         else:
                             # 只更新描述
                             parent_widget.time_windows[i] = [window[0], window[1], text.strip()]
@@ -708,7 +712,7 @@ class TimelineBar(QWidget):
                             else:
                                 segment.color = QColor(100, 150, 200)
 
-                            print(f"更新段标注: {segment.start}-{segment.end}, 标注: '{segment.subtask}'")
+                            logger.debug("更新段标注: %s-%s, 标注: '%s'", segment.start, segment.end, segment.subtask)
                         break
 
             self.update()
@@ -860,7 +864,7 @@ class TimelineBar(QWidget):
 
             # 处理段拖拽结束
             elif self.dragging_segment:
-                print(f"结束拖拽段: {self.dragging_segment.start}-{self.dragging_segment.end}")
+                logger.debug("结束拖拽段: %s-%s", self.dragging_segment.start, self.dragging_segment.end)
 
                 # 如果是annotation键的段，需要同步所有时间窗口数据
                 if self.dragging_segment.key == "annotation":
@@ -870,9 +874,9 @@ class TimelineBar(QWidget):
                         self.sync_segments_to_time_windows(timeline_widget)
                         
                         # 打印同步后的数据用于调试
-                        print("同步后的time_windows数据:")
+                        logger.debug("同步后的time_windows数据:")
                         for i, window in enumerate(timeline_widget.time_windows):
-                            print(f"  [{i}]: {window}")
+                            logger.debug("  [%s]: %s", i, window)
 
                         # 更新主窗口的subtask信息显示
                         if hasattr(timeline_widget, 'parent') and timeline_widget.parent() and \
@@ -925,18 +929,18 @@ class TimelineBar(QWidget):
                 seg_data['subtask']
             ])
         
-        print(f"同步了 {len(current_segments)} 个段到time_windows")
+        logger.debug("同步了 %s 个段到time_windows", len(current_segments))
     
     def keyReleaseEvent(self, event):
         """处理键盘释放事件"""
         # 检测Ctrl键松开
         if event.key() == Qt.Key_Control and self.ctrl_was_pressed:
-            print("检测到Ctrl键松开")
+            logger.debug("检测到Ctrl键松开")
             self.ctrl_was_pressed = False
             
             # 如果有选中的段，发送多选信号
             if self.selected_segments:
-                print(f"Ctrl松开后发送多选信号，选中 {len(self.selected_segments)} 个段")
+                logger.debug("Ctrl松开后发送多选信号，选中 %s 个段", len(self.selected_segments))
                 self.segmentsMultiSelected.emit(self.selected_segments, self.key)
         
         super().keyReleaseEvent(event)
@@ -945,20 +949,20 @@ class TimelineBar(QWidget):
         """处理键盘事件"""
         # 处理Enter键
         if event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
-            print(f"TimelineBar({self.key}): 检测到Enter键")
+            logger.debug("TimelineBar(%s): 检测到Enter键", self.key)
             if self.range_selector.active:
-                print(f"TimelineBar({self.key}): 范围选择模式下确认选择")
+                logger.debug("TimelineBar(%s): 范围选择模式下确认选择", self.key)
                 # 获取当前选择的范围
                 start, end = self.range_selector.start, self.range_selector.end
-                print(f"TimelineBar({self.key}): 发送范围选择信号 {start}-{end}")
+                logger.debug("TimelineBar(%s): 发送范围选择信号 %s-%s", self.key, start, end)
                 # 发送范围选择信号
                 self.rangeSelected.emit(start, end, self.key)
             else:
-                print(f"TimelineBar({self.key}): 不在范围选择模式下，传递给父类")
+                logger.debug("TimelineBar(%s): 不在范围选择模式下，传递给父类", self.key)
                 super().keyPressEvent(event)
         # 处理ESC键，退出范围选择模式
         elif event.key() == Qt.Key_Escape and self.range_selector.active:
-            print(f"TimelineBar({self.key}): ESC键，取消范围选择")
+            logger.debug("TimelineBar(%s): ESC键，取消范围选择", self.key)
             self.toggle_range_selector(False)
         # 处理方向键，用于调整滑块位置
         elif self.range_selector.active and (event.key() == Qt.Key_Left or event.key() == Qt.Key_Right):
@@ -984,7 +988,7 @@ class TimelineBar(QWidget):
                 # 更新显示的帧
                 self.frameChanged.emit(self.range_selector.start)
                 self.update()
-            print(f"TimelineBar({self.key}): 调整滑块位置，当前控制: {self.range_selector.dragging_handle}")
+            logger.debug("TimelineBar(%s): 调整滑块位置，当前控制: %s", self.key, self.range_selector.dragging_handle)
         # 处理上下方向键，用于切换控制的滑块
         elif self.range_selector.active and (event.key() == Qt.Key_Up or event.key() == Qt.Key_Down):
             # 切换控制的滑块
@@ -992,19 +996,19 @@ class TimelineBar(QWidget):
                 self.range_selector.dragging_handle = 'end'
                 # 更新显示的帧
                 self.frameChanged.emit(self.range_selector.end)
-                print(f"TimelineBar({self.key}): 切换到控制结束滑块")
+                logger.debug("TimelineBar(%s): 切换到控制结束滑块", self.key)
             else:
                 self.range_selector.dragging_handle = 'start'
                 # 更新显示的帧
                 self.frameChanged.emit(self.range_selector.start)
-                print(f"TimelineBar({self.key}): 切换到控制起始滑块")
+                logger.debug("TimelineBar(%s): 切换到控制起始滑块", self.key)
             self.update()
         # 处理Backspace键，删除选中的段
         elif event.key() == Qt.Key_Backspace and self.selected_segments:
-            print(f"TimelineBar({self.key}): 检测到Backspace键，删除选中的段")
+            logger.debug("TimelineBar(%s): 检测到Backspace键，删除选中的段", self.key)
             # 删除所有选中的段
             for segment in self.selected_segments[:]:  # 使用切片复制避免修改列表时的问题
-                print(f"删除段: {segment.start}-{segment.end}")
+                logger.debug("删除段: %s-%s", segment.start, segment.end)
                 # 从segments列表中移除
                 if segment in self.segments:
                     self.segments.remove(segment)
@@ -1046,10 +1050,10 @@ class TimelineBar(QWidget):
                 break
         
         if current_window_index is None:
-            print(f"警告: 未找到段对应的时间窗口，subtask: '{current_segment_subtask}'")
+            logger.warning("未找到段对应的时间窗口，subtask: '%s'", current_segment_subtask)
             return new_start, new_end
         
-        print(f"智能边界调整: 当前段 {current_segment.start}-{current_segment.end}, 目标: {new_start}-{new_end}, 操作: {operation_type}")
+        logger.debug("智能边界调整: 当前段 %s-%s, 目标: %s-%s, 操作: %s", current_segment.start, current_segment.end, new_start, new_end, operation_type)
         
         # 按起始帧排序时间窗口
         sorted_windows = sorted(enumerate(parent_widget.time_windows), key=lambda x: x[1][0])
@@ -1088,7 +1092,7 @@ class TimelineBar(QWidget):
                     # 有重叠，调整到前一个窗口之后
                     new_start = prev_end + 1
                     new_end = new_start + window_width - 1
-                    print(f"智能边界调整: 检测到与前一个窗口重叠，调整到 {new_start}-{new_end}")
+                    logger.debug("智能边界调整: 检测到与前一个窗口重叠，调整到 %s-%s", new_start, new_end)
             
             # 检查与后一个窗口的重叠
             if next_window:
@@ -1097,7 +1101,7 @@ class TimelineBar(QWidget):
                     # 有重叠，调整到后一个窗口之前
                     new_end = next_start - 1
                     new_start = new_end - window_width + 1
-                    print(f"智能边界调整: 检测到与后一个窗口重叠，调整到 {new_start}-{new_end}")
+                    logger.debug("智能边界调整: 检测到与后一个窗口重叠，调整到 %s-%s", new_start, new_end)
             
             # 确保不超出总帧数范围
             if new_start < 0:
@@ -1116,7 +1120,7 @@ class TimelineBar(QWidget):
                     new_start = prev_end + 1
                     # 更新前一窗口的结束位置
                     parent_widget.time_windows[prev_orig_index] = [prev_start, new_start - 1, prev_window[2]]
-                    print(f"智能边界调整: 调整前一个窗口结束位置: {prev_end} -> {new_start - 1}")
+                    logger.debug("智能边界调整: 调整前一个窗口结束位置: %s -> %s", prev_end, new_start - 1)
                     
                     # 更新前一窗口对应的段
                     self.update_segment_boundaries(prev_orig_index, prev_start, new_start - 1)
@@ -1130,12 +1134,12 @@ class TimelineBar(QWidget):
                     new_end = next_start - 1
                     # 更新后一窗口的起始位置
                     parent_widget.time_windows[next_orig_index] = [new_end + 1, next_end, next_window[2]]
-                    print(f"智能边界调整: 调整后一个窗口起始位置: {next_start} -> {new_end + 1}")
+                    logger.debug("智能边界调整: 调整后一个窗口起始位置: %s -> %s", next_start, new_end + 1)
                     
                     # 更新后一窗口对应的段
                     self.update_segment_boundaries(next_orig_index, new_end + 1, next_end)
         
-        print(f"智能边界调整: 最终结果 {new_start}-{new_end}")
+        logger.debug("智能边界调整: 最终结果 %s-%s", new_start, new_end)
         return new_start, new_end
 
     def update_segment_boundaries(self, window_index, new_start, new_end):
@@ -1169,10 +1173,204 @@ class TimelineBar(QWidget):
                     old_start, old_end = segment.start, segment.end
                     segment.start = new_start
                     segment.end = new_end
-                    print(f"更新段边界: {old_start}-{old_end} -> {new_start}-{new_end}, 描述: '{description}'")
+                    logger.debug("更新段边界: %s-%s -> %s-%s, 描述: '%s'", old_start, old_end, new_start, new_end, description)
                     break
 
 
+def _thumbnail_qimage(image: np.ndarray) -> QImage:
+    """将 (高, 宽, 3) 的缩略图数组包装为 QImage（与图像网格一致按 RGB888 显示，不复制数据）"""
+    height, width = image.shape[:2]
+    return QImage(image.data, width, height, width * 3, QImage.Format_RGB888)
+
+
+class ThumbnailWorker(QThread):
+    """在后台线程中生成（或读取缓存的）缩略图 mipmap"""
+
+    thumbnailsUpdated = pyqtSignal(str, object)  # 文件路径、ThumbnailMipmap（每完成一个层级发送一次）
+
+    def __init__(self, file_path: str, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            build_thumbnails(self.file_path,
+                             on_update=lambda mipmap: self.thumbnailsUpdated.emit(self.file_path, mipmap),
+                             should_stop=self.isInterruptionRequested)
+        except Exception as e:
+            logger.warning("生成缩略图失败 (%s): %s", self.file_path, e)
+
+
+class FilmstripBar(QWidget):
+    """
+    时间轴上方的缩略图胶片条
+
+    按控件宽度能容纳的缩略图数选择 mipmap 层级，每张缩略图对应时间轴上等宽的一段帧；
+    鼠标悬停时立即显示最近帧的各相机缩略图（不解码），点击跳转到对应帧。
+    """
+
+    frameRequested = pyqtSignal(int)  # 点击请求跳转的帧
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.mipmap = None
+        self.camera = None  # 胶片条显示的相机
+        self.building = False  # 是否正在生成缩略图
+        self.total_frames = 100
+        self.current_frame = 0
+        self.hover_frame = None
+        self.frame_timer = None  # 逐帧计时（FrameTimer），为None时不计时
+        self.setFixedHeight(52)
+        self.setMinimumWidth(500)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.setMouseTracking(True)
+
+        # 悬停预览浮窗
+        self.preview = QLabel(self, Qt.ToolTip)
+        self.preview.setStyleSheet("background: #222; color: white; border: 1px solid #555; padding: 2px;")
+        self.preview.setAlignment(Qt.AlignCenter)
+
+    def set_mipmap(self, mipmap, building: bool = False):
+        """设置缩略图（生成过程中会以逐渐加密的同一对象多次调用）"""
+        self.mipmap = mipmap
+        self.building = building
+        if mipmap is not None and self.camera not in mipmap.images:
+            self.camera = mipmap.keys()[0] if mipmap.keys() else None
+        self.update()
+
+    def set_total_frames(self, frames: int):
+        self.total_frames = max(1, frames)
+        self.update()
+
+    def set_current_frame(self, frame: int):
+        """更新当前帧指示线（只重绘新旧指示线附近的区域）"""
+        if frame == self.current_frame:
+            return
+        old_x = self._frame_to_pos(self.current_frame)
+        self.current_frame = frame
+        new_x = self._frame_to_pos(frame)
+        self.update(QRect(old_x - 2, 0, 4, self.height()))
+        self.update(QRect(new_x - 2, 0, 4, self.height()))
+
+    def _frame_to_pos(self, frame: int) -> int:
+        # 与 TimelineBar 的坐标换算一致
+        return int(frame / self.total_frames * self.width())
+
+    def _pos_to_frame(self, x: int) -> int:
+        return max(0, min(int(x / max(1, self.width()) * self.total_frames), self.total_frames - 1))
+
+    def paintEvent(self, event):
+        timer = self.frame_timer
+        started = time.perf_counter() if timer is not None else 0.0
+        self._paint_filmstrip(event)
+        if timer is not None:
+            timer.add('timeline', started, 'filmstrip')
+
+    def _paint_filmstrip(self, event):
+        painter = QPainter(self)
+        width = self.width()
+        height = self.height()
+        painter.fillRect(event.rect(), QColor(40, 40, 40))
+
+        images = self.mipmap.images.get(self.camera) if self.mipmap is not None else None
+        if images is None:
+            painter.setPen(QColor(170, 170, 170))
+            painter.drawText(self.rect(), Qt.AlignCenter, "正在生成缩略图…" if self.building else "")
+            return
+
+        # 每张缩略图占据等宽的一段帧，按每段的帧数选择层级
+        thumb_height, thumb_width = images.shape[1:3]
+        slots = max(1, width // thumb_width)
+        slot_width = width / slots
+        frames_per_slot = self.total_frames / slots
+        stride = self.mipmap.stride_for_spacing(frames_per_slot)
+        top = (height - thumb_height) // 2
+        first = max(0, int(event.rect().left() // slot_width))
+        last = min(slots - 1, int(event.rect().right() // slot_width))
+        for slot in range(first, last + 1):
+            found = self.mipmap.nearest(self.camera, int((slot + 0.5) * frames_per_slot), stride)
+            if found is None:
+                continue
+            x = int(slot * slot_width + (slot_width - thumb_width) / 2)
+            painter.drawImage(x, top, _thumbnail_qimage(found[1]))
+
+        if self.hover_frame is not None:
+            painter.setPen(QPen(QColor(255, 255, 255, 180), 1))
+            hover_x = self._frame_to_pos(self.hover_frame)
+            painter.drawLine(hover_x, 0, hover_x, height)
+        painter.setPen(QPen(Qt.red, 2))
+        current_x = self._frame_to_pos(self.current_frame)
+        painter.drawLine(current_x, 0, current_x, height)
+
+    def mouseMoveEvent(self, event: QMouseEvent):
+        """悬停时显示最近帧的各相机缩略图"""
+        previous = self.hover_frame
+        self.hover_frame = self._pos_to_frame(event.x())
+        if previous != self.hover_frame:
+            for frame in (previous, self.hover_frame):
+                if frame is not None:
+                    x = self._frame_to_pos(frame)
+                    self.update(QRect(x - 1, 0, 3, self.height()))
+            self.show_preview(self.hover_frame, event.globalPos())
+        super().mouseMoveEvent(event)
+
+    def show_preview(self, frame: int, global_pos: QPoint):
+        """在鼠标上方显示放大两倍的各相机最近缩略图"""
+        if self.mipmap is None or not self.mipmap.keys():
+            self.preview.hide()
+            return
+        found = [self.mipmap.nearest(key, frame) for key in self.mipmap.keys()]
+        thumbnails = [image for _, image in filter(None, found)]
+        if not thumbnails:
+            self.preview.hide()
+            return
+        sample_frame = next(f for f, _ in filter(None, found))
+        gap = np.zeros((thumbnails[0].shape[0], 2, 3), dtype=np.uint8)
+        strip = np.ascontiguousarray(np.hstack([part for image in thumbnails for part in (image, gap)][:-1]))
+        pixmap = QPixmap.fromImage(_thumbnail_qimage(strip)).scaled(
+            strip.shape[1] * 2, strip.shape[0] * 2, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        painter = QPainter(pixmap)
+        painter.setPen(Qt.white)
+        painter.fillRect(0, 0, 70, 16, QColor(0, 0, 0, 160))
+        painter.drawText(QRect(0, 0, 70, 16), Qt.AlignCenter, f"帧 {sample_frame}")
+        painter.end()
+        self.preview.setPixmap(pixmap)
+        self.preview.adjustSize()
+        self.preview.move(global_pos.x() - self.preview.width() // 2, global_pos.y() - self.preview.height() - 16)
+        self.preview.show()
+
+    def leaveEvent(self, event):
+        self.preview.hide()
+        if self.hover_frame is not None:
+            x = self._frame_to_pos(self.hover_frame)
+            self.hover_frame = None
+            self.update(QRect(x - 1, 0, 3, self.height()))
+        super().leaveEvent(event)
+
+    def mousePressEvent(self, event: QMouseEvent):
+        if event.button() == Qt.LeftButton:
+            self.frameRequested.emit(self._pos_to_frame(event.x()))
+        super().mousePressEvent(event)
+
+    def contextMenuEvent(self, event):
+        """右键选择胶片条显示的相机"""
+        if self.mipmap is None or len(self.mipmap.keys()) < 2:
+            return
+        menu = QMenu(self)
+        for key in self.mipmap.keys():
+            action = menu.addAction(key)
+            action.setCheckable(True)
+            action.setChecked(key == self.camera)
+        chosen = menu.exec_(event.globalPos())
+        if chosen is not None:
+            self.camera = chosen.text()
+            self.update()
+
+    def hideEvent(self, event):
+        self.preview.hide()
+        super().hideEvent(event)
+
+
 class TimelineWidget(QWidget):
     """时间轴窗口部件，包含多个时间轴条和控制按钮"""
 
@@ -1180,6 +1378,8 @@ class TimelineWidget(QWidget):
     rangeSelected = pyqtSignal(int, int, str)  # 范围选择信号，包含起始、结束帧和键名
     segmentsMultiSelected = pyqtSignal(list, str)  # 多段选择信号，包含段列表和键名
     windowAdded = pyqtSignal(int, int)  # 新增时间窗口信号，包含起始和结束帧
+    scrubbingChanged = pyqtSignal(bool)  # 拖动进度条状态变化信号
+    playingChanged = pyqtSignal(bool)  # 播放状态变化信号
 
     def __init__(self, parent=None):
         """
@@ -1194,6 +1394,7 @@ class TimelineWidget(QWidget):
         self.current_frame = 0  # 当前帧
         self.fps = 10  # 播放速率，帧/秒
         self.playing = False  # 是否正在播放
+        self.scrubbing = False  # 是否正在拖动帧滑块
         self.timelines = []  # 时间轴条列表
         self.key_colors = {}  # 键到颜色的映射
         self.key_to_timeline = {}  # 键到时间轴条的映射
@@ -1219,33 +1420,26 @@ class TimelineWidget(QWidget):
         self.layout.setContentsMargins(5, 5, 5, 5) # 减少边距
         self.layout.setSpacing(5) # 减少间距
         
-        # 添加得分曲线画布（显示在进度条上方）
-        # 增加初始 figure 宽度并略微增高，以便线条显示更醒目
-        self.score_canvas = FigureCanvas(Figure(figsize=(8, 1.0)))
-        # 让画布横向扩展，与进度条同宽；高度固定为较短的条
-        self.score_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        self.score_canvas.setFixedHeight(110)
-        self.score_ax = self.score_canvas.figure.subplots()
-        # 简化坐标轴样式
-        self.score_ax.set_facecolor((1, 1, 1, 0))
-        # 给子图增加底部边距，防止 x 轴标签被裁切；左右略微收紧以便利用空间
-        try:
-            # 增加底部边距，避免 x 轴标签被裁切
-            self.score_canvas.figure.subplots_adjust(bottom=0.25, left=0.07, right=0.98, top=0.95)
-        except Exception:
-            pass
-        # x 轴与总帧数对齐（0..total_frames-1）
-        self.score_ax.set_xlim(0, max(0, self.total_frames - 1))
-        self.score_ax.set_ylim(0, 1)
-        self.score_ax.tick_params(axis='both', which='both', length=0)
-        self.score_ax.set_yticks([])
-        self.score_ax.set_xticks([])
+        # 得分曲线画布（显示在进度条上方）在第一次绘制分数时才创建，
+        # 避免没有分数文件时也在启动阶段导入 matplotlib
+        self.score_canvas = None
+        self.score_ax = None
+        self._score_canvas_pending = False  # 是否有等待创建画布后绘制的分数
         self.score_line = None
+        self.score_lo_line = None
+        self.score_fill = None
         self.score_vline = None
-        self.score_frames = []
-        self.score_values = []
-        # 将画布添加到主布局（在控制条之上）
-        self.layout.addWidget(self.score_canvas)
+        # 按帧索引的稠密得分数组（float32，NaN 表示缺失）
+        self.score_array = None
+        self._score_baseline = 0.0
+        # 当前包络对应的 (起始帧, 结束帧, 像素桶数)，仅在变化时重新计算
+        self._score_envelope_key = None
+        # blit 缓存：静态部分（曲线、刻度、标签）只在完整重绘时渲染一次，
+        # 逐帧只恢复背景并重绘红色指示线
+        self._score_background = None
+
+        # 逐帧计时（FrameTimer），为None时不计时，见 set_frame_timer
+        self.frame_timer = None
         
         # 创建控制布局
         control_layout = QHBoxLayout()
@@ -1257,6 +1451,8 @@ class TimelineWidget(QWidget):
         self.frame_slider.setMaximum(self.total_frames - 1)
         self.frame_slider.setValue(0)
         self.frame_slider.valueChanged.connect(self.on_slider_value_changed)
+        self.frame_slider.sliderPressed.connect(lambda: self.set_scrubbing(True))
+        self.frame_slider.sliderReleased.connect(lambda: self.set_scrubbing(False))
         self.frame_slider.setFixedHeight(25)  # 固定滑块高度
         self.frame_slider.setStyleSheet("""
             QSlider::groove:horizontal {
@@ -1380,6 +1576,14 @@ class TimelineWidget(QWidget):
         
         # 将控制布局添加到主布局
         self.layout.addLayout(control_layout)
+
+        # 缩略图胶片条（与时间轴同宽对齐），有缩略图时才显示
+        self.filmstrip = FilmstripBar(self)
+        self.filmstrip.frameRequested.connect(self.set_current_frame)
+        self.filmstrip.hide()
+        self.layout.addWidget(self.filmstrip)
+        self.thumbnail_worker = None
+        self.thumbnail_path = None  # 当前缩略图对应的文件
         
         # 时间轴区域（移除分隔线以节省空间）
         self.timelines_layout = QVBoxLayout()
@@ -1397,6 +1601,7 @@ class TimelineWidget(QWidget):
         
         for timeline in self.timelines:
             timeline.set_total_frames(self.total_frames)
+        self.filmstrip.set_total_frames(self.total_frames)
             
         self.update_frame_label()
         # 保证得分图的 x 轴与总帧数对齐
@@ -1412,6 +1617,9 @@ class TimelineWidget(QWidget):
         """设置当前帧"""
         prev_frame = self.current_frame
         self.current_frame = max(0, min(frame, self.total_frames - 1))
+        if self.frame_timer is not None and prev_frame != self.current_frame:
+            # 一帧从光标移动开始：之后的分数曲线、时间轴重绘和图像渲染都计入这一帧
+            self.frame_timer.begin_frame(self.current_frame)
         
         # 更新帧滑块的值（避免循环触发）
         if self.frame_slider.value() != self.current_frame:
@@ -1429,6 +1637,7 @@ class TimelineWidget(QWidget):
                 timeline.blockSignals(True)
                 timeline.set_current_frame(self.current_frame)
                 timeline.blockSignals(False)
+        self.filmstrip.set_current_frame(self.current_frame)
         
         # 重绘
         self.update()
@@ -1441,38 +1650,31 @@ class TimelineWidget(QWidget):
         
         # 只有在帧实际变化时才发出信号
         if prev_frame != self.current_frame:
-            print(f"发出帧变化信号: {self.current_frame}")
+            logger.debug("发出帧变化信号: %s", self.current_frame)
             # 发出帧变化信号
             self.frameChanged.emit(self.current_frame)
-        else:
-            print(f"帧未变化，不发送信号")
-        
-        print(f"*** TimelineWidget.set_current_frame完成 ***\n")
     
     def update_frame_label(self):
         """更新帧标签"""
         self.frame_label.setText(f"帧: {self.current_frame} / {self.total_frames - 1}")
     
     def on_slider_value_changed(self, value: int):
-        """处理滑块值变化"""
-        print(f"\n@@@ 滑块值变化: {value} @@@")
-        
-        # 保存当前帧用于对比
-        old_frame = self.current_frame
-        
-        # 设置当前帧
+        """处理滑块值变化，帧变化信号由 set_current_frame 在帧实际变化时发出"""
         self.set_current_frame(value)
-        
-        # 检查帧是否实际更新
-        if old_frame != self.current_frame:
-            print(f"帧已更新: {old_frame} -> {self.current_frame}")
-        else:
-            print(f"帧未变化: 仍为 {self.current_frame}")
-        
-        # 无论是否帧已经变化，都强制发送信号
-        print(f"强制发送帧变化信号: {value}")
-        self.frameChanged.emit(value)
-        print(f"@@@ 滑块值变化处理完成 @@@\n")
+
+    def set_scrubbing(self, scrubbing: bool):
+        """
+        设置拖动状态
+
+        拖动期间接收方可以显示缓存或低分辨率的帧，松开后再按全分辨率刷新。
+
+        Args:
+            scrubbing: 是否正在拖动
+        """
+        if self.scrubbing == scrubbing:
+            return
+        self.scrubbing = scrubbing
+        self.scrubbingChanged.emit(scrubbing)
     
     def toggle_play(self):
         """切换播放状态"""
@@ -1487,6 +1689,7 @@ class TimelineWidget(QWidget):
             self.play_button.setText("播放")
             # 停止定时器
             self.play_timer.stop()
+        self.playingChanged.emit(self.playing)
     
     def on_fps_changed(self, value: int):
         """处理FPS变化"""
@@ -1506,14 +1709,14 @@ class TimelineWidget(QWidget):
         self.range_selection_active = checked
         
         if checked:
-            print("进入范围选择模式")
+            logger.debug("进入范围选择模式")
             # 设置初始选择范围为当前帧附近
             start = max(0, self.current_frame - 10)
             end = min(self.current_frame + 10, self.total_frames - 1)
             
             # 检测language段的边界作为吸附点
             snap_points = self.detect_language_boundaries()
-            print(f"检测到的language边界吸附点: {snap_points}")
+            logger.debug("检测到的language边界吸附点: %s", snap_points)
             
             # 如果指定了活动时间轴，只在该时间轴上激活范围选择器
             if self.active_timeline:
@@ -1523,7 +1726,7 @@ class TimelineWidget(QWidget):
                 self.active_timeline.toggle_range_selector(True)
                 # 调整时间轴区域大小，确保可以显示帧数标签
                 self.active_timeline.setMinimumHeight(65)
-                print(f"在时间轴 {self.active_timeline.key} 上激活范围选择器")
+                logger.debug("在时间轴 %s 上激活范围选择器", self.active_timeline.key)
             else:
                 # 否则在所有时间轴上激活
                 for timeline in self.timelines:
@@ -1533,16 +1736,16 @@ class TimelineWidget(QWidget):
                     timeline.toggle_range_selector(True)
                     # 调整时间轴区域大小，确保可以显示帧数标签
                     timeline.setMinimumHeight(65)
-                print("在所有时间轴上激活范围选择器")
+                logger.debug("在所有时间轴上激活范围选择器")
         else:
-            print("退出范围选择模式")
+            logger.debug("退出范围选择模式")
             self.active_timeline = None
             # 在所有时间轴上关闭范围选择器
             for timeline in self.timelines:
                 timeline.toggle_range_selector(False)
                 # 恢复时间轴高度
                 timeline.setMinimumHeight(45)
-            print("在所有时间轴上关闭范围选择器")
+            logger.debug("在所有时间轴上关闭范围选择器")
         
         # 禁用播放按钮，防止在选择范围时播放
         self.play_button.setEnabled(not checked)
@@ -1558,6 +1761,7 @@ class TimelineWidget(QWidget):
             创建的时间轴条
         """
         timeline = TimelineBar(self, key)
+        timeline.frame_timer = self.frame_timer
         timeline.set_total_frames(self.total_frames)
         timeline.set_current_frame(self.current_frame)
         # 将 TimelineBar 的 frameChanged 信号连接到 TimelineWidget 的 set_current_frame 方法
@@ -1594,7 +1798,7 @@ class TimelineWidget(QWidget):
             end: 结束帧
             key: 关联的键
         """
-        print(f"TimelineWidget: 接收到范围选择信号，键 '{key}'，范围 {start}-{end}")
+        logger.debug("TimelineWidget: 接收到范围选择信号，键 '%s'，范围 %s-%s", key, start, end)
         
         # 关闭范围选择模式
         self.toggle_range_selection(False)
@@ -1613,7 +1817,7 @@ class TimelineWidget(QWidget):
         # 不需要查找发送信号的时间轴，因为key已经传递过来了
         # 发出多段选择信号，包含键名
         self.segmentsMultiSelected.emit(segments, key)
-        print(f"TimelineWidget: 发送多选信号，键 '{key}'，选中 {len(segments)} 个段")
+        logger.debug("TimelineWidget: 发送多选信号，键 '%s'，选中 %s 个段", key, len(segments))
 
     def on_segment_deleted(self, segment):
         """
@@ -1622,7 +1826,7 @@ class TimelineWidget(QWidget):
         Args:
             segment: 被删除的段
         """
-        print(f"TimelineWidget: 处理段删除，段 {segment.start}-{segment.end}")
+        logger.debug("TimelineWidget: 处理段删除，段 %s-%s", segment.start, segment.end)
 
         # 如果是annotation键的段，需要从time_windows列表中移除对应的窗口
         if segment.key == "annotation":
@@ -1630,7 +1834,7 @@ class TimelineWidget(QWidget):
             for i, (start, end, description) in enumerate(self.time_windows):
                 if start == segment.start and end == segment.end:
                     removed_window = self.time_windows.pop(i)
-                    print(f"从time_windows中移除窗口: {removed_window}")
+                    logger.debug("从time_windows中移除窗口: %s", removed_window)
                     break
 
             # 更新清除按钮状态
@@ -1872,6 +2076,18 @@ class TimelineWidget(QWidget):
             
             del self.key_to_timeline[key]
     
+    def set_frame_timer(self, timer):
+        """
+        设置逐帧计时：光标移动时开始新的一帧，记录时间轴、胶片条的重绘和分数曲线的更新
+
+        Args:
+            timer: FrameTimer，为None时停止计时
+        """
+        self.frame_timer = timer
+        for timeline in self.timelines:
+            timeline.frame_timer = timer
+        self.filmstrip.frame_timer = timer
+
     def get_current_frame(self) -> int:
         """获取当前帧索引"""
         return self.current_frame
@@ -1880,64 +2096,141 @@ class TimelineWidget(QWidget):
         """设置总帧数（兼容接口）"""
         self.set_total_frames(frames)
 
-    def plot_scores(self, frame_scores: Dict[int, float]):
-        """绘制每帧得分曲线。frame_scores 为 {frame: score} 映射。"""
+    def load_thumbnails(self, file_path: str):
+        """
+        在后台为文件生成（或读取缓存的）缩略图，逐级加密地显示在胶片条上
+
+        Args:
+            file_path: HDF5文件路径
+        """
+        self.stop_thumbnails()
+        self.thumbnail_path = file_path
+        self.filmstrip.set_mipmap(None, building=True)
+        self.filmstrip.show()
+        self.thumbnail_worker = ThumbnailWorker(file_path, self)
+        self.thumbnail_worker.thumbnailsUpdated.connect(self.on_thumbnails_updated)
+        self.thumbnail_worker.finished.connect(self.on_thumbnail_worker_finished)
+        self.thumbnail_worker.start()
+
+    def stop_thumbnails(self):
+        """停止正在进行的缩略图生成（已生成的部分保存在缓存中）"""
+        if self.thumbnail_worker is not None:
+            self.thumbnail_worker.thumbnailsUpdated.disconnect(self.on_thumbnails_updated)
+            self.thumbnail_worker.finished.disconnect(self.on_thumbnail_worker_finished)
+            self.thumbnail_worker.requestInterruption()
+            self.thumbnail_worker.wait()
+            self.thumbnail_worker = None
+
+    def on_thumbnails_updated(self, file_path: str, mipmap):
+        """缩略图完成一个层级"""
+        if file_path == self.thumbnail_path:
+            self.filmstrip.set_mipmap(mipmap, building=True)
+
+    def on_thumbnail_worker_finished(self):
+        """缩略图生成结束；文件没有可显示的相机时隐藏胶片条"""
+        self.thumbnail_worker = None
+        self.filmstrip.set_mipmap(self.filmstrip.mipmap)
+        if self.filmstrip.mipmap is None:
+            self.filmstrip.hide()
+
+    def _ensure_score_canvas(self):
+        """创建得分曲线画布并插入到布局顶部（仅在第一次调用时导入 matplotlib）"""
+        if self.score_canvas is not None:
+            return
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+
+        # 增加初始 figure 宽度并略微增高，以便线条显示更醒目
+        self.score_canvas = FigureCanvas(Figure(figsize=(8, 1.0)))
+        # 让画布横向扩展，与进度条同宽；高度固定为较短的条
+        self.score_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.score_canvas.setFixedHeight(110)
+        self.score_ax = self.score_canvas.figure.subplots()
+        # 简化坐标轴样式
+        self.score_ax.set_facecolor((1, 1, 1, 0))
+        # 给子图增加底部边距，防止 x 轴标签被裁切；左右略微收紧以便利用空间
         try:
-            # 将字典转换为排序的数组
-            items = sorted(frame_scores.items())
-            if not items:
+            # 增加底部边距，避免 x 轴标签被裁切
+            self.score_canvas.figure.subplots_adjust(bottom=0.25, left=0.07, right=0.98, top=0.95)
+        except Exception:
+            pass
+        # x 轴与总帧数对齐（0..total_frames-1）
+        self.score_ax.set_xlim(0, max(0, self.total_frames - 1))
+        self.score_ax.set_ylim(0, 1)
+        self.score_ax.tick_params(axis='both', which='both', length=0)
+        self.score_ax.set_yticks([])
+        self.score_ax.set_xticks([])
+        self.score_canvas.mpl_connect('draw_event', self._on_score_canvas_draw)
+        self.score_canvas.mpl_connect('resize_event', self._on_score_canvas_resize)
+        # 将画布插入到主布局顶部（在控制条之上）
+        self.layout.insertWidget(0, self.score_canvas)
+
+    def paintEvent(self, event):
+        """绘制完成后再创建推迟的得分画布"""
+        super().paintEvent(event)
+        if self._score_canvas_pending:
+            self._score_canvas_pending = False
+            QTimer.singleShot(0, self._plot_pending_scores)
+
+    def _plot_pending_scores(self):
+        """创建画布并绘制推迟期间最后一次设置的分数（期间被清除时不创建）"""
+        if self.score_array is None or self.score_canvas is not None:
+            return
+        self._ensure_score_canvas()
+        self.plot_scores(self.score_array)
+
+    def plot_scores(self, frame_scores):
+        """
+        绘制每帧得分曲线
+
+        Args:
+            frame_scores: 按帧索引的稠密分数数组（NaN 表示缺失），兼容 {frame: score} 映射
+        """
+        try:
+            self.score_array = scores_to_array(frame_scores, self.total_frames)
+            value_range = score_range(self.score_array)
+            if self.score_canvas is None:
+                if value_range is None:
+                    # 没有分数且画布尚未创建，无需清除
+                    self.score_array = None
+                else:
+                    # 第一次创建画布需要导入 matplotlib，推迟到本次绘制（包括当前帧图像）完成之后
+                    self._score_canvas_pending = True
+                    self.update()
+                return
+            self.score_ax.clear()
+            self._score_envelope_key = None
+            self.score_line = None
+            self.score_lo_line = None
+            self.score_fill = None
+
+            if value_range is None:
                 # 清除现有图
-                self.score_frames = []
-                self.score_values = []
-                self.score_ax.clear()
+                self.score_array = None
+                self.score_vline = None
+                self._score_background = None
                 self.score_canvas.draw_idle()
                 return
 
-            frames, values = zip(*items)
-            self.score_frames = list(frames)
-            self.score_values = list(values)
-
-            # 更新坐标轴范围
-            self.score_ax.clear()
-            # 绘制更粗的折线以提高可见性，并稍微增强填充透明度
-            self.score_ax.plot(self.score_frames, self.score_values, color='#2a82da', linewidth=2.2)
-            self.score_ax.fill_between(self.score_frames, self.score_values, color='#2a82da', alpha=0.18)
             # 保证 x 轴与时间轴宽度一致
             self.score_ax.set_xlim(0, max(0, self.total_frames - 1))
             # 自动计算y范围但限制在0-1若多数数据在0-1
-            ymin = min(self.score_values)
-            ymax = max(self.score_values)
+            ymin, ymax = value_range
             if ymin >= 0 and ymax <= 1:
                 self.score_ax.set_ylim(0, 1)
             else:
                 self.score_ax.set_ylim(min(0, ymin), max(1, ymax))
+            self._score_baseline = self.score_ax.get_ylim()[0]
 
             # 设置刻度和标签（保持紧凑）
-            # X 轴刻度：最多显示 6 个均匀分布的刻度
+            # X 轴刻度：使用 MaxNLocator 限制主刻度数量，优雅应对大帧数
             try:
-                # 使用 MaxNLocator 限制 x 轴主刻度数量，优雅应对大帧数
-                from matplotlib.ticker import MaxNLocator
-                locator = MaxNLocator(nbins=5, integer=True)
-                self.score_ax.xaxis.set_major_locator(locator)
-                xticks = self.score_ax.get_xticks()
-                # 使用默认字体大小显示刻度标签（取消强制缩小和旋转）
-                self.score_ax.set_xticklabels([str(int(x)) for x in xticks], fontsize=6)
-                # 让 Figure 自动调整布局以容纳标签
-                try:
-                    self.score_canvas.figure.tight_layout()
-                except Exception:
-                    pass
+                from matplotlib.ticker import MaxNLocator, FuncFormatter
+                self.score_ax.xaxis.set_major_locator(MaxNLocator(nbins=5, integer=True))
+                self.score_ax.xaxis.set_major_formatter(FuncFormatter(lambda x, pos: str(int(x))))
+                self.score_ax.tick_params(axis='x', labelsize=6)
             except Exception:
-                # 回退：使用稀疏的手动刻度
-                try:
-                    import numpy as _np
-                    xtick_count = min(4, max(2, int(self.total_frames)))
-                    xticks = _np.linspace(0, max(0, self.total_frames - 1), num=xtick_count, dtype=int)
-                    self.score_ax.set_xticks(xticks.tolist())
-                    # 取消对 x 轴刻度字体大小和旋转的强制设置，使用默认显示
-                    self.score_ax.set_xticklabels([str(int(x)) for x in xticks], fontsize=6)
-                except Exception:
-                    self.score_ax.set_xticks([])
+                self.score_ax.set_xticks([])
 
             # Y 轴刻度：如果分数在 [0,1] 内，使用固定刻度；否则使用三个刻度（min, mid, max）
             try:
@@ -1951,40 +2244,117 @@ class TimelineWidget(QWidget):
             except Exception:
                 self.score_ax.set_yticks([])
 
-            # 添加轴标签（小字体，节省空间）
+            # 添加轴标签（小字体，节省空间）；边距已在初始化时用 subplots_adjust 固定，
+            # 不再每次调用 tight_layout
             try:
                 self.score_ax.set_xlabel('Frame', fontsize=8)
                 self.score_ax.set_ylabel('Score', fontsize=8)
             except Exception:
                 pass
 
-            # 添加当前帧垂直线
-            # 添加/更新当前帧的红色垂直线
-            if self.score_vline is not None:
-                try:
-                    self.score_vline.remove()
-                except Exception:
-                    pass
-            self.score_vline = self.score_ax.axvline(self.current_frame, color='r', linewidth=1)
+            # 按当前画布宽度生成包络曲线；ax.clear() 会重置回调，需要重新连接
+            self._update_score_envelope(force=True)
+            self.score_ax.callbacks.connect('xlim_changed', self._on_score_xlim_changed)
+
+            # 添加当前帧的红色垂直线
+            # ax.clear() 已移除旧的线条；新线条设为 animated，不参与完整重绘，
+            # 由 draw_event 回调和 update_score_vline 通过 blit 单独绘制
+            self.score_vline = self.score_ax.axvline(self.current_frame, color='r', linewidth=1, animated=True)
 
+            # 完整重绘完成后 draw_event 会重新缓存背景
+            self._score_background = None
             self.score_canvas.draw_idle()
         except Exception as e:
-            print(f"plot_scores error: {e}")
+            logger.error("plot_scores error: %s", e)
+
+    def _update_score_envelope(self, force: bool = False) -> bool:
+        """
+        按绘图区域的像素宽度重新计算最小/最大值包络
+
+        只有宽度或可见帧范围变化时才重新计算，其余情况直接复用已有曲线。
+
+        Args:
+            force: 是否忽略缓存强制重新计算
+
+        Returns:
+            是否更新了曲线
+        """
+        if self.score_array is None:
+            return False
+
+        x0, x1 = self.score_ax.get_xlim()
+        start = max(0, int(np.floor(x0)))
+        end = min(len(self.score_array), int(np.ceil(x1)) + 1)
+        buckets = max(1, int(self.score_ax.bbox.width))
+        key = (start, end, buckets)
+        if not force and key == self._score_envelope_key:
+            return False
+        self._score_envelope_key = key
+
+        x, lo, hi = minmax_envelope(self.score_array, start, end, buckets)
+
+        if self.score_line is None:
+            # 绘制更粗的折线以提高可见性，并稍微增强填充透明度
+            self.score_line, = self.score_ax.plot(x, hi, color='#2a82da', linewidth=2.2)
+            self.score_lo_line, = self.score_ax.plot(x, lo, color='#2a82da', linewidth=1.0)
+        else:
+            self.score_line.set_data(x, hi)
+            self.score_lo_line.set_data(x, lo)
+
+        if self.score_fill is not None:
+            self.score_fill.remove()
+        self.score_fill = self.score_ax.fill_between(x, self._score_baseline, hi, color='#2a82da', alpha=0.18)
+        return True
+
+    def _on_score_canvas_resize(self, event):
+        """得分画布尺寸变化时按新宽度重建包络（随后的完整重绘会重新缓存背景）"""
+        self._score_background = None
+        self._update_score_envelope()
+
+    def _on_score_xlim_changed(self, ax):
+        """得分图可见帧范围（缩放）变化时重建包络"""
+        if self._update_score_envelope():
+            self._score_background = None
+            self.score_canvas.draw_idle()
+
+    def _on_score_canvas_draw(self, event):
+        """
+        得分画布完成一次完整重绘后的回调：缓存不含指示线的背景并绘制指示线
+
+        Args:
+            event: matplotlib 的 draw_event
+        """
+        try:
+            self._score_background = self.score_canvas.copy_from_bbox(self.score_ax.bbox)
+            if self.score_vline is not None:
+                self.score_ax.draw_artist(self.score_vline)
+        except Exception:
+            self._score_background = None
 
     def update_score_vline(self):
-        """更新垂直指示线到当前帧位置"""
+        """更新垂直指示线到当前帧位置（仅 blit 指示线，不重绘整个画布）"""
         if not hasattr(self, 'score_ax') or self.score_ax is None:
             return
         if getattr(self, 'score_vline', None) is None:
             return
+        timer = self.frame_timer
+        started = time.perf_counter() if timer is not None else 0.0
         try:
-            # vline is a Line2D; set_xdata for vertical line needs updating of segments
-            # remove and redraw for simplicity
-            self.score_vline.remove()
-            self.score_vline = self.score_ax.axvline(self.current_frame, color='r', linewidth=1)
-            self.score_canvas.draw_idle()
+            self.score_vline.set_xdata([self.current_frame, self.current_frame])
+
+            # 背景尚未缓存（首次绘制或尺寸变化后），等待下一次完整重绘
+            if self._score_background is None:
+                self.score_canvas.draw_idle()
+                return
+
+            self.score_canvas.restore_region(self._score_background)
+            self.score_ax.draw_artist(self.score_vline)
+            self.score_canvas.blit(self.score_ax.bbox)
         except Exception:
             pass
+        finally:
+            if timer is not None:
+                timer.add('score', started)
     
     def reset_segments(self, keys_to_preserve=None):
         """
@@ -1996,7 +2366,7 @@ class TimelineWidget(QWidget):
         if keys_to_preserve is None:
             keys_to_preserve = []
             
-        print(f"重置时间轴段，保留键: {keys_to_preserve}")
+        logger.debug("重置时间轴段，保留键: %s", keys_to_preserve)
         
         # 保存要保留的时间轴
         preserved_timelines = {}
@@ -2027,14 +2397,14 @@ class TimelineWidget(QWidget):
         """处理键盘事件"""
         # 处理Enter键
         if event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
-            print(f"TimelineWidget: 检测到Enter键")
+            logger.debug("TimelineWidget: 检测到Enter键")
             if self.range_selection_active:
                 # 已经在范围选择模式，但这里不需要处理，因为各个TimelineBar会自己处理
-                print("TimelineWidget: 已在范围选择模式，交给活动的时间轴处理")
+                logger.debug("TimelineWidget: 已在范围选择模式，交给活动的时间轴处理")
                 super().keyPressEvent(event)
             else:
                 # 进入范围选择模式
-                print("TimelineWidget: 进入范围选择模式")
+                logger.debug("TimelineWidget: 进入范围选择模式")
                 
                 # 优先寻找当前编辑键的时间轴
                 target_timeline = None
@@ -2042,30 +2412,30 @@ class TimelineWidget(QWidget):
                 # 从父窗口获取当前编辑键
                 if self.parent() and hasattr(self.parent(), 'current_editing_key'):
                     current_editing_key = self.parent().current_editing_key
-                    print(f"TimelineWidget: 当前编辑键为 {current_editing_key}")
+                    logger.debug("TimelineWidget: 当前编辑键为 %s", current_editing_key)
                     
                     # 查找当前编辑键的时间轴
                     if current_editing_key in self.key_to_timeline:
                         timeline = self.key_to_timeline[current_editing_key]
                         if timeline.isVisible():
                             target_timeline = timeline
-                            print(f"TimelineWidget: 找到当前编辑键 {current_editing_key} 的可见时间轴")
+                            logger.debug("TimelineWidget: 找到当前编辑键 %s 的可见时间轴", current_editing_key)
                         else:
-                            print(f"TimelineWidget: 当前编辑键 {current_editing_key} 的时间轴不可见")
+                            logger.debug("TimelineWidget: 当前编辑键 %s 的时间轴不可见", current_editing_key)
                 
                 # 如果没有找到当前编辑键的时间轴，寻找任何可见的时间轴
                 if not target_timeline:
                     for timeline in self.timelines:
                         if timeline.isVisible():
                             target_timeline = timeline
-                            print(f"TimelineWidget: 使用可见的时间轴 {timeline.key}")
+                            logger.debug("TimelineWidget: 使用可见的时间轴 %s", timeline.key)
                             break
                 
                 if target_timeline:
                     self.active_timeline = target_timeline
-                    print(f"TimelineWidget: 设置活动时间轴为 {self.active_timeline.key}")
+                    logger.debug("TimelineWidget: 设置活动时间轴为 %s", self.active_timeline.key)
                 else:
-                    print("TimelineWidget: 没有找到可用的时间轴")
+                    logger.debug("TimelineWidget: 没有找到可用的时间轴")
                     return
                 
                 # 激活范围选择模式
@@ -2083,7 +2453,7 @@ class TimelineWidget(QWidget):
         
         # 处理ESC键，退出范围选择模式
         elif event.key() == Qt.Key_Escape and self.range_selection_active:
-            print("TimelineWidget: ESC键，退出范围选择模式")
+            logger.debug("TimelineWidget: ESC键，退出范围选择模式")
             self.toggle_range_selection(False)
         else:
             # 其他键传递给父类
@@ -2104,21 +2474,21 @@ class TimelineWidget(QWidget):
         # 从父窗口获取当前编辑键
         if self.parent() and hasattr(self.parent(), 'current_editing_key'):
             current_editing_key = self.parent().current_editing_key
-            print(f"detect_language_boundaries: 当前编辑键为 {current_editing_key}")
+            logger.debug("detect_language_boundaries: 当前编辑键为 %s", current_editing_key)
             
             # 查找当前编辑键的时间轴
             if current_editing_key in self.key_to_timeline:
                 timeline = self.key_to_timeline[current_editing_key]
                 if timeline.isVisible():
                     target_timeline = timeline
-                    print(f"detect_language_boundaries: 使用当前编辑键 {current_editing_key} 的时间轴")
+                    logger.debug("detect_language_boundaries: 使用当前编辑键 %s 的时间轴", current_editing_key)
         
         # 如果没有找到当前编辑键的时间轴，使用第一个可见的时间轴
         if not target_timeline:
             for timeline in self.timelines:
                 if timeline.isVisible():
                     target_timeline = timeline
-                    print(f"detect_language_boundaries: 使用可见的时间轴 {timeline.key}")
+                    logger.debug("detect_language_boundaries: 使用可见的时间轴 %s", timeline.key)
                     break
         
         # 收集目标时间轴所有段的边界
@@ -2126,9 +2496,9 @@ class TimelineWidget(QWidget):
             for segment in target_timeline.segments:
                 snap_points.append(segment.start)
                 snap_points.append(segment.end)
-            print(f"detect_language_boundaries: 从 {target_timeline.key} 收集到 {len(snap_points)} 个边界点")
+            logger.debug("detect_language_boundaries: 从 %s 收集到 %s 个边界点", target_timeline.key, len(snap_points))
         else:
-            print("detect_language_boundaries: 没有找到可用的时间轴")
+            logger.debug("detect_language_boundaries: 没有找到可用的时间轴")
         
         # 去重并排序
         return sorted(list(set(snap_points)))
@@ -2203,7 +2573,7 @@ class TimelineWidget(QWidget):
         # 确保红色线移动到新创建的时间窗口的结尾位置
         self.set_current_frame(end_frame)
 
-        print(f"添加新时间窗口: {start_frame}-{end_frame} (当前帧: {self.current_frame})")
+        logger.debug("添加新时间窗口: %s-%s (当前帧: %s)", start_frame, end_frame, self.current_frame)
 
     def find_next_available_start(self):
         """找到下一个可用的起始位置，确保无缝衔接且不重合"""
@@ -2358,11 +2728,11 @@ class TimelineWidget(QWidget):
 
                 # 使用提供的字段名，如果没有提供则使用默认的"annotations"
                 annotation_key = annotation_field if annotation_field else "annotations"
-                success_count = 0
 
-                print(f"保存标注到字段: {annotation_key}")
+                logger.debug("保存标注到字段: %s", annotation_key)
 
-                # 为每个时间窗口设置标注（只保存英文）
+                # 转换为英文标注（只保存英文）后整列一次写入
+                windows = []
                 for start, end, description in self.time_windows:
                     if description:  # 只保存有描述的窗口
                         # 获取英文翻译
@@ -2370,17 +2740,12 @@ class TimelineWidget(QWidget):
 
                         # 保存英文标注（如果有映射）或原始中文（如果没有映射）
                         save_text = english_translation if english_translation else description
-                        print(f"save text: {save_text}")
-
-                        success = hdf5_model.set_language_for_key(
-                            annotation_key, start, end, save_text
-                        )
-                        if success:
-                            success_count += 1
-                            if english_translation:
-                                print(f"保存英文标注: {description} -> {english_translation}")
-                            else:
-                                print(f"未找到英文映射，保存原文: {description}")
+                        logger.debug("save text: %s", save_text)
+                        windows.append((start, end, save_text))
+
+                success_count = 0
+                if windows and hdf5_model.set_languages_for_key(annotation_key, windows):
+                    success_count = len(windows)
 
                 if success_count > 0:
                     QMessageBox.information(
@@ -2434,7 +2799,7 @@ class TimelineWidget(QWidget):
             current_frame = self.get_current_frame()
             self.parent().update_subtask_info_display(current_frame)
 
-        print("已清除时间轴标注")
+        logger.info("已清除时间轴标注")
 
     def update_clear_button_state(self):
         """更新清除按钮的状态"""
@@ -2461,11 +2826,11 @@ class TimelineWidget(QWidget):
                 self.time_windows.append(window)
                 self.create_window_segment(window)
 
-            print(f"从 {file_path} 加载了 {len(self.time_windows)} 个时间窗口")
+            logger.info("从 %s 加载了 %s 个时间窗口", file_path, len(self.time_windows))
             return True
 
         except Exception as e:
-            print(f"加载标注数据失败: {e}")
+            logger.error("加载标注数据失败: %s", e)
             return False
 
     def validate_time_windows(self) -> tuple[bool, str]:
@@ -2478,45 +2843,7 @@ class TimelineWidget(QWidget):
         Returns:
             (is_valid, error_message): 是否有效和错误信息
         """
-        if not self.time_windows:
-            return False, "没有时间窗口需要保存"
-        
-        # 按开始帧排序
-        sorted_windows = sorted(self.time_windows, key=lambda x: x[0])
-        
-        # 检查是否从0开始
-        if sorted_windows[0][0] != 0:
-            return False, f"时间窗口必须从第0帧开始，当前从第{sorted_windows[0][0]}帧开始"
-        
-        # 检查是否覆盖到最后一帧
-        if sorted_windows[-1][1] != self.total_frames - 1:
-            return False, f"时间窗口必须覆盖到最后一帧({self.total_frames - 1})，当前到第{sorted_windows[-1][1]}帧"
-        
-        # 检查相连性和重合性
-        for i in range(len(sorted_windows)):
-            current_start, current_end, _ = sorted_windows[i]
-            
-            # 检查当前窗口的有效性
-            if current_start > current_end:
-                return False, f"时间窗口{i+1}的起始帧({current_start})大于结束帧({current_end})"
-            
-            # 检查与下一个窗口的连接
-            if i < len(sorted_windows) - 1:
-                next_start, next_end, _ = sorted_windows[i + 1]
-                # 检查是否重合（虽然按开始帧排序后理论上不会重合，但还是要检查）
-                if current_end >= next_start:
-                    return False, f"时间窗口{i+1}({current_start}-{current_end})与时间窗口{i+2}({next_start}-{next_end})重合"
-                
-                # 检查是否相连（当前窗口结束帧+1应该等于下一个窗口开始帧）
-                if current_end + 1 != next_start:
-                    return False, f"时间窗口{i+1}({current_start}-{current_end})与时间窗口{i+2}({next_start}-{next_end})不相连，中间有间隙"
-        
-        # 检查是否有重复的时间窗口
-        window_ranges = [(w[0], w[1]) for w in self.time_windows]
-        if len(window_ranges) != len(set(window_ranges)):
-            return False, "存在重复的时间窗口"
-        
-        return True, "验证通过"
+        return validate_windows(self.time_windows, self.total_frames)
 
     def get_time_coverage_info(self) -> dict:
         """
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+
+
+# 通过环境变量覆盖缓存根目录
+CACHE_DIR_ENV = 'HDF5_VIEWER_CACHE'
+
+
+def get_cache_root() -> str:
+    """
+    获取缓存根目录
+
+    优先使用环境变量 HDF5_VIEWER_CACHE，其次为 $XDG_CACHE_HOME/hdf5_viewer，
+    默认 ~/.cache/hdf5_viewer。
+
+    Returns:
+        缓存根目录路径
+    """
+    root = os.environ.get(CACHE_DIR_ENV)
+    if not root:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        root = os.path.join(base, 'hdf5_viewer')
+    return root
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    获取（并创建）缓存根目录下的子目录
+
+    Args:
+        parts: 子目录路径的各部分
+
+    Returns:
+        子目录路径
+    """
+    path = os.path.join(get_cache_root(), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def path_digest(path: str) -> str:
+    """返回路径（规范化为绝对路径后）的短哈希，用作缓存文件名"""
+    return hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import sys
+from typing import Dict, Optional
+
+
+# 所有子系统日志记录器的根名称
+ROOT_LOGGER_NAME = 'hdf5_viewer'
+
+# 子系统：model（HDF5数据模型）、decode（图像解码）、timeline（时间轴）、ui（主界面）
+SUBSYSTEMS = ('model', 'decode', 'timeline', 'ui')
+
+# 通过环境变量设置日志级别，例如 "DEBUG" 或 "decode=DEBUG,timeline=INFO"
+LOG_LEVEL_ENV = 'HDF5_VIEWER_LOG'
+
+DEFAULT_LEVEL = logging.WARNING
+
+_LOG_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """
+    获取子系统的日志记录器
+
+    Args:
+        subsystem: 子系统名称，见 SUBSYSTEMS
+
+    Returns:
+        名为 hdf5_viewer.<subsystem> 的日志记录器
+    """
+    return logging.getLogger(f'{ROOT_LOGGER_NAME}.{subsystem}')
+
+
+def parse_level_spec(spec: str) -> Dict[str, int]:
+    """
+    解析日志级别配置字符串
+
+    Args:
+        spec: 形如 "DEBUG" 或 "decode=DEBUG,timeline=INFO" 的配置，
+            不带子系统名称的级别作用于所有子系统
+
+    Returns:
+        {子系统名称: 级别}，键 '' 表示所有子系统
+    """
+    levels = {}
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, level = item.rpartition('=')
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"无效的日志级别: {level}")
+        levels[name.strip()] = value
+    return levels
+
+
+def configure_logging(debug: bool = False, spec: Optional[str] = None):
+    """
+    配置日志输出，默认只输出 WARNING 及以上级别
+
+    Args:
+        debug: 是否为所有子系统开启 DEBUG 级别
+        spec: 日志级别配置字符串，为None时读取环境变量 HDF5_VIEWER_LOG
+    """
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(_LOG_FORMAT))
+        root.addHandler(handler)
+        root.propagate = False
+
+    if spec is None:
+        spec = os.environ.get(LOG_LEVEL_ENV, '')
+    try:
+        levels = parse_level_spec(spec)
+    except ValueError as e:
+        root.warning("%s，使用默认日志级别", e)
+        levels = {}
+
+    root.setLevel(logging.DEBUG if debug else levels.pop('', DEFAULT_LEVEL))
+    for subsystem in SUBSYSTEMS:
+        get_logger(subsystem).setLevel(logging.NOTSET)
+    for subsystem, level in levels.items():
+        if subsystem:
+            get_logger(subsystem).setLevel(logging.DEBUG if debug else level)